@@ -1,86 +1,407 @@
 import os
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, NamedTuple, Tuple, Callable, Awaitable
 import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 
-# Google Cloud imports
-try:
-    from google.cloud import language_v1
-    from google.oauth2 import service_account
-    GOOGLE_CLOUD_AVAILABLE = True
-except ImportError:
-    GOOGLE_CLOUD_AVAILABLE = False
-    logging.warning("Google Cloud Language library not available")
-
-# Fallback imports
-from textblob import TextBlob
-import re
 from collections import Counter
 
+from config import settings
+from analysis_cache import AnalysisCache, content_hash
+from near_duplicates import NearDuplicateIndex, DuplicateMatch
+from google_backend import GoogleLanguageBackend, QuotaExceededError
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from topic_taxonomy import taxonomy_registry, DEFAULT_TAXONOMY
+from keyword_engine import keyword_registry, tokenize
+from sentiment_engine import sentiment_engine
+from text_segmenter import segment, enforce_max_length
+from language_detection import language_detector, SCRIPT_LANGUAGES
+from language_pipelines import language_pipelines, LanguagePipeline, ENGLISH
+from instrumentation import StageTimer, ANALYSIS_BACKEND
+from startup import startup_tracker
 from models import AnalysisResult, SentimentLabel
 
 logger = logging.getLogger(__name__)
 
+EXECUTOR_MODES = ("inline", "thread", "process")
+
+class AnalysisProfile(NamedTuple):
+    """Per-SME resources used by the fallback analyzer (picklable for process workers)"""
+    taxonomy: str = DEFAULT_TAXONOMY
+    keyword_index: Optional[str] = None
+
+DEFAULT_PROFILE = AnalysisProfile()
+
+class AnalysisKey(NamedTuple):
+    """A review as analyze_text sees it: length-checked text, resolved language and profile"""
+    text: str
+    language: str
+    profile: AnalysisProfile
+    variant: str
+    content_hash: str
+
+# Per-process analyzer used by fallback executor workers
+_worker_analyzer: Optional["AIAnalyzer"] = None
+
+def _init_fallback_worker():
+    """Create the worker analyzer and load the sentiment lexicon once per worker"""
+    global _worker_analyzer
+    _worker_analyzer = AIAnalyzer()
+    _worker_analyzer._analyze_fallback_sync("warm up", "en")
+
+def _run_fallback_analysis(text: str, language: str, profile: AnalysisProfile = DEFAULT_PROFILE) -> Tuple[AnalysisResult, StageTimer]:
+    """Executor entry point for the CPU-bound fallback analysis; stage timings go back to the parent"""
+    if _worker_analyzer is None:
+        _init_fallback_worker()
+    timer = StageTimer()
+    return _worker_analyzer._analyze_fallback_sync(text, language, profile, timer), timer
+
+def _run_fallback_batch(items: List[Tuple[str, str, AnalysisProfile]]) -> Tuple[List[Any], StageTimer]:
+    """Executor entry point for a batch of fallback analyses (results or per-item exceptions)"""
+    if _worker_analyzer is None:
+        _init_fallback_worker()
+    timer = StageTimer()
+    return _worker_analyzer._analyze_fallback_batch_sync(items, timer), timer
+
+def _fallback_worker_ready() -> bool:
+    return _worker_analyzer is not None
+
 class AIAnalyzer:
     def __init__(self):
-        self.google_client = None
+        self.google_backend: Optional[GoogleLanguageBackend] = None
         self.use_google_cloud = False
+        self.google_breaker = CircuitBreaker(
+            "google-cloud-language",
+            timeout=settings.google_timeout_seconds,
+            error_rate_threshold=settings.google_breaker_error_rate,
+            slow_call_seconds=settings.google_breaker_slow_call_seconds,
+            slow_call_rate_threshold=settings.google_breaker_slow_call_rate,
+            min_calls=settings.google_breaker_min_calls,
+            window_seconds=settings.google_breaker_window_seconds,
+            open_seconds=settings.google_breaker_open_seconds,
+            half_open_probes=settings.google_breaker_half_open_probes,
+            ignored_exceptions=(QuotaExceededError,)
+        )
+        self.executor_mode = settings.fallback_executor if settings.fallback_executor in EXECUTOR_MODES else "inline"
+        self.executor: Optional[Executor] = None
+        self.fallback_workers = 1
+        self._executor_lock = asyncio.Lock()
+        # Fallback analyses waiting for a free worker; they are then scored as one batch
+        self._fallback_queue: List[Tuple[str, str, AnalysisProfile, asyncio.Future]] = []
+        self._fallback_batches = 0
+        self._fallback_tasks: set = set()
+        self._fallback_flush_scheduled = False
+        self.cache: Optional[AnalysisCache] = None
+        self.near_duplicates: Optional[NearDuplicateIndex] = None
+        self.ready = False
+        self._initializing: Optional[asyncio.Future] = None
         
     async def initialize(self):
-        """Initialize the AI analyzer with available services"""
-        await self._setup_google_cloud()
-        logger.info(f"AI Analyzer initialized. Google Cloud: {self.use_google_cloud}")
+        """Initialize the AI analyzer with available services and load models"""
+        with startup_tracker.timed("google_client"):
+            await self._setup_google_cloud()
+        with startup_tracker.timed("fallback_executor"):
+            await self._setup_fallback_executor()
+        with startup_tracker.timed("fallback_warmup"):
+            # Imports TextBlob and loads the sentiment lexicon plus the default taxonomy in this process
+            await asyncio.to_thread(self._analyze_fallback_sync, "warm up", "en")
+        with startup_tracker.timed("keyword_index"):
+            await asyncio.to_thread(keyword_registry.get, keyword_registry.resolve())
+        if settings.cache_enabled:
+            with startup_tracker.timed("cache"):
+                self.cache = AnalysisCache()
+        if settings.near_duplicate_enabled:
+            with startup_tracker.timed("near_duplicates"):
+                try:
+                    self.near_duplicates = await asyncio.to_thread(NearDuplicateIndex)
+                except Exception as e:
+                    logger.error(f"Near-duplicate index unavailable at {settings.near_duplicate_path}: {e}")
+        self.ready = True
+        startup_tracker.mark_ready()
+        logger.info(f"AI Analyzer initialized. Google Cloud: {self.use_google_cloud}, fallback executor: {self.executor_mode}")
         
-    async def _setup_google_cloud(self):
-        """Setup Google Cloud Language client if credentials are available"""
-        if not GOOGLE_CLOUD_AVAILABLE:
-            logger.warning("Google Cloud Language library not installed")
+    async def ensure_initialized(self):
+        """Initialize once; concurrent callers wait for the same (possibly background) warm-up"""
+        if self.ready:
             return
+        if self._initializing is None:
+            self._initializing = asyncio.ensure_future(self.initialize())
+        try:
+            await asyncio.shield(self._initializing)
+        except Exception:
+            self._initializing = None
+            raise
+        
+    async def shutdown(self):
+        """Stop fallback executor workers and release the cache and near-duplicate index"""
+        if self._initializing is not None and not self._initializing.done():
+            self._initializing.cancel()
+        for task in list(self._fallback_tasks):
+            task.cancel()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+        if self.cache is not None:
+            self.cache.close()
+        if self.near_duplicates is not None:
+            self.near_duplicates.close()
+            self.near_duplicates = None
             
-        credentials_path = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
-        if not credentials_path or not os.path.exists(credentials_path):
-            logger.warning("Google Cloud credentials not found, using fallback analysis")
+    async def _setup_fallback_executor(self):
+        """Start and warm up the executor that runs the fallback analyzer"""
+        if self.executor_mode == "inline":
             return
             
+        workers = settings.fallback_workers or min(4, os.cpu_count() or 1)
+        self.fallback_workers = workers
+        if self.executor_mode == "process":
+            self.executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_fallback_worker
+            )
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fallback-analyzer")
+            
+        # Touch every worker so the first real request does not pay for process start and lexicon loading
+        # (process workers already ran _init_fallback_worker as their initializer)
+        warm_up = _fallback_worker_ready if self.executor_mode == "process" else _init_fallback_worker
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.executor, warm_up) for _ in range(workers)))
+        logger.info(f"Fallback analyzer warmed up with {workers} {self.executor_mode} worker(s)")
+        
+    async def _setup_google_cloud(self):
+        """Setup the async Google Cloud Language backend if it is available"""
         try:
-            credentials = service_account.Credentials.from_service_account_file(credentials_path)
-            self.google_client = language_v1.LanguageServiceClient(credentials=credentials)
-            self.use_google_cloud = True
-            logger.info("Google Cloud Language client initialized successfully")
+            self.google_backend = GoogleLanguageBackend.from_settings()
+            self.use_google_cloud = self.google_backend is not None
+            if self.use_google_cloud:
+                logger.info("Google Cloud Language client initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize Google Cloud client: {e}")
             
-    async def analyze_text(self, text: str, language: str = "en") -> AnalysisResult:
+    async def analyze_text(
+        self,
+        text: str,
+        language: Optional[str] = None,
+        sme_id: Optional[int] = None,
+        industry: Optional[str] = None,
+        review_id: Optional[int] = None
+    ) -> AnalysisResult:
         """
-        Analyze text for sentiment, keywords, and topics
+        Analyze text for sentiment, keywords, and topics.
+        Topics and keywords use the SME's or industry's taxonomy / IDF index when configured.
+        An exact repeat is answered by the result cache; otherwise a near-duplicate of an
+        already analyzed review reuses its analysis and is flagged with the cluster id.
+        Texts over max_text_length are truncated or rejected (TextTooLongError) before any analysis.
+        The language is detected when none (or "auto") is given.
         """
-        if self.use_google_cloud and self.google_client:
-            return await self._analyze_with_google_cloud(text, language)
+        if not self.ready:
+            await self.ensure_initialized()
+        key = self.analysis_key(text, language, sme_id, industry)
+        if self.near_duplicates is None:
+            compute = lambda: self._analyze_uncached(key.text, key.language, key.profile)
         else:
-            return await self._analyze_with_fallback(text, language)
+            compute = lambda: self._analyze_deduplicated(key.text, key.language, key.profile, key.variant, review_id)
+        result = await self._analyze_cached(key.text, key.language, key.variant, compute)
+        return result.model_copy(update={"content_hash": key.content_hash})
+        
+    def analysis_key(
+        self,
+        text: str,
+        language: Optional[str] = None,
+        sme_id: Optional[int] = None,
+        industry: Optional[str] = None
+    ) -> AnalysisKey:
+        """
+        Everything analyze_text resolves before analyzing, including the content hash
+        that tells whether a stored result is still current (with analysis_model)
+        """
+        text = enforce_max_length(text, settings.max_text_length, settings.max_text_length_policy)
+        language = self.resolve_language(text, language)
+        profile = AnalysisProfile(
+            taxonomy=taxonomy_registry.resolve(sme_id, industry),
+            keyword_index=keyword_registry.resolve(sme_id)
+        )
+        variant = f"{profile.taxonomy}|{profile.keyword_index or ''}"
+        return AnalysisKey(text, language, profile, variant, content_hash(text, language, variant))
+        
+    async def _analyze_deduplicated(
+        self,
+        text: str,
+        language: str,
+        profile: AnalysisProfile,
+        variant: str,
+        review_id: Optional[int]
+    ) -> AnalysisResult:
+        """Reuse the analysis of a near-duplicate cluster, or analyze and start a new cluster (on a cache miss)"""
+        analysis_model = self.analysis_model
+        timer = StageTimer()
+        with timer.stage("near_duplicate_lookup"):
+            fingerprint = await self.near_duplicates.fingerprint_async(
+                text, f"{analysis_model}|{variant}|{language or ''}", self.executor
+            )
+            match = await self.near_duplicates.lookup(fingerprint) if fingerprint is not None else None
+        timer.publish()
+        
+        if match is not None:
+            if review_id is not None and match.review_id == review_id:
+                # Reanalysis of the cluster representative itself
+                return match.result
+            await self.near_duplicates.add_member(match, review_id)
+            return self._flag_duplicate(match)
             
-    async def _analyze_with_google_cloud(self, text: str, language: str) -> AnalysisResult:
+        result = await self._analyze_uncached(text, language, profile)
+        # Results from a degraded path are not indexed, as in the cache
+        if fingerprint is not None and result.analysis_model == analysis_model:
+            match = await self.near_duplicates.add(fingerprint, result, review_id)
+            if match is not None:
+                return self._flag_duplicate(match)
+        return result
+        
+    def resolve_language(self, text: str, language: Optional[str] = None) -> str:
+        """The given language code, else the detected one, else the default language"""
+        if language and language.lower() != "auto":
+            return language
+        if not settings.language_detection_enabled:
+            return settings.default_language
+        timer = StageTimer()
+        with timer.stage("language_detection"):
+            detected, confidence = language_detector.detect(text, settings.language_detection_min_words)
+        timer.publish()
+        if detected is None or confidence < settings.language_detection_min_confidence:
+            return settings.default_language
+        if (
+            not self.use_google_cloud
+            and detected not in SCRIPT_LANGUAGES
+            and not language_pipelines.has_sentiment(detected)
+        ):
+            # A Latin-script language without a fallback lexicon would always score neutral
+            return settings.default_language
+        return detected
+        
+    @staticmethod
+    def _flag_duplicate(match: DuplicateMatch) -> AnalysisResult:
+        return match.result.model_copy(update={
+            "duplicate_cluster_id": match.cluster_id,
+            "duplicate_similarity": round(match.similarity, 4),
+        })
+        
+    async def _analyze_cached(
+        self,
+        text: str,
+        language: str,
+        variant: str,
+        compute: Callable[[], Awaitable[AnalysisResult]]
+    ) -> AnalysisResult:
+        """Exact-match cache (memory, then disk) in front of ``compute``, which fills it on a miss"""
+        if self.cache is None:
+            return await compute()
+        return await self.cache.get_or_compute(text, language, self.analysis_model, compute, variant=variant)
+        
+    def get_google_status(self) -> Optional[Dict[str, Any]]:
+        """Google backend and circuit breaker state for health reporting"""
+        if not self.use_google_cloud:
+            return None
+        return {
+            'circuit': self.google_breaker.get_state(),
+            **self.google_backend.get_stats(),
+        }
+        
+    @property
+    def analysis_model(self) -> str:
+        """Model that analyze_text would currently use"""
+        if self.use_google_cloud and self.google_backend:
+            return "google-cloud-language-v1"
+        return "textblob-fallback"
+        
+    async def _analyze_uncached(self, text: str, language: str, profile: AnalysisProfile = DEFAULT_PROFILE) -> AnalysisResult:
+        if settings.analysis_chunk_chars > 0 and len(text) > settings.analysis_chunk_chars:
+            return await self._analyze_chunked(text, language, profile)
+        return await self._analyze_single(text, language, profile)
+        
+    async def _analyze_chunked(self, text: str, language: str, profile: AnalysisProfile) -> AnalysisResult:
+        """Analyze sentence-aligned chunks concurrently and merge them weighted by length"""
+        chunks = segment(text, settings.analysis_chunk_chars)
+        if len(chunks) == 1:
+            return await self._analyze_single(chunks[0], language, profile)
+        results = await asyncio.gather(*(self._analyze_single(chunk, language, profile) for chunk in chunks))
+        timer = StageTimer()
+        with timer.stage("merge_chunks"):
+            merged = self._merge_chunk_results(results, [len(chunk) for chunk in chunks], language)
+        timer.publish()
+        return merged
+        
+    @staticmethod
+    def _merge_chunk_results(results: List[AnalysisResult], weights: List[int], language: str) -> AnalysisResult:
+        """
+        Length-weighted sentiment, confidence and emotions. Keywords and topics are
+        ranked by the summed weight of their chunks, discounted by rank within each chunk.
+        """
+        total = float(sum(weights)) or 1.0
+        sentiment_score = sum(r.sentiment_score * w for r, w in zip(results, weights)) / total
+        confidence_score = sum(r.confidence_score * w for r, w in zip(results, weights)) / total
+        
+        emotions: Dict[str, float] = {}
+        for result, weight in zip(results, weights):
+            for emotion, value in result.emotions.items():
+                emotions[emotion] = emotions.get(emotion, 0.0) + value * weight / total
+                
+        def ranked(lists: List[List[str]], limit: int) -> List[str]:
+            scores: Dict[str, float] = {}
+            for terms, weight in zip(lists, weights):
+                for rank, term in enumerate(terms):
+                    scores[term] = scores.get(term, 0.0) + weight / (rank + 1)
+            return sorted(scores, key=lambda term: -scores[term])[:limit]
+            
+        if sentiment_score > 0.1:
+            sentiment_label = SentimentLabel.POSITIVE
+        elif sentiment_score < -0.1:
+            sentiment_label = SentimentLabel.NEGATIVE
+        else:
+            sentiment_label = SentimentLabel.NEUTRAL
+            
+        # A chunk that fell back degrades the whole result, so it is not cached as the primary model's
+        models = [result.analysis_model for result in results]
+        analysis_model = "textblob-fallback" if "textblob-fallback" in models else models[0]
+        
+        return AnalysisResult(
+            sentiment_score=sentiment_score,
+            sentiment_label=sentiment_label,
+            confidence_score=confidence_score,
+            keywords=ranked([result.keywords for result in results], 10),
+            topics=ranked([result.topics for result in results], 5),
+            emotions=emotions,
+            language_code=language,
+            analysis_model=analysis_model
+        )
+        
+    async def _analyze_single(self, text: str, language: str, profile: AnalysisProfile = DEFAULT_PROFILE) -> AnalysisResult:
+        if self.use_google_cloud and self.google_backend:
+            return await self._analyze_with_google_cloud(text, language, profile)
+        else:
+            ANALYSIS_BACKEND.inc(backend="fallback", reason="google_disabled")
+            return await self._analyze_with_fallback(text, language, profile)
+            
+    async def _analyze_with_google_cloud(self, text: str, language: str, profile: AnalysisProfile = DEFAULT_PROFILE) -> AnalysisResult:
         """Analyze using Google Cloud Language API"""
         try:
-            document = language_v1.Document(
-                content=text,
-                type_=language_v1.Document.Type.PLAIN_TEXT,
-                language=language
-            )
-            
-            # Sentiment analysis
-            sentiment_response = self.google_client.analyze_sentiment(
-                request={"document": document}
-            )
+            # Rate limiting and quota happen before the breaker so throttling is not mistaken for upstream latency
+            if self.google_breaker.is_open():
+                raise CircuitOpenError("Google Cloud circuit is open")
+            await self.google_backend.admit()
             
-            # Entity analysis for keywords/topics
-            entities_response = self.google_client.analyze_entities(
-                request={"document": document}
+            # Sentiment and entity analysis for keywords/topics, guarded by the circuit breaker
+            sentiment, entities = await self.google_breaker.call(
+                lambda: self.google_backend.request(text, language)
             )
+            ANALYSIS_BACKEND.inc(backend="google", reason="")
+            timer = StageTimer()
             
             # Extract sentiment
-            sentiment = sentiment_response.document_sentiment
             sentiment_score = sentiment.score
             confidence_score = sentiment.magnitude
             
@@ -96,7 +417,7 @@ class AIAnalyzer:
             keywords = []
             topics = []
             
-            for entity in entities_response.entities:
+            for entity in entities:
                 if entity.salience > 0.1:  # Only significant entities
                     if entity.type_.name in ['PERSON', 'ORGANIZATION', 'LOCATION']:
                         topics.append(entity.name.lower())
@@ -104,7 +425,9 @@ class AIAnalyzer:
                         keywords.append(entity.name.lower())
             
             # Basic emotion mapping based on sentiment
-            emotions = self._map_emotions_from_sentiment(sentiment_score, confidence_score)
+            with timer.stage("emotions"):
+                emotions = self._map_emotions_from_sentiment(sentiment_score, confidence_score)
+            timer.publish()
             
             return AnalysisResult(
                 sentiment_score=sentiment_score,
@@ -117,86 +440,305 @@ class AIAnalyzer:
                 analysis_model="google-cloud-language-v1"
             )
             
+        except (CircuitOpenError, QuotaExceededError) as e:
+            logger.debug(f"Skipping Google Cloud analysis: {e}")
+            reason = "circuit_open" if isinstance(e, CircuitOpenError) else "quota_exceeded"
+            ANALYSIS_BACKEND.inc(backend="fallback", reason=reason)
+            return await self._analyze_with_fallback(text, language, profile)
+            
+        except asyncio.TimeoutError:
+            logger.error(f"Google Cloud analysis timed out after {settings.google_timeout_seconds}s")
+            ANALYSIS_BACKEND.inc(backend="fallback", reason="timeout")
+            return await self._analyze_with_fallback(text, language, profile)
+            
         except Exception as e:
             logger.error(f"Google Cloud analysis failed: {e}")
-            return await self._analyze_with_fallback(text, language)
+            ANALYSIS_BACKEND.inc(backend="fallback", reason="error")
+            return await self._analyze_with_fallback(text, language, profile)
             
-    async def _analyze_with_fallback(self, text: str, language: str) -> AnalysisResult:
-        """Fallback analysis using TextBlob and basic NLP"""
-        try:
-            # Use TextBlob for sentiment
-            blob = TextBlob(text)
-            sentiment_score = blob.sentiment.polarity
-            confidence_score = blob.sentiment.subjectivity
+    async def _analyze_with_fallback(self, text: str, language: str, profile: AnalysisProfile = DEFAULT_PROFILE) -> AnalysisResult:
+        """Fallback analysis, batched with concurrent fallback analyses and run off the event loop when configured"""
+        if settings.fallback_batch_size <= 1:
+            return await self._analyze_fallback_single(text, language, profile)
             
-            # Determine sentiment label
-            if sentiment_score > 0.1:
-                sentiment_label = SentimentLabel.POSITIVE
-            elif sentiment_score < -0.1:
-                sentiment_label = SentimentLabel.NEGATIVE
+        future = asyncio.get_running_loop().create_future()
+        self._fallback_queue.append((text, language, profile, future))
+        self._schedule_fallback_flush()
+        return await future
+        
+    def _schedule_fallback_flush(self):
+        """
+        Start a batch with whatever is queued at the end of this event-loop iteration,
+        as long as a worker is free. While all workers are busy the queue grows, so
+        batches get larger under load without delaying a lone request.
+        """
+        max_batches = self.fallback_workers if self.executor is not None else 1
+        if not self._fallback_flush_scheduled and self._fallback_batches < max_batches:
+            self._fallback_flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush_fallback_queue)
+            
+    def _flush_fallback_queue(self):
+        self._fallback_flush_scheduled = False
+        max_batches = self.fallback_workers if self.executor is not None else 1
+        while self._fallback_queue and self._fallback_batches < max_batches:
+            batch = self._fallback_queue[:settings.fallback_batch_size]
+            del self._fallback_queue[:len(batch)]
+            self._fallback_batches += 1
+            task = asyncio.ensure_future(self._run_fallback_batch(batch))
+            self._fallback_tasks.add(task)
+            task.add_done_callback(self._fallback_tasks.discard)
+            
+    async def _run_fallback_batch(self, batch: List[Tuple[str, str, AnalysisProfile, asyncio.Future]]):
+        # Callers that were cancelled while queued are dropped
+        batch = [entry for entry in batch if not entry[3].done()]
+        items = [(text, language, profile) for text, language, profile, _ in batch]
+        try:
+            if not items:
+                return
+            if self.executor is None or sum(len(text) for text, _, _ in items) <= settings.fallback_inline_max_chars:
+                timer = StageTimer()
+                results = self._analyze_fallback_batch_sync(items, timer)
             else:
-                sentiment_label = SentimentLabel.NEUTRAL
+                results, timer = await self._run_in_executor(_run_fallback_batch, items)
+            timer.publish()
+            
+            for (_, _, _, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+                    
+        except asyncio.CancelledError:
+            for _, _, _, future in batch:
+                future.cancel()
+            raise
+            
+        except Exception as e:
+            logger.error(f"Fallback batch of {len(items)} reviews failed: {e}")
+            for _, _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+                    
+        finally:
+            self._fallback_batches -= 1
+            if self._fallback_queue:
+                self._schedule_fallback_flush()
+                
+    async def _analyze_fallback_single(self, text: str, language: str, profile: AnalysisProfile = DEFAULT_PROFILE) -> AnalysisResult:
+        """One fallback analysis, without batching"""
+        if self.executor is None or len(text) <= settings.fallback_inline_max_chars:
+            timer = StageTimer()
+            result = self._analyze_fallback_sync(text, language, profile, timer)
+            timer.publish()
+            return result
+            
+        result, timer = await self._run_in_executor(_run_fallback_analysis, text, language, profile)
+        timer.publish()
+        return result
+
+    async def _run_in_executor(self, function, *args):
+        """Run ``function`` on the fallback executor, once more on a restarted pool if the pool broke"""
+        executor = self.executor
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(executor, function, *args)
+        except BrokenProcessPool:
+            executor = await self._restart_executor(executor)
+            if executor is None:
+                raise
+        return await loop.run_in_executor(executor, function, *args)
+
+    async def _restart_executor(self, broken: Executor) -> Optional[Executor]:
+        """
+        Replace a broken process pool and return the executor to use. Concurrent callers
+        that saw the same pool break share one restart.
+        """
+        async with self._executor_lock:
+            if self.executor is broken:
+                logger.error("Fallback process pool is broken, restarting workers")
+                broken.shutdown(wait=False, cancel_futures=True)
+                self.executor = None
+                await self._setup_fallback_executor()
+            return self.executor
+            
+    def _analyze_fallback_sync(
+        self,
+        text: str,
+        language: str,
+        profile: AnalysisProfile = DEFAULT_PROFILE,
+        timer: Optional[StageTimer] = None
+    ) -> AnalysisResult:
+        """CPU-bound part of the fallback analysis"""
+        timer = timer or StageTimer()
+        route = language_pipelines.route(language)
+        if route != ENGLISH:
+            result = self._analyze_pipeline_batch(language_pipelines.get(route), [(text, language, profile)], timer)[0]
+            if isinstance(result, Exception):
+                raise result
+            return result
+        try:
+            # Polarity / subjectivity with TextBlob's PatternAnalyzer semantics
+            with timer.stage("sentiment"):
+                sentiment_score, confidence_score = sentiment_engine.score(text)
                 
             # Extract keywords using basic NLP
-            keywords = self._extract_keywords_basic(text)
-            topics = self._extract_topics_basic(text)
-            emotions = self._map_emotions_from_sentiment(sentiment_score, confidence_score)
+            with timer.stage("keywords"):
+                keywords = self._extract_keywords_basic(text, profile.keyword_index)
+            with timer.stage("topics"):
+                topics = self._extract_topics_basic(text, profile.taxonomy)
             
-            return AnalysisResult(
-                sentiment_score=sentiment_score,
-                sentiment_label=sentiment_label,
-                confidence_score=confidence_score,
-                keywords=keywords,
-                topics=topics,
-                emotions=emotions,
-                language_code=language,
-                analysis_model="textblob-fallback"
-            )
+            return self._fallback_result(sentiment_score, confidence_score, keywords, topics, language, timer)
             
         except Exception as e:
             logger.error(f"Fallback analysis failed: {e}")
             raise
             
-    def _extract_keywords_basic(self, text: str) -> List[str]:
-        """Extract keywords using basic text processing"""
-        # Remove common stop words
-        stop_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 
-            'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'be', 
-            'been', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 
-            'could', 'should', 'can', 'may', 'might', 'must', 'this', 'that', 
-            'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they'
-        }
+    def _analyze_fallback_batch_sync(
+        self,
+        items: List[Tuple[str, str, AnalysisProfile]],
+        timer: Optional[StageTimer] = None
+    ) -> List[Any]:
+        """Fallback analysis of many texts, grouped by language so each group is scored in one pass"""
+        timer = timer or StageTimer()
+        groups: Dict[str, List[int]] = {}
+        for position, (_, language, _) in enumerate(items):
+            groups.setdefault(language_pipelines.route(language), []).append(position)
+            
+        results: List[Any] = [None] * len(items)
+        for route, positions in groups.items():
+            group = [items[position] for position in positions]
+            if route == ENGLISH:
+                group_results = self._analyze_english_batch(group, timer)
+            else:
+                group_results = self._analyze_pipeline_batch(language_pipelines.get(route), group, timer)
+            for position, result in zip(positions, group_results):
+                results[position] = result
+        return results
         
-        # Clean and tokenize
-        words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
-        words = [word for word in words if word not in stop_words]
+    def _analyze_english_batch(self, items: List[Tuple[str, str, AnalysisProfile]], timer: StageTimer) -> List[Any]:
+        """TextBlob-compatible sentiment in one pass, and one keyword pass per IDF index"""
+        texts = [text for text, _, _ in items]
+        with timer.stage("sentiment_batch"):
+            scores = sentiment_engine.score_batch(texts)
+        with timer.stage("keywords_batch"):
+            keywords = self._extract_keywords_grouped(texts, [profile.keyword_index for _, _, profile in items])
+            
+        results: List[Any] = []
+        for (text, language, profile), (sentiment_score, confidence_score), text_keywords in zip(items, scores, keywords):
+            try:
+                with timer.stage("topics"):
+                    topics = self._extract_topics_basic(text, profile.taxonomy)
+                results.append(self._fallback_result(sentiment_score, confidence_score, text_keywords, topics, language, timer))
+            except Exception as e:
+                logger.error(f"Fallback analysis failed: {e}")
+                results.append(e)
+        return results
         
+    def _analyze_pipeline_batch(
+        self,
+        pipeline: LanguagePipeline,
+        items: List[Tuple[str, str, AnalysisProfile]],
+        timer: StageTimer
+    ) -> List[Any]:
+        """Fallback analysis with a language's own lexicon, stop words and topics"""
+        texts = [text for text, _, _ in items]
+        with timer.stage("sentiment_batch"):
+            tokens = [pipeline.tokenize(text) for text in texts]
+            scores = pipeline.score_batch(texts, tokens) if pipeline.has_sentiment else [(0.0, 0.0)] * len(texts)
+        with timer.stage("keywords_batch"):
+            keywords = [pipeline.keywords(text, tokens=text_tokens) for text, text_tokens in zip(texts, tokens)]
+            
+        results: List[Any] = []
+        for (text, language, profile), (sentiment_score, confidence_score), text_keywords in zip(items, scores, keywords):
+            try:
+                with timer.stage("topics"):
+                    topics = pipeline.topics(text)
+                    if profile.taxonomy != DEFAULT_TAXONOMY:
+                        # Custom taxonomies may list terms in any language
+                        custom = self._extract_topics_basic(text, profile.taxonomy)
+                        topics = (custom + [topic for topic in topics if topic not in custom])[:5]
+                results.append(self._fallback_result(sentiment_score, confidence_score, text_keywords, topics, language, timer))
+            except Exception as e:
+                logger.error(f"Fallback analysis failed: {e}")
+                results.append(e)
+        return results
+        
+    def _fallback_result(
+        self,
+        sentiment_score: float,
+        confidence_score: float,
+        keywords: List[str],
+        topics: List[str],
+        language: str,
+        timer: StageTimer
+    ) -> AnalysisResult:
+        # Determine sentiment label
+        if sentiment_score > 0.1:
+            sentiment_label = SentimentLabel.POSITIVE
+        elif sentiment_score < -0.1:
+            sentiment_label = SentimentLabel.NEGATIVE
+        else:
+            sentiment_label = SentimentLabel.NEUTRAL
+            
+        with timer.stage("emotions"):
+            emotions = self._map_emotions_from_sentiment(sentiment_score, confidence_score)
+            
+        return AnalysisResult(
+            sentiment_score=sentiment_score,
+            sentiment_label=sentiment_label,
+            confidence_score=confidence_score,
+            keywords=keywords,
+            topics=topics,
+            emotions=emotions,
+            language_code=language,
+            analysis_model="textblob-fallback"
+        )
+        
+    def _extract_keywords_basic(self, text: str, keyword_index: Optional[str] = None) -> List[str]:
+        """Extract keywords with TF-IDF when an IDF index is available, else by term frequency"""
+        engine = keyword_registry.get(keyword_index)
+        if engine is not None:
+            keywords = engine.score_batch([text])[0]
+            if keywords:
+                return keywords
+                
+        return self._term_frequency_keywords(text)
+        
+    @staticmethod
+    def _term_frequency_keywords(text: str) -> List[str]:
         # Get most common words
-        word_counts = Counter(words)
-        keywords = [word for word, count in word_counts.most_common(10)]
+        word_counts = Counter(tokenize(text))
+        return [word for word, count in word_counts.most_common(10)]
         
+    def _extract_keywords_grouped(self, texts: List[str], keyword_indexes: List[Optional[str]]) -> List[List[str]]:
+        """Keywords for texts that may use different IDF indexes, one sparse transform per index"""
+        groups: Dict[Optional[str], List[int]] = {}
+        for position, keyword_index in enumerate(keyword_indexes):
+            groups.setdefault(keyword_index, []).append(position)
+            
+        keywords: List[List[str]] = [[] for _ in texts]
+        for keyword_index, positions in groups.items():
+            engine = keyword_registry.get(keyword_index)
+            scored = engine.score_batch([texts[position] for position in positions]) if engine is not None else [None] * len(positions)
+            for position, text_keywords in zip(positions, scored):
+                keywords[position] = text_keywords or self._term_frequency_keywords(texts[position])
         return keywords
         
-    def _extract_topics_basic(self, text: str) -> List[str]:
-        """Extract basic topics based on keywords"""
-        text_lower = text.lower()
-        
-        topic_keywords = {
-            'product_quality': ['quality', 'good', 'bad', 'excellent', 'poor', 'defective'],
-            'shipping': ['delivery', 'shipping', 'fast', 'slow', 'arrived', 'delayed'],
-            'customer_service': ['service', 'support', 'staff', 'helpful', 'rude', 'friendly'],
-            'price': ['price', 'cost', 'expensive', 'cheap', 'value', 'money'],
-            'packaging': ['packaging', 'box', 'wrapped', 'damaged', 'package'],
-            'website': ['website', 'online', 'app', 'interface', 'easy', 'difficult']
-        }
+    def extract_keywords_batch(self, texts: List[str], sme_id: Optional[int] = None) -> List[List[str]]:
+        """Keywords for many texts at once; one sparse transform when an IDF index is loaded"""
+        engine = keyword_registry.get(keyword_registry.resolve(sme_id))
+        if engine is None:
+            return [self._extract_keywords_basic(text) for text in texts]
+        return [
+            keywords or self._extract_keywords_basic(text)
+            for text, keywords in zip(texts, engine.score_batch(texts))
+        ]
         
-        topics = []
-        for topic, keywords in topic_keywords.items():
-            if any(keyword in text_lower for keyword in keywords):
-                topics.append(topic)
-                
-        return topics[:5]
+    def _extract_topics_basic(self, text: str, taxonomy: str = DEFAULT_TAXONOMY) -> List[str]:
+        """Extract topics with the compiled keyword taxonomy, most frequent first"""
+        return taxonomy_registry.get(taxonomy).extract(text, limit=5)
         
     def _map_emotions_from_sentiment(self, sentiment_score: float, confidence: float) -> Dict[str, float]:
         """Map sentiment to basic emotions"""
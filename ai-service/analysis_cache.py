@@ -0,0 +1,222 @@
+import os
+import logging
+import hashlib
+import sqlite3
+import threading
+import time
+import re
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Callable, Awaitable, Tuple
+import asyncio
+
+from config import settings
+from models import AnalysisResult
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_text(text: str) -> str:
+    """Normalise review text so trivially different copies share a cache entry"""
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+def cache_key(text: str, language: str, analysis_model: str, variant: str = "") -> str:
+    """Content hash of the normalised text, language, analysis model and analysis variant"""
+    payload = f"{analysis_model}\x1f{variant}\x1f{language or ''}\x1f{normalize_text(text)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def content_hash(text: str, language: str, variant: str = "") -> str:
+    """SHA-256 of what an analysis depends on apart from the model: normalised text, language and variant"""
+    return cache_key(text, language, "", variant)
+
+class SQLiteCacheStore:
+    """On-disk cache tier shared between workers and kept across restarts"""
+
+    def __init__(self, path: str, ttl_seconds: float):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS analysis_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self.purge_expired()
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM analysis_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row and time.time() - row[1] > self.ttl_seconds:
+            return None
+        return row
+
+    def set(self, key: str, value: str, created_at: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analysis_cache (key, value, created_at) VALUES (?, ?, ?)",
+                (key, value, created_at)
+            )
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM analysis_cache WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            )
+        return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class AnalysisCache:
+    """
+    Two-tier result cache for AIAnalyzer.analyze_text: a bounded in-process LRU
+    with TTL, backed by an optional SQLite store.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        disk_path: Optional[str] = None
+    ):
+        self.max_entries = max_entries if max_entries is not None else settings.cache_max_entries
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.cache_ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[AnalysisResult, float]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.disk: Optional[SQLiteCacheStore] = None
+
+        disk_path = disk_path if disk_path is not None else settings.cache_disk_path
+        if disk_path:
+            try:
+                self.disk = SQLiteCacheStore(disk_path, self.ttl_seconds)
+            except sqlite3.Error as e:
+                logger.error(f"Disk cache unavailable at {disk_path}: {e}")
+
+        self.stats = {
+            'hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'coalesced': 0,
+        }
+
+    async def get_or_compute(
+        self,
+        text: str,
+        language: str,
+        analysis_model: str,
+        compute: Callable[[], Awaitable[AnalysisResult]],
+        variant: str = ""
+    ) -> AnalysisResult:
+        """Return a cached result or compute it once, sharing it with concurrent identical calls"""
+        key = cache_key(text, language, analysis_model, variant)
+
+        result = self._get_memory(key)
+        if result is not None:
+            self.stats['hits'] += 1
+            return result
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.stats['coalesced'] += 1
+        else:
+            # Detached from the caller, so cancelling the request that started it does not cancel it for waiters
+            pending = asyncio.ensure_future(self._load(key, analysis_model, compute))
+            self._inflight[key] = pending
+            pending.add_done_callback(lambda task: self._finish_inflight(key, task))
+        return await asyncio.shield(pending)
+
+    async def _load(
+        self,
+        key: str,
+        analysis_model: str,
+        compute: Callable[[], Awaitable[AnalysisResult]]
+    ) -> AnalysisResult:
+        result = await self._get_disk(key)
+        if result is not None:
+            self.stats['disk_hits'] += 1
+            self._set_memory(key, result)
+            return result
+
+        self.stats['misses'] += 1
+        result = await compute()
+        # Results from a degraded path (e.g. Google falling back to TextBlob) are not cached
+        if result.analysis_model == analysis_model:
+            await self._set_disk(key, result)
+            self._set_memory(key, result)
+        return result
+
+    def _finish_inflight(self, key: str, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved when every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def _get_memory(self, key: str) -> Optional[AnalysisResult]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        result, stored_at = entry
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            self.stats['expirations'] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        return result
+
+    def _set_memory(self, key: str, result: AnalysisResult):
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (result, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    async def _get_disk(self, key: str) -> Optional[AnalysisResult]:
+        if self.disk is None:
+            return None
+        try:
+            row = await asyncio.to_thread(self.disk.get, key)
+            return AnalysisResult.model_validate_json(row[0]) if row else None
+        except Exception as e:
+            logger.warning(f"Disk cache read failed: {e}")
+            return None
+
+    async def _set_disk(self, key: str, result: AnalysisResult):
+        if self.disk is None:
+            return
+        try:
+            await asyncio.to_thread(self.disk.set, key, result.model_dump_json(), time.time())
+        except Exception as e:
+            logger.warning(f"Disk cache write failed: {e}")
+
+    def clear(self):
+        self._entries.clear()
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
+            self.disk = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats['hits'] + self.stats['disk_hits'] + self.stats['misses']
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'disk_enabled': self.disk is not None,
+            'hit_ratio': round((self.stats['hits'] + self.stats['disk_hits']) / lookups, 4) if lookups else 0.0,
+            **self.stats,
+        }
@@ -0,0 +1,207 @@
+import os
+import json
+import time
+import uuid
+import logging
+import asyncio
+import argparse
+from datetime import datetime, date
+from typing import Optional, Dict, Any, List, get_args
+
+from config import settings
+from database import DatabaseManager
+from batch_processor import BatchProcessor
+from models import ReviewAnalysisRequest, BackfillRequest, ReviewStatus
+from external_writes import external_write_marker
+
+logger = logging.getLogger(__name__)
+
+class BackfillCheckpoint:
+    """Progress of a backfill run, persisted as JSON after every page so a run can resume"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.state: Dict[str, Any] = {
+            "last_id": 0,
+            "status": "pending",
+            "pages": 0,
+            "processed": 0,
+            "success_count": 0,
+            "error_count": 0,
+            "started_at": None,
+            "updated_at": None,
+            "finished_at": None,
+            "error": None,
+        }
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as handle:
+                self.state.update(json.load(handle))
+
+    def save(self):
+        self.state["updated_at"] = time.time()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Write-then-rename so a crash never leaves a truncated checkpoint
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as handle:
+            json.dump(self.state, handle)
+        os.replace(temporary, self.path)
+
+class BackfillPipeline:
+    """
+    Streams reviews that need analysis from customer_reviews in keyset pages,
+    analyzes each page with the batch processor (bulk result writes), optionally
+    updates review statuses in bulk, and checkpoints after every page. Only the
+    current and the prefetched page are held in memory.
+    """
+
+    def __init__(self, db: DatabaseManager, batch_processor: BatchProcessor, options: BackfillRequest, checkpoint: BackfillCheckpoint):
+        self.db = db
+        self.batch_processor = batch_processor
+        self.options = options
+        self.checkpoint = checkpoint
+        self.page_size = max(1, options.page_size or settings.backfill_page_size)
+        # Stale results usually still match their content hash, so they are only reanalyzed when forced
+        self.force = options.force or options.stale_before is not None
+
+    async def _fetch_page(self, after_id: int) -> List[Dict[str, Any]]:
+        return await self.db.fetch_reviews_for_analysis(
+            after_id=after_id,
+            limit=self.page_size,
+            sme_id=self.options.sme_id,
+            date_from=self.options.date_from,
+            date_to=self.options.date_to,
+            stale_before=self.options.stale_before,
+            analysis_model=self.options.analysis_model
+        )
+
+    async def run(self) -> Dict[str, Any]:
+        state = self.checkpoint.state
+        state["status"] = "running"
+        state["started_at"] = state["started_at"] or time.time()
+        state["error"] = None
+        self.checkpoint.save()
+
+        try:
+            page = await self._fetch_page(state["last_id"])
+            while page:
+                # Read the next page while this one is being analyzed
+                next_page = asyncio.create_task(self._fetch_page(page[-1]["id"]))
+                try:
+                    await self._process_page(page)
+                except BaseException:
+                    next_page.cancel()
+                    raise
+                page = await next_page
+
+            state["status"] = "completed"
+            state["finished_at"] = time.time()
+            logger.info(f"Backfill completed: {state['processed']} reviews in {state['pages']} pages")
+
+        except asyncio.CancelledError:
+            state["status"] = "cancelled"
+            raise
+        except Exception as e:
+            state["status"] = "failed"
+            state["error"] = str(e)
+            logger.error(f"Backfill failed after review {state['last_id']}: {e}")
+            raise
+        finally:
+            self.checkpoint.save()
+
+        return state
+
+    async def _process_page(self, page: List[Dict[str, Any]]):
+        requests = [
+            ReviewAnalysisRequest(
+                review_id=row["id"],
+                content=row["content"],
+                language_code=self.options.language_code,
+                sme_id=row["sme_id"]
+            )
+            for row in page if row["content"]
+        ]
+        response = await self.batch_processor.process(requests, self.db, force=self.force)
+
+        if self.options.set_status:
+            analyzed = [result["review_id"] for result in response.results if result["status"] == "success"]
+            await self.db.update_review_statuses(analyzed, self.options.set_status)
+
+        state = self.checkpoint.state
+        state["last_id"] = page[-1]["id"]
+        state["pages"] += 1
+        state["processed"] += len(page)
+        state["success_count"] += response.success_count
+        state["error_count"] += response.error_count + (len(page) - len(requests))
+        self.checkpoint.save()
+
+def checkpoint_path(run_id: str) -> str:
+    return os.path.join(settings.backfill_checkpoint_dir, f"{run_id}.json")
+
+def new_run_id() -> str:
+    return datetime.utcnow().strftime("%Y%m%d%H%M%S") + "-" + uuid.uuid4().hex[:6]
+
+async def run_backfill(options: BackfillRequest, run_id: str, db: DatabaseManager, batch_processor: BatchProcessor) -> Dict[str, Any]:
+    """Run (or resume) the backfill identified by ``run_id``"""
+    checkpoint = BackfillCheckpoint(checkpoint_path(run_id))
+    checkpoint.state.setdefault("options", json.loads(options.model_dump_json()))
+    return await BackfillPipeline(db, batch_processor, options, checkpoint).run()
+
+def read_backfill_status(run_id: str) -> Optional[Dict[str, Any]]:
+    path = checkpoint_path(run_id)
+    if not os.path.exists(path):
+        return None
+    return {"run_id": run_id, **BackfillCheckpoint(path).state}
+
+async def _main(args: argparse.Namespace):
+    from ai_analyzer import AIAnalyzer
+
+    run_id = args.resume or new_run_id()
+    if args.resume:
+        saved = read_backfill_status(run_id)
+        if saved is None:
+            raise SystemExit(f"No checkpoint for backfill run {run_id}")
+        options = BackfillRequest(**saved.get("options", {}))
+    else:
+        options = BackfillRequest(
+            sme_id=args.sme_id,
+            date_from=args.date_from,
+            date_to=args.date_to,
+            stale_before=args.stale_before,
+            analysis_model=args.analysis_model,
+            language_code=args.language_code,
+            set_status=args.set_status,
+            force=args.force,
+            page_size=args.page_size
+        )
+
+    analyzer = AIAnalyzer()
+    await analyzer.initialize()
+    db = DatabaseManager()
+    db.external_writes = external_write_marker()
+    await db.connect()
+    try:
+        logger.info(f"Starting backfill run {run_id}")
+        state = await run_backfill(options, run_id, db, BatchProcessor(analyzer))
+        print(json.dumps({"run_id": run_id, **state}, indent=2, default=str))
+    finally:
+        await analyzer.shutdown()
+        await db.disconnect()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyze reviews stored in customer_reviews")
+    parser.add_argument("--sme-id", type=int, default=None)
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat, default=None, help="Review date lower bound (inclusive)")
+    parser.add_argument("--to", dest="date_to", type=date.fromisoformat, default=None, help="Review date upper bound (exclusive)")
+    parser.add_argument("--stale-before", type=datetime.fromisoformat, default=None, help="Reanalyze results processed before this time")
+    parser.add_argument("--analysis-model", default=None, help="Reanalyze results produced by another model")
+    parser.add_argument("--language-code", default=None, help="Language of every review; detected per review when omitted")
+    parser.add_argument("--set-status", default=None, choices=get_args(ReviewStatus))
+    parser.add_argument("--force", action="store_true", help="Reanalyze reviews whose stored result is current")
+    parser.add_argument("--page-size", type=int, default=None)
+    parser.add_argument("--resume", metavar="RUN_ID", default=None, help="Resume a previous run from its checkpoint")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(args))
@@ -0,0 +1,174 @@
+import logging
+import asyncio
+import time
+from typing import List, Dict, Any, Optional
+
+from config import settings
+from database import DatabaseManager
+from ai_analyzer import AIAnalyzer, AnalysisKey
+from models import ReviewAnalysisRequest, BatchAnalysisResponse
+
+logger = logging.getLogger(__name__)
+
+class BatchProcessor:
+    """Runs review analysis for a batch with a bounded number of reviews in flight"""
+
+    def __init__(self, analyzer: AIAnalyzer, concurrency: Optional[int] = None):
+        self.analyzer = analyzer
+        self.concurrency = max(1, concurrency or settings.batch_concurrency)
+
+    async def process(
+        self,
+        requests: List[ReviewAnalysisRequest],
+        db: DatabaseManager,
+        force: bool = False
+    ) -> BatchAnalysisResponse:
+        """
+        Analyze and store every review, returning per-item results in input order.
+        With ``force``, reviews whose stored result is current are reanalyzed too.
+        """
+        concurrency = self.concurrency
+        if not self.analyzer.use_google_cloud:
+            # Fallback analyses are batched per worker, so more reviews in flight only make batches larger
+            concurrency = max(concurrency, settings.fallback_batch_size)
+        semaphore = asyncio.Semaphore(concurrency)
+        started = time.perf_counter()
+
+        if not self.analyzer.ready:
+            await self.analyzer.ensure_initialized()
+        keys = [self._analysis_key(request) for request in requests]
+        current = {} if force else await self._current_analyses(requests, keys, db)
+
+        async def run(request: ReviewAnalysisRequest, key: Optional[AnalysisKey]) -> Dict[str, Any]:
+            stored = current.get(request.review_id)
+            if stored is not None and key is not None and stored["content_hash"] == key.content_hash:
+                return self._unchanged(request, stored)
+            async with semaphore:
+                return await self._analyze_one(request, key)
+
+        results = await asyncio.gather(*(run(request, key) for request, key in zip(requests, keys)))
+        await self._store_results(results, db)
+
+        success_count = sum(1 for result in results if result["status"] == "success")
+        unchanged_count = sum(1 for result in results if result.get("unchanged"))
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"Batch of {len(results)} reviews finished in {elapsed:.2f}s "
+            f"(concurrency={concurrency}, unchanged={unchanged_count}, errors={len(results) - success_count})"
+        )
+
+        return BatchAnalysisResponse(
+            results=[self._public_result(result) for result in results],
+            total_processed=len(results),
+            success_count=success_count,
+            error_count=len(results) - success_count
+        )
+
+    def _analysis_key(self, request: ReviewAnalysisRequest) -> Optional[AnalysisKey]:
+        """None when the review cannot be analyzed; _analyze_one then reports why"""
+        try:
+            return self.analyzer.analysis_key(request.content, request.language_code, request.sme_id, request.industry)
+        except Exception:
+            return None
+
+    async def _current_analyses(
+        self,
+        requests: List[ReviewAnalysisRequest],
+        keys: List[Optional[AnalysisKey]],
+        db: DatabaseManager
+    ) -> Dict[int, Dict[str, Any]]:
+        """Stored results that are still current, read in one query"""
+        if not settings.analysis_skip_unchanged:
+            return {}
+        analysis_model = self.analyzer.analysis_model
+        wanted = {
+            request.review_id: (key.content_hash, analysis_model)
+            for request, key in zip(requests, keys) if key is not None
+        }
+        try:
+            return await db.get_current_analyses(wanted, fields=["id", "sentiment_label"])
+        except Exception as e:
+            logger.warning(f"Could not read stored analyses ({e}), analyzing the whole batch")
+            return {}
+
+    @staticmethod
+    def _unchanged(request: ReviewAnalysisRequest, stored: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "review_id": request.review_id,
+            "analysis_id": stored["id"],
+            "status": "success",
+            "unchanged": True,
+            "sentiment": stored["sentiment_label"],
+            "duplicate_cluster_id": None
+        }
+
+    async def _analyze_one(self, request: ReviewAnalysisRequest, key: Optional[AnalysisKey] = None) -> Dict[str, Any]:
+        """Analyze a single review; failures are reported, never raised"""
+        try:
+            analysis_result = await self.analyzer.analyze_text(
+                text=request.content,
+                language=key.language if key is not None else request.language_code,
+                sme_id=request.sme_id,
+                industry=request.industry,
+                review_id=request.review_id
+            )
+
+            return {
+                "review_id": request.review_id,
+                "status": "success",
+                "sentiment": analysis_result.sentiment_label,
+                "duplicate_cluster_id": analysis_result.duplicate_cluster_id,
+                "_analysis": analysis_result
+            }
+
+        except Exception as e:
+            logger.error(f"Error in batch analysis for review {request.review_id}: {str(e)}")
+            return {
+                "review_id": request.review_id,
+                "status": "error",
+                "error": str(e)
+            }
+
+    async def _store_results(self, results: List[Dict[str, Any]], db: DatabaseManager):
+        """Write all new analyses with the bulk upsert path"""
+        pending = [result for result in results if result["status"] == "success" and not result.get("unchanged")]
+        if not pending:
+            return
+
+        try:
+            analysis_ids = await db.store_analysis_results_bulk(
+                [(result["review_id"], result["_analysis"]) for result in pending]
+            )
+            for result, analysis_id in zip(pending, analysis_ids):
+                result["analysis_id"] = analysis_id
+
+        except Exception as e:
+            # Retry row by row so one bad row does not fail the whole batch
+            logger.warning(f"Bulk store failed ({e}), storing batch results individually")
+            for result in pending:
+                try:
+                    result["analysis_id"] = await db.store_analysis_result(
+                        review_id=result["review_id"],
+                        analysis_result=result["_analysis"]
+                    )
+                except Exception as item_error:
+                    logger.error(f"Error storing analysis for review {result['review_id']}: {str(item_error)}")
+                    result["status"] = "error"
+                    result["error"] = str(item_error)
+
+    @staticmethod
+    def _public_result(result: Dict[str, Any]) -> Dict[str, Any]:
+        """Drop internal fields before returning a batch item to the client"""
+        if result["status"] != "success":
+            return {key: value for key, value in result.items() if key not in ("_analysis", "sentiment", "duplicate_cluster_id")}
+        public = {
+            "review_id": result["review_id"],
+            "analysis_id": result["analysis_id"],
+            "status": "success",
+            "sentiment": result["sentiment"]
+        }
+        if result.get("unchanged"):
+            public["unchanged"] = True
+        if result["duplicate_cluster_id"] is not None:
+            public["duplicate_cluster_id"] = result["duplicate_cluster_id"]
+        return public
@@ -0,0 +1 @@
+"""Benchmark suite for the analysis service (run with `python -m benchmarks.run` from ai-service/)"""
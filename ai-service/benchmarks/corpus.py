@@ -0,0 +1,149 @@
+import json
+import math
+import random
+import argparse
+from typing import Optional, Dict, Any, List
+
+# Share of reviews per language, roughly what the SMEs on the platform receive
+LANGUAGE_MIX: Dict[str, float] = {"en": 0.65, "fr": 0.2, "ar": 0.1, "es": 0.05}
+
+# Review length in words is log-normal: most reviews are a sentence or two, a few are essays
+MEDIAN_WORDS = 30
+LENGTH_SIGMA = 0.9
+MIN_WORDS = 3
+MAX_WORDS = 900
+
+SENTIMENT_MIX = {"positive": 0.55, "negative": 0.3, "neutral": 0.15}
+
+PHRASES: Dict[str, Dict[str, List[str]]] = {
+    "en": {
+        "positive": [
+            "excellent quality and the staff were really friendly",
+            "fast delivery and the package arrived well wrapped",
+            "great value for the money, I would buy again",
+            "the support team was helpful and solved my problem",
+            "the website is easy to use and checkout was quick",
+        ],
+        "negative": [
+            "poor quality, the product was defective after a week",
+            "shipping was slow and the box arrived damaged",
+            "too expensive for what you get",
+            "customer service was rude and never answered my emails",
+            "the app keeps crashing and the interface is difficult",
+        ],
+        "neutral": [
+            "the order arrived on the expected date",
+            "I contacted the store about the size of the item",
+            "the product matches the description on the website",
+            "payment was made by card at the counter",
+        ],
+    },
+    "fr": {
+        "positive": [
+            "excellente qualité et le personnel était très aimable",
+            "livraison rapide et colis bien emballé",
+            "très bon rapport qualité prix",
+        ],
+        "negative": [
+            "qualité médiocre, le produit est tombé en panne",
+            "livraison en retard et carton abîmé",
+            "service client désagréable et injoignable",
+        ],
+        "neutral": [
+            "la commande est arrivée à la date prévue",
+            "j'ai payé par carte au magasin",
+        ],
+    },
+    "ar": {
+        "positive": [
+            "جودة ممتازة والموظفون لطفاء جدا",
+            "توصيل سريع والطرد وصل في حالة جيدة",
+        ],
+        "negative": [
+            "الجودة سيئة والمنتج تعطل بسرعة",
+            "التوصيل متأخر وخدمة العملاء لا ترد",
+        ],
+        "neutral": [
+            "وصل الطلب في الموعد المحدد",
+        ],
+    },
+    "es": {
+        "positive": [
+            "excelente calidad y el personal muy amable",
+            "entrega rápida y buen precio",
+        ],
+        "negative": [
+            "mala calidad y el envío llegó tarde",
+            "el servicio al cliente fue grosero",
+        ],
+        "neutral": [
+            "el pedido llegó en la fecha prevista",
+        ],
+    },
+}
+
+def _weighted(rng: random.Random, weights: Dict[str, float]) -> str:
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+def _review_text(rng: random.Random, language: str, sentiment: str) -> str:
+    target = int(rng.lognormvariate(math.log(MEDIAN_WORDS), LENGTH_SIGMA))
+    target = max(MIN_WORDS, min(MAX_WORDS, target))
+    phrases = PHRASES[language]
+    sentences: List[str] = []
+    words = 0
+    while words < target:
+        # Mostly on-sentiment with some mixed and neutral sentences, like real reviews
+        pool = sentiment if rng.random() < 0.7 else _weighted(rng, SENTIMENT_MIX)
+        sentence = rng.choice(phrases[pool])
+        sentences.append(sentence[0].upper() + sentence[1:] + ".")
+        words += len(sentence.split())
+    return " ".join(sentences)
+
+def generate_corpus(
+    count: int,
+    seed: int = 42,
+    sme_count: int = 20,
+    language_mix: Optional[Dict[str, float]] = None
+) -> List[Dict[str, Any]]:
+    """Deterministic synthetic reviews shaped like ReviewAnalysisRequest payloads"""
+    rng = random.Random(seed)
+    language_mix = language_mix or LANGUAGE_MIX
+    corpus = []
+    for review_id in range(1, count + 1):
+        language = _weighted(rng, language_mix)
+        corpus.append({
+            "review_id": review_id,
+            "content": _review_text(rng, language, _weighted(rng, SENTIMENT_MIX)),
+            "language_code": language,
+            "sme_id": rng.randint(1, sme_count),
+        })
+    return corpus
+
+def describe_corpus(corpus: List[Dict[str, Any]]) -> Dict[str, Any]:
+    lengths = sorted(len(review["content"]) for review in corpus)
+    languages: Dict[str, int] = {}
+    for review in corpus:
+        languages[review["language_code"]] = languages.get(review["language_code"], 0) + 1
+    return {
+        "reviews": len(corpus),
+        "chars_p50": lengths[len(lengths) // 2] if lengths else 0,
+        "chars_p95": lengths[int(len(lengths) * 0.95)] if lengths else 0,
+        "chars_max": lengths[-1] if lengths else 0,
+        "languages": languages,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic review corpus as NDJSON (usable with /analyze/stream)")
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="-")
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.count, args.seed)
+    lines = "".join(json.dumps(review, ensure_ascii=False) + "\n" for review in corpus)
+    if args.output == "-":
+        print(lines, end="")
+    else:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(lines)
+        print(json.dumps(describe_corpus(corpus), indent=2))
@@ -0,0 +1,93 @@
+import os
+import time
+import random
+import asyncio
+import tempfile
+from array import array
+from typing import Dict, Any, List
+
+from benchmarks.stats import summarize
+from models import AnalysisResult, SentimentLabel
+from near_duplicates import NearDuplicateIndex
+
+NAMESPACE = "benchmark|default|en"
+
+def _fill(index: NearDuplicateIndex, size: int, seed: int, chunk_size: int = 50000):
+    """Bulk-load random representatives so the index has production-like size without analyzing them"""
+    rng = random.Random(seed)
+    result = AnalysisResult(
+        sentiment_score=0.0, sentiment_label=SentimentLabel.NEUTRAL, confidence_score=0.0,
+        keywords=[], topics=[], emotions={}, language_code="en", analysis_model="benchmark"
+    ).model_dump_json()
+    conn = index.store._conn
+    now = time.time()
+    for offset in range(0, size, chunk_size):
+        clusters, buckets = [], []
+        for cluster_id in range(offset + 1, min(offset + chunk_size, size) + 1):
+            signature = array("I", (rng.getrandbits(32) for _ in range(index.hasher.num_perm)))
+            clusters.append((cluster_id, None, signature.tobytes(), result, now, now))
+            buckets.extend((bucket, cluster_id) for bucket in index.hasher.buckets(signature, NAMESPACE))
+        conn.execute("BEGIN")
+        conn.executemany(
+            "INSERT INTO clusters (cluster_id, review_id, signature, result, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+            clusters
+        )
+        conn.executemany("INSERT OR IGNORE INTO lsh_buckets (bucket, cluster_id) VALUES (?, ?)", buckets)
+        conn.execute("COMMIT")
+
+def _edit(text: str, rng: random.Random) -> str:
+    """A near-duplicate: one word replaced"""
+    words = text.split()
+    words[rng.randrange(len(words))] = "really"
+    return " ".join(words)
+
+async def run_dedup(corpus: List[Dict[str, Any]], index_size: int = 100000, seed: int = 42) -> Dict[str, Dict[str, Any]]:
+    """Signature and lookup latency of the near-duplicate index holding ``index_size`` representatives"""
+    results: Dict[str, Dict[str, Any]] = {}
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as directory:
+        index = NearDuplicateIndex(path=os.path.join(directory, "near_duplicates.sqlite3"))
+        try:
+            _fill(index, index_size, seed)
+            texts = [review["content"] for review in corpus]
+
+            fingerprints = []
+            latencies = []
+            started = time.perf_counter()
+            for text in texts:
+                call_started = time.perf_counter()
+                fingerprints.append(index.fingerprint(text, NAMESPACE))
+                latencies.append(time.perf_counter() - call_started)
+            results["dedup.fingerprint"] = summarize(latencies, len(texts), time.perf_counter() - started)
+
+            # Reviews below min_tokens are not looked up
+            texts = [text for text, fingerprint in zip(texts, fingerprints) if fingerprint is not None]
+            fingerprints = [fingerprint for fingerprint in fingerprints if fingerprint is not None]
+
+            # Lookups that miss, then index the corpus and look up edited copies that hit
+            for name in ("dedup.lookup[miss]", "dedup.lookup[near_duplicate]"):
+                if name.endswith("[near_duplicate]"):
+                    for fingerprint in fingerprints:
+                        index.store.add(fingerprint, None, "{}", index.threshold, index.max_candidates)
+                    edited = (index.fingerprint(_edit(text, rng), NAMESPACE) for text in texts)
+                    fingerprints = [fingerprint for fingerprint in edited if fingerprint is not None]
+                latencies = []
+                started = time.perf_counter()
+                for fingerprint in fingerprints:
+                    call_started = time.perf_counter()
+                    index.store.find(fingerprint, index.threshold, index.max_candidates)
+                    latencies.append(time.perf_counter() - call_started)
+                results[name] = summarize(latencies, len(fingerprints), time.perf_counter() - started)
+        finally:
+            index.close()
+
+    for result in results.values():
+        result["index_size"] = index_size
+    return results
+
+if __name__ == "__main__":
+    from benchmarks.corpus import generate_corpus
+    from benchmarks.stats import format_table
+
+    report = {"benchmarks": asyncio.run(run_dedup(generate_corpus(2000)))}
+    print(format_table(report))
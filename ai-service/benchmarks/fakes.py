@@ -0,0 +1,120 @@
+import asyncio
+import random
+import zlib
+from types import SimpleNamespace
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple
+
+from config import settings
+from models import AnalysisResult
+
+class FakeGoogleBackend:
+    """
+    Stand-in for GoogleLanguageBackend with the same admit/request/get_stats
+    interface. Latency is log-normal around ``median_latency_ms``; results are
+    derived from the text so repeated runs analyze identically.
+    """
+
+    def __init__(self, median_latency_ms: float = 80.0, latency_sigma: float = 0.4, error_rate: float = 0.0, seed: int = 42):
+        self.median_latency_ms = median_latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+
+    async def admit(self):
+        return
+
+    async def request(self, text: str, language: str) -> Tuple[Any, List[Any]]:
+        self.requests += 1
+        latency = self.rng.lognormvariate(0, self.latency_sigma) * self.median_latency_ms / 1000
+        await asyncio.sleep(latency)
+        if self.rng.random() < self.error_rate:
+            self.errors += 1
+            raise RuntimeError("Simulated Google Cloud error")
+
+        digest = zlib.crc32(text.encode("utf-8"))
+        sentiment = SimpleNamespace(score=(digest % 2001) / 1000 - 1.0, magnitude=(digest % 97) / 50)
+        words = [word.strip(".,!?").lower() for word in text.split() if len(word) > 4]
+        entities = [
+            SimpleNamespace(name=word, salience=0.5 / (rank + 1), type_=SimpleNamespace(name="OTHER"))
+            for rank, word in enumerate(dict.fromkeys(words[:8]))
+        ]
+        return sentiment, entities
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"fake": True, "requests": self.requests, "errors": self.errors}
+
+class FakeDatabase:
+    """
+    In-memory stand-in for DatabaseManager. Every statement costs a simulated
+    network round trip plus a small per-row cost, and statements queue on a
+    pool of ``DB_POOL_MAX_SIZE`` connections like the real aiomysql pool.
+    """
+
+    def __init__(self, round_trip_ms: float = 0.5, per_row_ms: float = 0.02, pool_size: Optional[int] = None):
+        self.round_trip = round_trip_ms / 1000
+        self.per_row = per_row_ms / 1000
+        self.pool = asyncio.Semaphore(pool_size or settings.db_pool_max_size)
+        self.results: Dict[int, Dict[str, Any]] = {}
+        self.next_id = 1
+        self.statements = 0
+
+    @property
+    def is_connected(self) -> bool:
+        return True
+
+    async def _statement(self, rows: int = 1):
+        async with self.pool:
+            self.statements += 1
+            await asyncio.sleep(self.round_trip + self.per_row * rows)
+
+    def _insert(self, review_id: int, result: AnalysisResult) -> int:
+        """Upsert: a review keeps its row id, like the unique review_id index"""
+        existing = self.results.get(review_id)
+        if existing is not None:
+            analysis_id = existing["id"]
+        else:
+            analysis_id = self.next_id
+            self.next_id += 1
+        self.results[review_id] = {
+            "id": analysis_id,
+            "review_id": review_id,
+            **result.model_dump(mode="json"),
+            "processed_at": datetime.utcnow().isoformat(),
+        }
+        return analysis_id
+
+    async def store_analysis_result(self, review_id: int, analysis_result: AnalysisResult) -> int:
+        await self._statement()
+        return self._insert(review_id, analysis_result)
+
+    async def store_analysis_results_bulk(self, items: List[Tuple[int, AnalysisResult]], chunk_size: Optional[int] = None) -> List[int]:
+        chunk_size = max(1, chunk_size or settings.db_bulk_chunk_size)
+        ids = []
+        for offset in range(0, len(items), chunk_size):
+            chunk = items[offset:offset + chunk_size]
+            await self._statement(len(chunk))
+            ids.extend(self._insert(review_id, result) for review_id, result in chunk)
+        return ids
+
+    async def get_analysis_result(self, review_id: int) -> Optional[Dict[str, Any]]:
+        await self._statement()
+        return self.results.get(review_id)
+
+    async def get_current_analyses(self, keys: Dict[int, Tuple[str, str]], fields: Optional[List[str]] = None) -> Dict[int, Dict[str, Any]]:
+        await self._statement(len(keys))
+        current = {}
+        for review_id, key in keys.items():
+            row = self.results.get(review_id)
+            if row is not None and row["content_hash"] is not None and (row["content_hash"], row["analysis_model"]) == key:
+                current[review_id] = row
+        return current
+
+    async def delete_analysis_result(self, review_id: int) -> bool:
+        await self._statement()
+        return self.results.pop(review_id, None) is not None
+
+    def pool_stats(self) -> Dict[str, Any]:
+        return {"connected": True, "fake": True, "statements": self.statements}
@@ -0,0 +1,110 @@
+import time
+import asyncio
+from typing import Dict, Any, List
+
+import httpx
+
+from benchmarks.fakes import FakeGoogleBackend, FakeDatabase
+from benchmarks.stats import summarize
+
+BACKENDS = ("fallback", "google")
+
+class LoadHarness:
+    """
+    Drives the real FastAPI app in-process through httpx's ASGI transport, with
+    the database dependency replaced by FakeDatabase and, in "google" mode, the
+    Google backend replaced by FakeGoogleBackend. Everything between the HTTP
+    layer and those two boundaries is the production code path.
+    """
+
+    def __init__(self, db_round_trip_ms: float = 0.5, google_latency_ms: float = 80.0, google_error_rate: float = 0.0):
+        self.db_round_trip_ms = db_round_trip_ms
+        self.google_latency_ms = google_latency_ms
+        self.google_error_rate = google_error_rate
+        self.main = None
+        self.db = None
+
+    async def start(self):
+        import main
+        from database import get_database
+
+        self.main = main
+        self.db = FakeDatabase(round_trip_ms=self.db_round_trip_ms)
+        main.app.dependency_overrides[get_database] = lambda: self.db
+        await main.ai_analyzer.initialize()
+
+    async def stop(self):
+        if self.main is not None:
+            self.main.app.dependency_overrides.clear()
+            await self.main.ai_analyzer.shutdown()
+
+    def use_backend(self, backend: str):
+        analyzer = self.main.ai_analyzer
+        if backend == "google":
+            analyzer.google_backend = FakeGoogleBackend(self.google_latency_ms, error_rate=self.google_error_rate)
+            analyzer.use_google_cloud = True
+        else:
+            analyzer.google_backend = None
+            analyzer.use_google_cloud = False
+
+    async def run(self, endpoint: str, corpus: List[Dict[str, Any]], concurrency: int, batch_size: int = 50) -> Dict[str, Any]:
+        """Closed-loop load: ``concurrency`` clients send requests back to back until the corpus is used up"""
+        if endpoint == "review":
+            path, payloads = "/analyze/review", [(review, 1) for review in corpus]
+        else:
+            path = "/analyze/batch"
+            payloads = [
+                (corpus[offset:offset + batch_size], len(corpus[offset:offset + batch_size]))
+                for offset in range(0, len(corpus), batch_size)
+            ]
+
+        pending: asyncio.Queue = asyncio.Queue()
+        for payload in payloads:
+            pending.put_nowait(payload)
+        latencies: List[float] = []
+        failures = 0
+
+        transport = httpx.ASGITransport(app=self.main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            async def client_loop():
+                nonlocal failures
+                while not pending.empty():
+                    payload, _ = pending.get_nowait()
+                    started = time.perf_counter()
+                    response = await client.post(path, json=payload)
+                    latencies.append(time.perf_counter() - started)
+                    if response.status_code != 200:
+                        failures += 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+            wall = time.perf_counter() - started
+
+        result = summarize(latencies, len(corpus), wall)
+        result.update({"concurrency": concurrency, "failed_requests": failures})
+        if endpoint == "batch":
+            result["batch_size"] = batch_size
+        return result
+
+async def run_load(
+    corpus: List[Dict[str, Any]],
+    backends: List[str],
+    concurrency: int = 32,
+    batch_size: int = 50,
+    batch_clients: int = 2,
+    db_round_trip_ms: float = 0.5,
+    google_latency_ms: float = 80.0,
+    google_error_rate: float = 0.0
+) -> Dict[str, Dict[str, Any]]:
+    """End-to-end throughput and latency of /analyze/review and /analyze/batch per analysis backend"""
+    harness = LoadHarness(db_round_trip_ms, google_latency_ms, google_error_rate)
+    await harness.start()
+    results: Dict[str, Dict[str, Any]] = {}
+    try:
+        for backend in backends:
+            harness.use_backend(backend)
+            results[f"e2e.review.{backend}"] = await harness.run("review", corpus, concurrency)
+            results[f"e2e.batch.{backend}"] = await harness.run("batch", corpus, batch_clients, batch_size)
+    finally:
+        await harness.stop()
+    return results
@@ -0,0 +1,123 @@
+import time
+import asyncio
+from typing import Dict, Any, List, Callable
+
+from ai_analyzer import AIAnalyzer, DEFAULT_PROFILE
+from sentiment_engine import sentiment_engine
+from language_detection import language_detector
+from search_index import SearchIndex, term
+from benchmarks.stats import summarize
+
+def _time_calls(func: Callable[[Dict[str, Any]], Any], corpus: List[Dict[str, Any]], warmup: int = 50) -> Dict[str, Any]:
+    for review in corpus[:warmup]:
+        func(review)
+    latencies = []
+    started = time.perf_counter()
+    for review in corpus:
+        call_started = time.perf_counter()
+        func(review)
+        latencies.append(time.perf_counter() - call_started)
+    return summarize(latencies, len(corpus), time.perf_counter() - started)
+
+async def _time_async_calls(func, corpus: List[Dict[str, Any]], warmup: int = 50) -> Dict[str, Any]:
+    for review in corpus[:warmup]:
+        await func(review)
+    latencies = []
+    started = time.perf_counter()
+    for review in corpus:
+        call_started = time.perf_counter()
+        await func(review)
+        latencies.append(time.perf_counter() - call_started)
+    return summarize(latencies, len(corpus), time.perf_counter() - started)
+
+def _time_batches(func: Callable[[List[Dict[str, Any]]], Any], corpus: List[Dict[str, Any]], batch_size: int) -> Dict[str, Any]:
+    """Like _time_calls, with one call per batch (latency percentiles are per batch)"""
+    batches = [corpus[offset:offset + batch_size] for offset in range(0, len(corpus), batch_size)]
+    for batch in batches[:2]:
+        func(batch)
+    latencies = []
+    started = time.perf_counter()
+    for batch in batches:
+        call_started = time.perf_counter()
+        func(batch)
+        latencies.append(time.perf_counter() - call_started)
+    return summarize(latencies, len(corpus), time.perf_counter() - started)
+
+async def run_micro(corpus: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Per-call cost of the fallback analysis and its building blocks, one review (or one batch) at a time"""
+    analyzer = AIAnalyzer()
+    results: Dict[str, Dict[str, Any]] = {}
+
+    # Without initialize() the analyzer has no executor, so this is the pure CPU cost
+    results["micro.analyze_with_fallback[inline]"] = await _time_async_calls(
+        lambda review: analyzer._analyze_with_fallback(review["content"], review["language_code"]), corpus
+    )
+
+    if analyzer.executor_mode != "inline":
+        await analyzer._setup_fallback_executor()
+        try:
+            results[f"micro.analyze_with_fallback[{analyzer.executor_mode}]"] = await _time_async_calls(
+                lambda review: analyzer._analyze_with_fallback(review["content"], review["language_code"]), corpus
+            )
+        finally:
+            await analyzer.shutdown()
+
+    # Sentiment alone: per-review TextBlob against the batch engine with the same semantics
+    from textblob import TextBlob
+    results["micro.sentiment[textblob]"] = _time_calls(
+        lambda review: TextBlob(review["content"]).sentiment, corpus
+    )
+    results["micro.sentiment[engine]"] = _time_calls(
+        lambda review: sentiment_engine.score(review["content"]), corpus
+    )
+    results["micro.sentiment_batch[engine]"] = _time_batches(
+        lambda batch: sentiment_engine.score_batch([review["content"] for review in batch]), corpus, 64
+    )
+    results["micro.analyze_fallback_batch"] = _time_batches(
+        lambda batch: analyzer._analyze_fallback_batch_sync(
+            [(review["content"], review["language_code"], DEFAULT_PROFILE) for review in batch]
+        ),
+        corpus, 64
+    )
+
+    results["micro.language_detection"] = _time_calls(
+        lambda review: language_detector.detect(review["content"]), corpus
+    )
+    results["micro.extract_keywords_basic"] = _time_calls(
+        lambda review: analyzer._extract_keywords_basic(review["content"]), corpus
+    )
+    results["micro.extract_topics_basic"] = _time_calls(
+        lambda review: analyzer._extract_topics_basic(review["content"]), corpus
+    )
+    # Search: index the fallback analysis of every review, then one filtered, faceted query per review
+    index = SearchIndex()
+    analyses = analyzer._analyze_fallback_batch_sync(
+        [(review["content"], review["language_code"], DEFAULT_PROFILE) for review in corpus]
+    )
+    index.apply([review["review_id"] for review in corpus], {
+        review["review_id"]: {
+            "review_id": review["review_id"], "sentiment_label": analysis.sentiment_label.value,
+            "topics": analysis.topics, "keywords": analysis.keywords, "sme_id": review["sme_id"], "review_date": None
+        }
+        for review, analysis in zip(corpus, analyses)
+    })
+    queries = [
+        [[term("sme", review["sme_id"])], [term("keyword", keyword) for keyword in analysis.keywords[:2]]]
+        for review, analysis in zip(corpus, analyses)
+    ]
+    results["micro.search"] = _time_calls(
+        lambda all_of: index.search(all_of=all_of, facets=("sentiment", "topic", "keyword"), limit=100), queries
+    )
+
+    scores = [((index % 201) / 100 - 1.0, (index % 101) / 100) for index in range(len(corpus))]
+    results["micro.map_emotions_from_sentiment"] = _time_calls(
+        lambda pair: analyzer._map_emotions_from_sentiment(*pair), scores
+    )
+    return results
+
+if __name__ == "__main__":
+    from benchmarks.corpus import generate_corpus
+    from benchmarks.stats import format_table
+
+    report = {"benchmarks": asyncio.run(run_micro(generate_corpus(2000)))}
+    print(format_table(report))
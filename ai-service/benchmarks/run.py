@@ -0,0 +1,114 @@
+import os
+import sys
+import json
+import asyncio
+import logging
+import argparse
+from datetime import datetime
+
+from config import settings
+from benchmarks.corpus import generate_corpus, describe_corpus
+from benchmarks.stats import (
+    environment, peak_rss_mb, load_report, save_report, compare, format_table, format_comparison
+)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+SUITES = ("micro", "e2e", "dedup")
+
+async def run_suites(args: argparse.Namespace) -> dict:
+    corpus = generate_corpus(args.reviews, args.seed)
+    benchmarks = {}
+
+    if "micro" in args.suites:
+        from benchmarks.micro import run_micro
+        benchmarks.update(await run_micro(corpus))
+
+    if "e2e" in args.suites:
+        from benchmarks.load import run_load
+        benchmarks.update(await run_load(
+            corpus,
+            backends=args.backends,
+            concurrency=args.concurrency,
+            batch_size=args.batch_size,
+            batch_clients=args.batch_clients,
+            db_round_trip_ms=args.db_round_trip_ms,
+            google_latency_ms=args.google_latency_ms,
+            google_error_rate=args.google_error_rate
+        ))
+
+    if "dedup" in args.suites:
+        from benchmarks.dedup import run_dedup
+        benchmarks.update(await run_dedup(corpus, index_size=args.dedup_index_size, seed=args.seed))
+
+    return {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(),
+            "corpus": {**describe_corpus(corpus), "seed": args.seed},
+            "options": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+            "settings": {
+                "fallback_executor": settings.fallback_executor,
+                "fallback_workers": settings.fallback_workers,
+                "batch_concurrency": settings.batch_concurrency,
+                "cache_enabled": settings.cache_enabled,
+                "db_bulk_chunk_size": settings.db_bulk_chunk_size,
+            },
+            "environment": environment(),
+            "peak_rss_mb": peak_rss_mb(),
+        },
+        "benchmarks": benchmarks,
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the analysis service")
+    parser.add_argument("--suites", type=lambda value: value.split(","), default=list(SUITES), help="Comma-separated: micro,e2e,dedup")
+    parser.add_argument("--reviews", type=int, default=2000, help="Synthetic reviews per benchmark")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--backends", type=lambda value: value.split(","), default=["fallback", "google"], help="Comma-separated: fallback,google")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent clients for /analyze/review")
+    parser.add_argument("--batch-size", type=int, default=50, help="Reviews per /analyze/batch request")
+    parser.add_argument("--batch-clients", type=int, default=2, help="Concurrent clients for /analyze/batch")
+    parser.add_argument("--db-round-trip-ms", type=float, default=0.5, help="Simulated MySQL statement latency")
+    parser.add_argument("--google-latency-ms", type=float, default=80.0, help="Median simulated Google Cloud latency")
+    parser.add_argument("--google-error-rate", type=float, default=0.0)
+    parser.add_argument("--dedup-index-size", type=int, default=100000, help="Representatives preloaded into the near-duplicate index")
+    parser.add_argument("--cache", action="store_true", help="Keep the result cache, near-duplicate index and unchanged-review skip enabled (off by default so every review is analyzed)")
+    parser.add_argument("--output", default=None, help="Write the report JSON here")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline report to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed relative slowdown before a metric counts as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+
+    unknown = set(args.suites) - set(SUITES)
+    if unknown:
+        parser.error(f"Unknown suites: {', '.join(sorted(unknown))}")
+
+    logging.basicConfig(level=args.log_level)
+    settings.cache_enabled = args.cache
+    settings.near_duplicate_enabled = args.cache
+    settings.analysis_skip_unchanged = args.cache
+
+    report = asyncio.run(run_suites(args))
+    print(format_table(report))
+
+    if args.output:
+        save_report(report, args.output)
+
+    regressions = []
+    if args.save_baseline:
+        save_report(report, args.baseline)
+        print(f"\nSaved baseline to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        rows = compare(report, load_report(args.baseline), args.tolerance)
+        regressions = [row for row in rows if row["regression"]]
+        print(f"\nCompared with {args.baseline} (tolerance {args.tolerance:.0%}):")
+        print(format_comparison(rows))
+
+    if regressions and args.fail_on_regression:
+        print(f"\n{len(regressions)} metric(s) regressed", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+import sys
+import json
+import platform
+from typing import Dict, Any, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Metrics where a higher value is better; every other compared metric is lower-is-better
+HIGHER_IS_BETTER = {"reviews_per_sec"}
+COMPARED_METRICS = ("reviews_per_sec", "p50_ms", "p95_ms", "p99_ms")
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Linear-interpolated percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+def peak_rss_mb() -> Dict[str, float]:
+    """Peak resident set size of this process and of its largest reaped child (fallback workers)"""
+    if resource is None:
+        return {"self": 0.0, "children": 0.0}
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {
+        "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1),
+        "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale, 1),
+    }
+
+def summarize(latencies_s: List[float], reviews: int, wall_s: float) -> Dict[str, Any]:
+    """Throughput and latency percentiles (milliseconds) of one benchmark"""
+    ordered = sorted(latencies_s)
+    return {
+        "reviews": reviews,
+        "requests": len(ordered),
+        "wall_seconds": round(wall_s, 3),
+        "reviews_per_sec": round(reviews / wall_s, 1) if wall_s > 0 else 0.0,
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+        "peak_rss_mb": peak_rss_mb()["self"],
+    }
+
+def environment() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+def load_report(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+def save_report(report: Dict[str, Any], path: str):
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2, sort_keys=True)
+        handle.write("\n")
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.1) -> List[Dict[str, Any]]:
+    """
+    Relative change of every shared benchmark metric against the baseline.
+    A change counts as a regression when it is worse than ``tolerance`` (0.1 = 10%).
+    """
+    rows = []
+    for name, result in current.get("benchmarks", {}).items():
+        reference = baseline.get("benchmarks", {}).get(name)
+        if reference is None:
+            continue
+        for metric in COMPARED_METRICS:
+            before: Optional[float] = reference.get(metric)
+            after: Optional[float] = result.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            rows.append({
+                "benchmark": name,
+                "metric": metric,
+                "baseline": before,
+                "current": after,
+                "change_pct": round(change * 100, 1),
+                "regression": worse > tolerance,
+            })
+    return rows
+
+def format_table(report: Dict[str, Any]) -> str:
+    lines = [f"{'benchmark':<32} {'reviews/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'rss MB':>8}"]
+    for name, result in report.get("benchmarks", {}).items():
+        lines.append(
+            f"{name:<32} {result['reviews_per_sec']:>10} {result['p50_ms']:>9} "
+            f"{result['p95_ms']:>9} {result['p99_ms']:>9} {result['peak_rss_mb']:>8}"
+        )
+    return "\n".join(lines)
+
+def format_comparison(rows: List[Dict[str, Any]]) -> str:
+    lines = [f"{'benchmark':<32} {'metric':<16} {'baseline':>10} {'current':>10} {'change':>8}"]
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        lines.append(
+            f"{row['benchmark']:<32} {row['metric']:<16} {row['baseline']:>10} "
+            f"{row['current']:>10} {row['change_pct']:>7}%{flag}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,171 @@
+import logging
+import time
+from collections import deque
+from typing import Optional, Dict, Any, Callable, Awaitable, Tuple, Type, TypeVar
+import asyncio
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is rejected because the circuit is open"""
+
+class CircuitBreaker:
+    """
+    Circuit breaker for an async upstream. Opens when the error rate or the slow
+    call rate over a sliding time window crosses its threshold, rejects calls
+    while open, and lets a few probe calls through once the cool-down expires.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        timeout: float,
+        error_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 2.0,
+        slow_call_rate_threshold: float = 0.5,
+        min_calls: int = 10,
+        window_seconds: float = 60.0,
+        open_seconds: float = 30.0,
+        half_open_probes: int = 3,
+        ignored_exceptions: Tuple[Type[BaseException], ...] = ()
+    ):
+        self.name = name
+        self.timeout = timeout
+        self.error_rate_threshold = error_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.ignored_exceptions = ignored_exceptions
+
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        # (finished_at, failed, slow) for every call in the window
+        self._calls: deque = deque()
+        self.stats = {
+            'calls': 0,
+            'failures': 0,
+            'timeouts': 0,
+            'slow_calls': 0,
+            'rejected': 0,
+            'opened': 0,
+        }
+
+    def is_open(self) -> bool:
+        """Whether calls are currently being rejected, without taking a probe slot"""
+        return self.state == OPEN and time.monotonic() - self.opened_at < self.open_seconds
+
+    def allow_request(self) -> bool:
+        """Whether a call may go to the upstream right now"""
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.open_seconds:
+                self.stats['rejected'] += 1
+                return False
+            self._transition(HALF_OPEN)
+
+        if self.state == HALF_OPEN:
+            if self._probes_in_flight >= self.half_open_probes:
+                self.stats['rejected'] += 1
+                return False
+            self._probes_in_flight += 1
+
+        return True
+
+    async def call(self, func: Callable[[], Awaitable[T]]) -> T:
+        """Run ``func`` under the per-call timeout, raising CircuitOpenError if the circuit is open"""
+        if not self.allow_request():
+            raise CircuitOpenError(f"Circuit '{self.name}' is open")
+
+        probe = self.state == HALF_OPEN
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(func(), timeout=self.timeout)
+        except (asyncio.CancelledError, *self.ignored_exceptions):
+            # Not a verdict on upstream health; just free the probe slot
+            if probe and self.state == HALF_OPEN:
+                self._probes_in_flight -= 1
+            raise
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            self._record(failed=True, latency=time.monotonic() - started, probe=probe)
+            raise
+        except Exception:
+            self._record(failed=True, latency=time.monotonic() - started, probe=probe)
+            raise
+
+        self._record(failed=False, latency=time.monotonic() - started, probe=probe)
+        return result
+
+    def _record(self, failed: bool, latency: float, probe: bool):
+        now = time.monotonic()
+        slow = latency >= self.slow_call_seconds
+        self.stats['calls'] += 1
+        self.stats['failures'] += int(failed)
+        self.stats['slow_calls'] += int(slow)
+
+        if probe and self.state == HALF_OPEN:
+            self._probes_in_flight -= 1
+            if failed or slow:
+                self._transition(OPEN)
+            else:
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_probes:
+                    self._transition(CLOSED)
+            return
+
+        self._calls.append((now, failed, slow))
+        self._trim(now)
+        if self.state == CLOSED and len(self._calls) >= self.min_calls:
+            error_rate, slow_rate = self._rates()
+            if error_rate >= self.error_rate_threshold or slow_rate >= self.slow_call_rate_threshold:
+                self._transition(OPEN)
+
+    def _trim(self, now: float):
+        while self._calls and now - self._calls[0][0] > self.window_seconds:
+            self._calls.popleft()
+
+    def _rates(self) -> Tuple[float, float]:
+        total = len(self._calls)
+        if not total:
+            return 0.0, 0.0
+        failures = sum(1 for _, failed, _ in self._calls if failed)
+        slow = sum(1 for _, _, is_slow in self._calls if is_slow)
+        return failures / total, slow / total
+
+    def _transition(self, state: str):
+        if state == self.state:
+            return
+        logger.warning(f"Circuit '{self.name}' {self.state} -> {state}")
+        self.state = state
+        if state == OPEN:
+            self.opened_at = time.monotonic()
+            self.stats['opened'] += 1
+        if state in (OPEN, CLOSED):
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+        if state == CLOSED:
+            self._calls.clear()
+
+    def get_state(self) -> Dict[str, Any]:
+        self._trim(time.monotonic())
+        error_rate, slow_rate = self._rates()
+        retry_in = max(0.0, self.open_seconds - (time.monotonic() - self.opened_at)) if self.state == OPEN else 0.0
+        return {
+            'name': self.name,
+            'state': self.state,
+            'window_calls': len(self._calls),
+            'error_rate': round(error_rate, 4),
+            'slow_call_rate': round(slow_rate, 4),
+            'retry_in_seconds': round(retry_in, 2),
+            **self.stats,
+        }
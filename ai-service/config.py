@@ -1,6 +1,9 @@
 import os
 from typing import Optional
-from pydantic import BaseSettings
+try:
+    from pydantic_settings import BaseSettings
+except ImportError:  # pydantic < 2
+    from pydantic import BaseSettings
 
 class Settings(BaseSettings):
     # Database settings
@@ -11,15 +14,129 @@ class Settings(BaseSettings):
     db_password: str = "password"
     db_database: str = "laravel"
     
+    # Database connection pool settings
+    db_pool_min_size: int = 2
+    db_pool_max_size: int = 10
+    db_pool_recycle: int = 3600  # seconds before an idle connection is recycled
+    db_pool_pre_ping: bool = True
+    db_connect_timeout: int = 10
+    db_bulk_chunk_size: int = 500  # rows per multi-row INSERT
+    
+    # Analysis writes (one ai_analysis_results row per review, upserted in place)
+    analysis_skip_unchanged: bool = True  # skip analysis and write when the stored result is current
+    analysis_history_enabled: bool = False  # copy replaced results to ai_analysis_results_history
+    
     # Google Cloud settings
     google_application_credentials: Optional[str] = None
     google_cloud_project: Optional[str] = None
+    google_api_endpoint: Optional[str] = None  # e.g. localhost:50051 for a local fake server
+    google_api_insecure: bool = False  # plaintext gRPC without credentials, for local fakes only
+    google_use_annotate_text: bool = True  # one annotateText call instead of sentiment + entities
+    google_timeout_seconds: float = 10.0
+    google_rate_limit_per_second: float = 10.0  # 0 = unlimited
+    google_rate_limit_burst: int = 20
+    google_quota_units: int = 0  # billable units per window, 0 = unlimited
+    google_quota_window_seconds: int = 86400
+    
+    # Circuit breaker around the Google backend
+    google_breaker_error_rate: float = 0.5
+    google_breaker_slow_call_seconds: float = 2.0
+    google_breaker_slow_call_rate: float = 0.5
+    google_breaker_min_calls: int = 10
+    google_breaker_window_seconds: float = 60.0
+    google_breaker_open_seconds: float = 30.0
+    google_breaker_half_open_probes: int = 3
     
     # AI Service settings
     max_text_length: int = 10000
-    default_language: str = "en"
+    max_text_length_policy: str = "truncate"  # "truncate" or "reject" longer texts
+    analysis_chunk_chars: int = 2000  # longer texts are analyzed in sentence-aligned chunks, 0 disables
+    default_language: str = "en"  # used when no language is given and detection is off or unsure
+    language_detection_enabled: bool = True  # detect the language of reviews sent without one
+    language_detection_min_confidence: float = 0.8
+    language_detection_min_words: int = 3  # shorter Latin-script reviews use default_language
+    language_resources_path: Optional[str] = None  # JSON with extra per-language stop words, lexicons and topics
     confidence_threshold: float = 0.5
     batch_size: int = 100
+    batch_concurrency: int = 10
+    stream_max_line_bytes: int = 1048576  # largest NDJSON record accepted by /analyze/stream
+    
+    # Fallback analyzer execution: "inline", "thread" or "process"
+    fallback_executor: str = "process"
+    fallback_workers: int = 0  # 0 = min(4, cpu count)
+    fallback_inline_max_chars: int = 280  # short texts skip the executor round-trip
+    fallback_batch_size: int = 64  # concurrent fallback analyses scored together, 1 disables batching
+    
+    # Analysis result cache
+    cache_enabled: bool = True
+    cache_max_entries: int = 10000
+    cache_ttl_seconds: int = 86400
+    cache_disk_path: Optional[str] = None  # e.g. /app/data/analysis_cache.sqlite3
+    
+    # Near-duplicate detection (MinHash / LSH) in front of the analysis
+    near_duplicate_enabled: bool = True
+    near_duplicate_path: str = "data/near_duplicates.sqlite3"
+    near_duplicate_threshold: float = 0.7  # estimated Jaccard similarity of word shingles
+    near_duplicate_num_perm: int = 120
+    near_duplicate_bands: int = 24  # num_perm / bands rows per band
+    near_duplicate_shingle_size: int = 2
+    near_duplicate_min_tokens: int = 8  # shorter reviews are left to the exact-match cache
+    near_duplicate_max_candidates: int = 20
+    
+    # Local inverted index over analysis results (/search)
+    search_index_enabled: bool = True
+    search_index_dir: str = "data/search_index"
+    search_index_compact_every: int = 50000  # journal records folded into a new snapshot
+    external_writes_path: str = "data/external_writes.json"  # touched by job workers / backfills outside the API process
+    
+    # Streaming sentiment trends and anomaly alerts (/alerts)
+    trend_monitor_enabled: bool = True
+    trend_checkpoint_path: str = "data/trends.json"
+    trend_checkpoint_seconds: float = 60.0
+    trend_bucket_seconds: int = 3600  # review date buckets
+    trend_window_buckets: int = 24  # rolling window kept per series
+    trend_ewma_alpha: float = 0.1  # weight of the newest bucket in the baseline
+    trend_z_threshold: float = 3.0  # deviations from the baseline that raise an alert
+    trend_min_buckets: int = 6  # baseline history needed before alerting
+    trend_min_reviews: int = 10  # reviews in a bucket before its average sentiment is judged
+    trend_min_mentions: int = 5  # negative mentions in a bucket before a topic spike is raised
+    trend_alert_history: int = 1000
+    
+    # Topic extraction
+    topic_taxonomy_path: Optional[str] = None  # JSON with default / per-industry / per-SME taxonomies
+    
+    # Keyword extraction
+    keyword_idf_dir: Optional[str] = None  # directory with global/ and sme_<id>/ IDF indexes
+    
+    # Analysis job queue
+    job_store_backend: str = "sqlite"
+    job_store_path: str = "data/jobs.sqlite3"
+    job_workers_in_process: bool = True  # False when workers run via `python job_queue.py`
+    job_workers: int = 2
+    job_chunk_size: int = 100
+    job_poll_interval_seconds: float = 1.0
+    job_lease_seconds: float = 600.0
+    
+    # Backfill pipeline
+    backfill_page_size: int = 500
+    backfill_checkpoint_dir: str = "data/backfill"
+    
+    # Startup: eager (warm up before serving), background (serve at once, warm up concurrently) or lazy (on first use)
+    startup_mode: str = "background"
+    
+    # Instrumentation
+    metrics_enabled: bool = True
+    event_loop_lag_interval_seconds: float = 0.5
+    
+    # Sampling profiler (toggle at runtime through /admin/profiler)
+    profiler_enabled: bool = False
+    profiler_sample_rate: float = 0.1
+    profiler_interval_seconds: float = 0.005
+    admin_token: Optional[str] = None  # required as X-Admin-Token on /admin/* when set
+    
+    # Per-SME rollups in business_metrics
+    metrics_rollups_enabled: bool = True
+    metrics_track_keywords: bool = True
     
     # API settings
     api_title: str = "BOS AI Analysis Service"
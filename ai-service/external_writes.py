@@ -0,0 +1,121 @@
+import os
+import sys
+import json
+import time
+import atexit
+import logging
+import threading
+from typing import Optional, Dict, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Writers touch the marker at most this often
+MARK_INTERVAL_SECONDS = 1.0
+
+class ExternalWriteMarker:
+    """
+    Marker file for analysis writes made outside the API process (standalone job
+    workers, the backfill CLI). The search index and the trend monitor only see
+    the writes of the process they live in, so those writers record the time of
+    their latest write in the marker and the API compares it with what its
+    consumers cover. Writes are recorded at most once per interval; the newest
+    one is flushed when the interval ends or the process exits.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.external_writes_path
+        self._lock = threading.Lock()
+        self._marked_at = 0.0
+        # Newest write not in the file yet (time, reviews), flushed once the interval passed
+        self._pending: Optional[Tuple[float, int]] = None
+        self._timer: Optional[threading.Timer] = None
+        self._warned: Dict[str, float] = {}
+        self._read: Tuple[Optional[tuple], Optional[float]] = (None, None)
+        atexit.register(self.flush)
+
+    def mark(self, reviews: int):
+        """Record that this process wrote the results of ``reviews`` reviews"""
+        now = time.time()
+        with self._lock:
+            if now - self._marked_at < MARK_INTERVAL_SECONDS:
+                self._pending = (now, reviews + (self._pending[1] if self._pending else 0))
+                if self._timer is None:
+                    self._timer = threading.Timer(self._marked_at + MARK_INTERVAL_SECONDS - now, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+            first = self._marked_at == 0.0
+            self._marked_at = now
+            self._pending = None
+            self._write(now, reviews)
+        if first:
+            logger.warning(
+                f"Analysis results written by {os.path.basename(sys.argv[0])} are not seen by the API's search "
+                f"index and sentiment trends; rebuild the index afterwards (POST /admin/search/rebuild)"
+            )
+
+    def flush(self):
+        """Write the newest throttled write, if any (after the interval and at exit)"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._pending is None:
+                return
+            written_at, reviews = self._pending
+            self._pending = None
+            self._marked_at = time.time()
+            self._write(written_at, reviews)
+
+    def _write(self, written_at: float, reviews: int):
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temporary = f"{self.path}.tmp"
+            with open(temporary, "w", encoding="utf-8") as marker:
+                json.dump({"writer": os.path.basename(sys.argv[0]), "pid": os.getpid(), "reviews": reviews, "written_at": written_at}, marker)
+            os.replace(temporary, self.path)
+        except OSError as e:
+            logger.error(f"Failed to record external analysis writes in {self.path}: {e}")
+
+    def last_write(self) -> Optional[float]:
+        """Time of the latest external write, if any (read again only when the file changed)"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        # Writers replace the file, so a new write is a new inode
+        version = (stat.st_ino, stat.st_mtime_ns)
+        if self._read[0] != version:
+            try:
+                with open(self.path, encoding="utf-8") as marker:
+                    written_at = float(json.load(marker)["written_at"])
+            except (OSError, ValueError, KeyError, TypeError):
+                written_at = stat.st_mtime
+            self._read = (version, written_at)
+        return self._read[1]
+
+    def missed_since(self, covered_until: float, consumer: str) -> Optional[float]:
+        """
+        Time of the latest external write when it is newer than ``covered_until``,
+        warning once per write the first time ``consumer`` finds it
+        """
+        written_at = self.last_write()
+        if written_at is None or written_at <= covered_until:
+            return None
+        if self._warned.get(consumer) != written_at:
+            self._warned[consumer] = written_at
+            logger.warning(
+                f"The {consumer} is missing analysis results written outside the API process "
+                f"(latest at {time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(written_at))} UTC)"
+            )
+        return written_at
+
+def external_write_marker() -> Optional[ExternalWriteMarker]:
+    """Marker for a standalone writer, when the API has consumers that would miss its writes"""
+    if settings.search_index_enabled or settings.trend_monitor_enabled:
+        return ExternalWriteMarker()
+    return None
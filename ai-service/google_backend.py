@@ -0,0 +1,203 @@
+import os
+import logging
+import time
+from typing import Optional, Dict, Any, Tuple, List
+import asyncio
+
+from config import settings
+from instrumentation import ANALYSIS_STAGE
+from startup import module_available
+
+# Google Cloud libraries are optional and slow to import; they are loaded when a client is created
+GOOGLE_CLOUD_AVAILABLE = module_available("google.cloud.language_v1")
+if not GOOGLE_CLOUD_AVAILABLE:
+    logging.warning("Google Cloud Language library not available")
+
+logger = logging.getLogger(__name__)
+
+async def _timed(stage: str, call):
+    with ANALYSIS_STAGE.time(stage=stage):
+        return await call
+
+class QuotaExceededError(RuntimeError):
+    """Raised when the client-side Google quota budget for the current window is spent"""
+
+class AsyncRateLimiter:
+    """Token bucket limiting how many Google requests are started per second"""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = float(burst or max(1, int(rate)))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: float = 1.0):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+class QuotaBudget:
+    """Fixed-window budget of billable Google units (one unit per feature per document)"""
+
+    def __init__(self, units: int, window_seconds: float):
+        self.units = units
+        self.window_seconds = window_seconds
+        self.used = 0
+        self.window_started = time.monotonic()
+
+    def consume(self, units: int):
+        if self.units <= 0:
+            return
+        now = time.monotonic()
+        if now - self.window_started >= self.window_seconds:
+            self.window_started = now
+            self.used = 0
+        if self.used + units > self.units:
+            raise QuotaExceededError(
+                f"Google quota budget of {self.units} units per {self.window_seconds:.0f}s exhausted"
+            )
+        self.used += units
+
+    @property
+    def remaining(self) -> Optional[int]:
+        return None if self.units <= 0 else max(0, self.units - self.used)
+
+class GoogleLanguageBackend:
+    """
+    Non-blocking Google Cloud Natural Language backend built on the async client.
+    Sentiment and entities come from one annotate_text call, or from two
+    concurrent calls when annotate_text is disabled.
+    """
+
+    def __init__(
+        self,
+        client,
+        rate_limiter: Optional[AsyncRateLimiter] = None,
+        quota: Optional[QuotaBudget] = None,
+        use_annotate_text: bool = True,
+        timeout: Optional[float] = None
+    ):
+        self.client = client
+        self.rate_limiter = rate_limiter
+        self.quota = quota
+        self.use_annotate_text = use_annotate_text
+        self.timeout = timeout
+        self.stats = {
+            'requests': 0,
+            'documents': 0,
+            'quota_rejections': 0,
+        }
+
+    @classmethod
+    def from_settings(cls) -> Optional["GoogleLanguageBackend"]:
+        """Build the backend from settings, or return None when Google Cloud is not usable"""
+        if not GOOGLE_CLOUD_AVAILABLE:
+            logger.warning("Google Cloud Language library not installed")
+            return None
+
+        client = cls._create_client()
+        if client is None:
+            return None
+
+        return cls(
+            client,
+            rate_limiter=AsyncRateLimiter(settings.google_rate_limit_per_second, settings.google_rate_limit_burst),
+            quota=QuotaBudget(settings.google_quota_units, settings.google_quota_window_seconds),
+            use_annotate_text=settings.google_use_annotate_text,
+            timeout=settings.google_timeout_seconds
+        )
+
+    @staticmethod
+    def _create_client():
+        endpoint = settings.google_api_endpoint
+        if endpoint and settings.google_api_insecure:
+            # Plaintext channel for a local fake Language server
+            import grpc
+            from google.cloud import language_v1
+            from google.auth.credentials import AnonymousCredentials
+            from google.cloud.language_v1.services.language_service.transports import (
+                LanguageServiceGrpcAsyncIOTransport
+            )
+            transport = LanguageServiceGrpcAsyncIOTransport(
+                channel=grpc.aio.insecure_channel(endpoint),
+                credentials=AnonymousCredentials()
+            )
+            logger.info(f"Using insecure Google Language endpoint {endpoint}")
+            return language_v1.LanguageServiceAsyncClient(transport=transport)
+
+        credentials_path = os.getenv('GOOGLE_APPLICATION_CREDENTIALS', settings.google_application_credentials)
+        if not credentials_path or not os.path.exists(credentials_path):
+            logger.warning("Google Cloud credentials not found, using fallback analysis")
+            return None
+
+        from google.cloud import language_v1
+        from google.oauth2 import service_account
+        from google.api_core.client_options import ClientOptions
+
+        credentials = service_account.Credentials.from_service_account_file(credentials_path)
+        client_options = ClientOptions(api_endpoint=endpoint) if endpoint else None
+        return language_v1.LanguageServiceAsyncClient(credentials=credentials, client_options=client_options)
+
+    async def analyze(self, text: str, language: str) -> Tuple[Any, List[Any]]:
+        """Return the document sentiment and entities for a text"""
+        await self.admit()
+        return await self.request(text, language)
+
+    async def admit(self):
+        """Charge the quota budget and wait for the rate limiter before a request"""
+        # Sentiment and entities are billed as one unit each
+        try:
+            if self.quota:
+                self.quota.consume(2)
+        except QuotaExceededError:
+            self.stats['quota_rejections'] += 1
+            raise
+
+        requests = 1 if self.use_annotate_text else 2
+        if self.rate_limiter:
+            await self.rate_limiter.acquire(requests)
+        self.stats['requests'] += requests
+
+    async def request(self, text: str, language: str) -> Tuple[Any, List[Any]]:
+        """Call the Language API for an already admitted document"""
+        from google.cloud import language_v1
+
+        document = language_v1.Document(
+            content=text,
+            type_=language_v1.Document.Type.PLAIN_TEXT,
+            language=language
+        )
+
+        self.stats['documents'] += 1
+        if self.use_annotate_text:
+            with ANALYSIS_STAGE.time(stage="google_annotate_text"):
+                response = await self.client.annotate_text(
+                    request={
+                        "document": document,
+                        "features": {"extract_document_sentiment": True, "extract_entities": True},
+                    },
+                    timeout=self.timeout
+                )
+            return response.document_sentiment, list(response.entities)
+
+        sentiment_response, entities_response = await asyncio.gather(
+            _timed("google_sentiment", self.client.analyze_sentiment(request={"document": document}, timeout=self.timeout)),
+            _timed("google_entities", self.client.analyze_entities(request={"document": document}, timeout=self.timeout))
+        )
+        return sentiment_response.document_sentiment, list(entities_response.entities)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'annotate_text': self.use_annotate_text,
+            'quota_remaining': self.quota.remaining if self.quota else None,
+            **self.stats,
+        }
@@ -0,0 +1,395 @@
+import os
+import json
+import uuid
+import time
+import sqlite3
+import logging
+import asyncio
+import argparse
+import threading
+from abc import ABC, abstractmethod
+from typing import Optional, Dict, Any, List
+
+from config import settings
+from database import DatabaseManager
+from batch_processor import BatchProcessor
+from models import ReviewAnalysisRequest
+from external_writes import external_write_marker
+
+logger = logging.getLogger(__name__)
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+class JobStore(ABC):
+    """
+    Persistence interface for analysis jobs. A job is a list of items (review ids
+    or full payloads) that workers claim in chunks and report back on.
+    """
+
+    @abstractmethod
+    async def create_job(self, items: List[Dict[str, Any]]) -> str:
+        ...
+
+    @abstractmethod
+    async def claim_items(self, worker_id: str, limit: int) -> List[Dict[str, Any]]:
+        """Atomically lease up to ``limit`` pending items"""
+
+    @abstractmethod
+    async def complete_items(self, worker_id: str, results: List[Dict[str, Any]]) -> int:
+        """
+        Record per-item outcomes and roll them up into job progress. Only items
+        still leased to ``worker_id`` are recorded; returns how many were.
+        """
+
+    @abstractmethod
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def requeue_stale(self, lease_seconds: float) -> int:
+        """Return items whose lease expired (e.g. a worker died) to the queue"""
+
+    def close(self):
+        pass
+
+class SQLiteJobStore(JobStore):
+    """Local, file-backed job store; safe to share between processes on one host"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                total INTEGER NOT NULL,
+                processed INTEGER NOT NULL DEFAULT 0,
+                succeeded INTEGER NOT NULL DEFAULT 0,
+                failed INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS job_items (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                worker_id TEXT,
+                leased_at REAL,
+                analysis_id INTEGER,
+                error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS job_items_status ON job_items (status, id);
+            CREATE INDEX IF NOT EXISTS job_items_job ON job_items (job_id, status);
+        """)
+
+    def _run(self, func, *args):
+        def locked():
+            with self._lock:
+                return func(*args)
+        return asyncio.to_thread(locked)
+
+    async def create_job(self, items: List[Dict[str, Any]]) -> str:
+        job_id = uuid.uuid4().hex
+
+        def insert():
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT INTO jobs (id, status, total, created_at) VALUES (?, ?, ?, ?)",
+                    (job_id, JOB_PENDING, len(items), time.time())
+                )
+                self._conn.executemany(
+                    "INSERT INTO job_items (job_id, payload, status) VALUES (?, ?, ?)",
+                    [(job_id, json.dumps(item), JOB_PENDING) for item in items]
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        await self._run(insert)
+        return job_id
+
+    async def claim_items(self, worker_id: str, limit: int) -> List[Dict[str, Any]]:
+        def claim():
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT id, job_id, payload FROM job_items WHERE status = ? ORDER BY id LIMIT ?",
+                    (JOB_PENDING, limit)
+                ).fetchall()
+                if rows:
+                    now = time.time()
+                    ids = [row["id"] for row in rows]
+                    marks = ",".join("?" * len(ids))
+                    self._conn.execute(
+                        f"UPDATE job_items SET status = ?, worker_id = ?, leased_at = ? WHERE id IN ({marks})",
+                        (JOB_RUNNING, worker_id, now, *ids)
+                    )
+                    job_ids = sorted({row["job_id"] for row in rows})
+                    self._conn.execute(
+                        f"UPDATE jobs SET status = ?, started_at = COALESCE(started_at, ?) "
+                        f"WHERE id IN ({','.join('?' * len(job_ids))}) AND status = ?",
+                        (JOB_RUNNING, now, *job_ids, JOB_PENDING)
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            return [
+                {"item_id": row["id"], "job_id": row["job_id"], **json.loads(row["payload"])}
+                for row in rows
+            ]
+
+        return await self._run(claim)
+
+    async def complete_items(self, worker_id: str, results: List[Dict[str, Any]]) -> int:
+        def complete():
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # job_id -> [processed, succeeded]; items whose lease was requeued and
+                # re-claimed by another worker are skipped so they are counted once
+                counts: Dict[str, List[int]] = {}
+                for result in results:
+                    succeeded = result["status"] == "success"
+                    cursor = self._conn.execute(
+                        "UPDATE job_items SET status = ?, analysis_id = ?, error = ? "
+                        "WHERE id = ? AND status = ? AND worker_id = ?",
+                        (
+                            JOB_COMPLETED if succeeded else JOB_FAILED,
+                            result.get("analysis_id"),
+                            result.get("error"),
+                            result["item_id"],
+                            JOB_RUNNING,
+                            worker_id,
+                        )
+                    )
+                    if cursor.rowcount:
+                        job_counts = counts.setdefault(result["job_id"], [0, 0])
+                        job_counts[0] += 1
+                        job_counts[1] += succeeded
+
+                now = time.time()
+                for job_id, (processed, succeeded) in counts.items():
+                    self._conn.execute(
+                        "UPDATE jobs SET processed = processed + ?, succeeded = succeeded + ?, failed = failed + ? "
+                        "WHERE id = ?",
+                        (processed, succeeded, processed - succeeded, job_id)
+                    )
+                    self._conn.execute(
+                        "UPDATE jobs SET status = CASE WHEN failed >= total THEN ? ELSE ? END, finished_at = ? "
+                        "WHERE id = ? AND processed >= total",
+                        (JOB_FAILED, JOB_COMPLETED, now, job_id)
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            return sum(processed for processed, _ in counts.values())
+
+        recorded = await self._run(complete)
+        if recorded < len(results):
+            logger.warning(
+                f"Worker {worker_id} lost the lease on {len(results) - recorded} job item(s); "
+                f"their results were not recorded"
+            )
+        return recorded
+
+    async def get_job(self, job_id: str, max_errors: int = 20) -> Optional[Dict[str, Any]]:
+        def fetch():
+            job = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if job is None:
+                return None
+            errors = self._conn.execute(
+                "SELECT payload, error FROM job_items WHERE job_id = ? AND status = ? ORDER BY id LIMIT ?",
+                (job_id, JOB_FAILED, max_errors)
+            ).fetchall()
+            return dict(job), [
+                {"review_id": json.loads(row["payload"]).get("review_id"), "error": row["error"]}
+                for row in errors
+            ]
+
+        found = await self._run(fetch)
+        if found is None:
+            return None
+
+        job, errors = found
+        elapsed = None
+        if job["started_at"]:
+            elapsed = (job["finished_at"] or time.time()) - job["started_at"]
+        return {
+            "job_id": job["id"],
+            "status": job["status"],
+            "total": job["total"],
+            "processed": job["processed"],
+            "success_count": job["succeeded"],
+            "error_count": job["failed"],
+            "progress": round(job["processed"] / job["total"], 4) if job["total"] else 1.0,
+            "reviews_per_second": round(job["processed"] / elapsed, 2) if elapsed else None,
+            "created_at": job["created_at"],
+            "started_at": job["started_at"],
+            "finished_at": job["finished_at"],
+            "errors": errors,
+        }
+
+    async def requeue_stale(self, lease_seconds: float) -> int:
+        def requeue():
+            cursor = self._conn.execute(
+                "UPDATE job_items SET status = ?, worker_id = NULL, leased_at = NULL "
+                "WHERE status = ? AND leased_at < ?",
+                (JOB_PENDING, JOB_RUNNING, time.time() - lease_seconds)
+            )
+            return cursor.rowcount
+
+        return await self._run(requeue)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def create_job_store() -> JobStore:
+    """Instantiate the configured job store backend"""
+    if settings.job_store_backend == "sqlite":
+        return SQLiteJobStore(settings.job_store_path)
+    raise ValueError(f"Unknown job store backend: {settings.job_store_backend}")
+
+class JobWorkerPool:
+    """Workers that drain the job store with the batch processor and the shared database pool"""
+
+    def __init__(
+        self,
+        store: JobStore,
+        batch_processor: BatchProcessor,
+        db: DatabaseManager,
+        workers: Optional[int] = None,
+        chunk_size: Optional[int] = None
+    ):
+        self.store = store
+        self.batch_processor = batch_processor
+        self.db = db
+        self.workers = max(1, workers or settings.job_workers)
+        self.chunk_size = max(1, chunk_size or settings.job_chunk_size)
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._worker_prefix = f"{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+    def start(self):
+        self._tasks = [
+            asyncio.create_task(self._worker(f"{self._worker_prefix}-{index}"))
+            for index in range(self.workers)
+        ]
+        self._tasks.append(asyncio.create_task(self._reaper()))
+        logger.info(f"Started {self.workers} job worker(s)")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self):
+        """Wake idle workers after a job was submitted"""
+        self._wakeup.set()
+
+    async def _worker(self, worker_id: str):
+        while True:
+            try:
+                # Cleared before claiming, so an enqueue during the claim still wakes this worker
+                self._wakeup.clear()
+                items = await self.store.claim_items(worker_id, self.chunk_size)
+                if not items:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=settings.job_poll_interval_seconds)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                results = await self._process(items)
+                await self.store.complete_items(worker_id, results)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job worker {worker_id} failed: {e}")
+                await asyncio.sleep(settings.job_poll_interval_seconds)
+
+    async def _process(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Resolve review content where only ids were given, then analyze the chunk"""
+        missing = [item["review_id"] for item in items if not item.get("content")]
+        contents = await self.db.get_review_contents(missing) if missing else {}
+
+        requests, results = [], []
+        for item in items:
+            content = item.get("content") or (contents.get(item["review_id"]) or {}).get("content")
+            if not content:
+                results.append({**item, "status": "error", "error": "Review content not found"})
+                continue
+            review = contents.get(item["review_id"]) or {}
+            requests.append((item, ReviewAnalysisRequest(
+                review_id=item["review_id"],
+                content=content,
+                language_code=item.get("language_code"),
+                sme_id=item.get("sme_id") or review.get("sme_id"),
+                industry=item.get("industry")
+            )))
+
+        # A chunk can mix items of forced and regular jobs
+        for force in (False, True):
+            group = [(item, request) for item, request in requests if bool(item.get("force")) == force]
+            if not group:
+                continue
+            response = await self.batch_processor.process([request for _, request in group], self.db, force=force)
+            for (item, _), outcome in zip(group, response.results):
+                results.append({**item, **outcome})
+        return results
+
+    async def _reaper(self):
+        lease = settings.job_lease_seconds
+        while True:
+            try:
+                requeued = await self.store.requeue_stale(lease)
+                if requeued:
+                    logger.warning(f"Requeued {requeued} job item(s) with expired leases")
+                    self.notify()
+            except Exception as e:
+                logger.error(f"Failed to requeue stale job items: {e}")
+            await asyncio.sleep(lease / 2)
+
+async def run_standalone_workers(workers: Optional[int] = None):
+    """Run a worker pool in its own process against the shared job store"""
+    from ai_analyzer import AIAnalyzer
+
+    analyzer = AIAnalyzer()
+    await analyzer.initialize()
+    db = DatabaseManager()
+    db.external_writes = external_write_marker()
+    await db.connect()
+    store = create_job_store()
+    pool = JobWorkerPool(store, BatchProcessor(analyzer), db, workers=workers)
+    pool.start()
+    try:
+        await asyncio.gather(*pool._tasks)
+    finally:
+        await pool.stop()
+        store.close()
+        await analyzer.shutdown()
+        await db.disconnect()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run analysis job workers outside the API process")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_standalone_workers(args.workers))
@@ -0,0 +1,217 @@
+import os
+import re
+import json
+import logging
+import argparse
+import asyncio
+from collections import Counter
+from datetime import datetime
+from typing import Optional, Dict, List, Iterable
+
+from config import settings
+from startup import module_available
+
+# Scientific libraries (optional - keyword extraction falls back to term frequency).
+# numpy and scikit-learn are imported when an IDF table is first built or loaded.
+SKLEARN_AVAILABLE = module_available("numpy") and module_available("sklearn")
+if not SKLEARN_AVAILABLE:
+    logging.warning("numpy/scikit-learn not available, TF-IDF keywords disabled")
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_INDEX = "global"
+
+TOKEN_PATTERN = r'\b[a-zA-Z]{3,}\b'
+_TOKEN_RE = re.compile(TOKEN_PATTERN)
+
+STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'be',
+    'been', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would',
+    'could', 'should', 'can', 'may', 'might', 'must', 'this', 'that',
+    'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they'
+})
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased alphabetic tokens of 3+ letters without stop words"""
+    return [word for word in _TOKEN_RE.findall(text.lower()) if word not in STOP_WORDS]
+
+class IDFTable:
+    """
+    Vocabulary and smoothed IDF weights computed offline from a review corpus.
+    Stored as a directory with idf.npy (memory-mapped on load), vocabulary.txt
+    (one term per line, in column order) and meta.json.
+    """
+
+    def __init__(self, vocabulary: List[str], idf, document_count: int, meta: Optional[Dict] = None):
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.document_count = document_count
+        self.meta = meta or {}
+
+    def save(self, directory: str):
+        import numpy as np
+
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "idf.npy"), np.asarray(self.idf, dtype=np.float32))
+        with open(os.path.join(directory, "vocabulary.txt"), "w", encoding="utf-8") as handle:
+            handle.write("\n".join(self.vocabulary))
+        with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as handle:
+            json.dump({**self.meta, "document_count": self.document_count, "terms": len(self.vocabulary)}, handle)
+
+    @classmethod
+    def load(cls, directory: str) -> "IDFTable":
+        import numpy as np
+
+        idf = np.load(os.path.join(directory, "idf.npy"), mmap_mode="r")
+        with open(os.path.join(directory, "vocabulary.txt"), encoding="utf-8") as handle:
+            vocabulary = handle.read().split("\n")
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as handle:
+            meta = json.load(handle)
+        if len(vocabulary) != len(idf):
+            raise ValueError(f"IDF table at {directory} is inconsistent ({len(vocabulary)} terms, {len(idf)} weights)")
+        return cls(vocabulary, idf, meta.get("document_count", 0), meta)
+
+class DocumentFrequencyCounter:
+    """Streaming document-frequency accumulator; memory grows with the vocabulary, not the corpus"""
+
+    def __init__(self):
+        self.document_frequency: Counter = Counter()
+        self.document_count = 0
+
+    def add(self, documents: Iterable[str]):
+        for document in documents:
+            self.document_frequency.update(set(tokenize(document or '')))
+            self.document_count += 1
+
+    def to_table(self, min_df: int = 2, max_terms: int = 50000, meta: Optional[Dict] = None) -> IDFTable:
+        import numpy as np
+
+        terms = sorted(
+            (term, df) for term, df in self.document_frequency.most_common(max_terms) if df >= min_df
+        )
+        df = np.array([count for _, count in terms], dtype=np.float64)
+        # Same smoothing as scikit-learn's TfidfTransformer(smooth_idf=True)
+        idf = np.log((1 + self.document_count) / (1 + df)) + 1
+        return IDFTable(
+            [term for term, _ in terms],
+            idf.astype(np.float32),
+            self.document_count,
+            {"built_at": datetime.utcnow().isoformat(), "min_df": min_df, **(meta or {})}
+        )
+
+def build_idf_table(documents: Iterable[str], min_df: int = 2, max_terms: int = 50000) -> IDFTable:
+    """Compute an IDF table from an iterable of documents in one streaming pass"""
+    counter = DocumentFrequencyCounter()
+    counter.add(documents)
+    return counter.to_table(min_df=min_df, max_terms=max_terms)
+
+class KeywordEngine:
+    """Sublinear TF-IDF keyword ranking against a precomputed IDF table"""
+
+    def __init__(self, table: IDFTable):
+        import numpy as np
+        from sklearn.feature_extraction.text import CountVectorizer
+
+        if not table.vocabulary:
+            raise ValueError("IDF table has an empty vocabulary")
+        self.table = table
+        self._terms = np.array(table.vocabulary, dtype=object)
+        self._idf = np.asarray(table.idf)
+        self._vectorizer = CountVectorizer(
+            vocabulary={term: index for index, term in enumerate(table.vocabulary)},
+            token_pattern=TOKEN_PATTERN,
+            lowercase=True
+        )
+
+    def score_batch(self, texts: List[str], top_n: int = 10) -> List[List[str]]:
+        """Top TF-IDF keywords for every text, computed with a handful of sparse/array operations"""
+        import numpy as np
+
+        if not texts:
+            return []
+
+        counts = self._vectorizer.transform(texts).tocsr()
+        counts.sum_duplicates()
+        row_lengths = np.diff(counts.indptr)
+        rows = np.repeat(np.arange(len(texts)), row_lengths)
+        scores = (1.0 + np.log(counts.data)) * self._idf[counts.indices]
+
+        # Sort every non-zero by (row, score desc) and keep the first top_n of each row
+        order = np.lexsort((-scores, rows))
+        rank = np.arange(len(order)) - counts.indptr[rows[order]]
+        keep = order[rank < top_n]
+        selected = self._terms[counts.indices[keep]]
+        bounds = np.cumsum(np.minimum(row_lengths, top_n))[:-1]
+        return [list(chunk) for chunk in np.split(selected, bounds)]
+
+class KeywordIndexRegistry:
+    """Lazily loaded keyword engines: one global index plus optional per-SME indexes"""
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory
+        self._engines: Dict[str, Optional[KeywordEngine]] = {}
+        self._available: Dict[str, bool] = {}
+
+    def _exists(self, name: str) -> bool:
+        if name not in self._available:
+            self._available[name] = os.path.isdir(os.path.join(self.directory, name))
+        return self._available[name]
+
+    def resolve(self, sme_id: Optional[int] = None) -> Optional[str]:
+        """Name of the most specific index available for an SME"""
+        if not self.directory or not SKLEARN_AVAILABLE:
+            return None
+        if sme_id is not None and self._exists(f"sme_{sme_id}"):
+            return f"sme_{sme_id}"
+        if self._exists(GLOBAL_INDEX):
+            return GLOBAL_INDEX
+        return None
+
+    def get(self, name: Optional[str]) -> Optional[KeywordEngine]:
+        if not name or not self.directory or not SKLEARN_AVAILABLE:
+            return None
+        if name not in self._engines:
+            try:
+                self._engines[name] = KeywordEngine(IDFTable.load(os.path.join(self.directory, name)))
+                logger.info(f"Loaded keyword index '{name}' ({len(self._engines[name].table.vocabulary)} terms)")
+            except (OSError, ValueError) as e:
+                logger.error(f"Failed to load keyword index '{name}': {e}")
+                self._engines[name] = None
+        return self._engines[name]
+
+# Loaded once per process from settings.keyword_idf_dir
+keyword_registry = KeywordIndexRegistry(settings.keyword_idf_dir)
+
+async def build_from_database(output_dir: str, sme_id: Optional[int] = None, min_df: int = 2, max_terms: int = 50000) -> IDFTable:
+    """Stream customer_reviews content and write an IDF table for one SME or the whole corpus"""
+    from database import DatabaseManager
+
+    db = DatabaseManager()
+    await db.connect()
+    try:
+        counter = DocumentFrequencyCounter()
+        async for rows in db.iter_review_contents(sme_id=sme_id):
+            counter.add(row['content'] for row in rows)
+    finally:
+        await db.disconnect()
+
+    table = counter.to_table(min_df=min_df, max_terms=max_terms, meta={"sme_id": sme_id})
+    table.save(output_dir)
+    logger.info(f"Wrote IDF table with {len(table.vocabulary)} terms from {table.document_count} reviews to {output_dir}")
+    return table
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute IDF statistics from customer_reviews")
+    parser.add_argument("--sme-id", type=int, default=None, help="Build an index for one SME instead of the whole corpus")
+    parser.add_argument("--output-dir", default=settings.keyword_idf_dir, help="Directory holding keyword indexes")
+    parser.add_argument("--min-df", type=int, default=2)
+    parser.add_argument("--max-terms", type=int, default=50000)
+    args = parser.parse_args()
+
+    if not args.output_dir:
+        parser.error("--output-dir is required when KEYWORD_IDF_DIR is not set")
+
+    logging.basicConfig(level=logging.INFO)
+    name = f"sme_{args.sme_id}" if args.sme_id is not None else GLOBAL_INDEX
+    asyncio.run(build_from_database(os.path.join(args.output_dir, name), args.sme_id, args.min_df, args.max_terms))
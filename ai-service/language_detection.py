@@ -0,0 +1,213 @@
+import re
+import math
+import logging
+import threading
+from collections import defaultdict
+from typing import Optional, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Most frequent words per Latin-script language, most frequent first (review vocabulary at the end).
+# Character 1-3-gram profiles are built from them with Zipf weights.
+PROFILE_WORDS: Dict[str, str] = {
+    "en": (
+        "the of and to a in is it you that he was for on are with as i his they be at one have this "
+        "from or had by not but what some we can out other were all there when up use your how said an "
+        "each she which do their time if will way about many then them would like so these her see him "
+        "has more could go come did my no most who over know than first may down been now any new "
+        "after back only our just very good great product service delivery quality price staff order "
+        "really would never again bad nice love perfect thanks ordered arrived received store recommend "
+        "highly friendly helpful fast slow late shipping worst best amazing awesome disappointed money "
+        "working broken experience customer terrible excellent happy super top ok okay fine recommended"
+    ),
+    "fr": (
+        "de la le et les des en un une du que est pour qui dans par pas au sur plus ne se ce il je elle "
+        "avec sont mais ou nous vous on a été très tout faire bien son sa ses leur cette aux comme y fait "
+        "était avait être avoir mon ma mes aussi même encore peu trop rien jamais toujours j'ai c'est "
+        "commande produit livraison merci bon bonne qualité service personnel arrivée rapide prix "
+        "vraiment jamais encore mauvais mauvaise parfait super recommande déçu client colis retard reçu "
+        "magasin vendeur accueil emballage expérience horrible excellent excellente satisfait"
+    ),
+    "es": (
+        "de la que el en y a los del se las por un para con no una su al lo como más pero sus le ya o "
+        "este fue ha muy también sí porque esta entre cuando todo ser son dos hay era tiene hasta desde "
+        "está mi nos todos uno les ni otros ese eso había ellos esto antes algunos qué unos yo otro "
+        "mucho nada muchos poco pedido producto entrega calidad servicio bueno buena llegó precio "
+        "muy bien nunca otra vez malo mala perfecto gracias recomiendo rápido rápida tarde envío tienda "
+        "atención cliente experiencia excelente horrible contento"
+    ),
+    "de": (
+        "der die und in den von zu das mit sich des auf für ist im dem nicht ein eine als auch es an "
+        "werden aus er hat dass sie nach wird bei einer um am sind noch wie einem über einen so zum war "
+        "haben nur oder aber vor zur bis mehr durch man sehr ich wir gut schnell lieferung produkt "
+        "qualität bestellung kunden preis "
+        "wirklich nie wieder schlecht super perfekt danke empfehlen schnell langsam versand geliefert "
+        "verpackung kundenservice erfahrung leider zufrieden"
+    ),
+    "it": (
+        "di e il la che in a per un è del non una le con i si da sono al della ma come anche lo ho più "
+        "gli nel se delle alla ci questo molto tutto mi ha ne dei su bene sempre stato ottimo prodotto "
+        "servizio consegna qualità ordine prezzo "
+        "davvero mai ancora male pessimo perfetto grazie consiglio veloce lento spedizione arrivato "
+        "negozio cliente esperienza ottima soddisfatto"
+    ),
+    "pt": (
+        "de a o que e do da em um para é com não uma os no se na por mais as dos como mas foi ao ele "
+        "das tem à seu sua ou ser quando muito há nos já está eu também só pelo pela até isso ela entre "
+        "era depois sem mesmo aos ter seus você produto entrega qualidade atendimento ótimo preço "
+        "realmente nunca mais ruim péssimo perfeito obrigado recomendo rápido rápida atraso chegou loja "
+        "cliente experiência excelente satisfeito"
+    ),
+    "nl": (
+        "de en van ik te dat die in een hij het niet zijn is was op aan met als voor had er maar om hem "
+        "dan zou of wat mijn dit zo door over ze zich bij ook tot je uit daar haar naar heb hoe heeft "
+        "hebben deze want nog geen omdat iets worden toch al veel meer doen goed snel levering product "
+        "kwaliteit bestelling prijs "
+        "echt nooit weer slecht perfect bedankt aanrader snelle geleverd winkel klant ervaring helaas "
+        "tevreden"
+    ),
+}
+
+# Scripts that identify a language on their own: (first code point, last code point, language)
+SCRIPT_RANGES: List[Tuple[int, int, str]] = [
+    (0x0600, 0x06FF, "ar"),
+    (0x0750, 0x077F, "ar"),
+    (0x0400, 0x04FF, "ru"),
+    (0x0370, 0x03FF, "el"),
+    (0x0590, 0x05FF, "he"),
+    (0x3040, 0x30FF, "ja"),  # kana is checked before Han, which Japanese also uses
+    (0xAC00, 0xD7AF, "ko"),
+    (0x4E00, 0x9FFF, "zh"),
+]
+SCRIPT_LANGUAGES = frozenset(language for _, _, language in SCRIPT_RANGES)
+
+MAX_NGRAM = 3
+SMOOTHING = 0.01
+TEMPERATURE = 0.5
+MAX_CACHED_WORDS = 100000
+
+_WORD_RE = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+
+def _ngrams(word: str) -> List[str]:
+    padded = f" {word} "
+    return [padded[i:i + n] for n in range(1, MAX_NGRAM + 1) for i in range(len(padded) - n + 1) if padded[i:i + n] != " "]
+
+class LanguageDetector:
+    """
+    Compact character n-gram language identifier. Non-Latin scripts are told apart
+    by their Unicode ranges; Latin-script text is scored with smoothed 1-3-gram
+    log-probabilities per language, accumulated word by word (word scores are
+    memoised, so repeated words cost one dict lookup). A word from the profile
+    vocabulary of some languages scores as well as the best of them in each, so
+    cognates ("excellent", "service") do not outvote the rest of the text.
+    """
+
+    def __init__(self, profile_words: Optional[Dict[str, str]] = None, max_words: int = 64):
+        self.max_words = max_words
+        self._profile_words = profile_words or PROFILE_WORDS
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._words: Dict[str, Tuple[float, ...]] = {}
+
+    def load(self):
+        """Build the n-gram profiles (a few thousand entries, once per process)"""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self.languages = list(self._profile_words)
+            counts: Dict[str, Dict[str, float]] = {language: defaultdict(float) for language in self.languages}
+            known: Dict[str, List[int]] = defaultdict(list)
+            for index, (language, words) in enumerate(self._profile_words.items()):
+                for word in set(words.split()):
+                    known[word].append(index)
+                for rank, word in enumerate(words.split()):
+                    weight = 1.0 / (rank + 1) ** 0.5
+                    for gram in _ngrams(word):
+                        counts[language][gram] += weight
+
+            vocabulary = set().union(*(set(grams) for grams in counts.values()))
+            totals = {language: sum(grams.values()) for language, grams in counts.items()}
+            self._unseen = tuple(
+                math.log(SMOOTHING / (totals[language] + SMOOTHING * len(vocabulary))) for language in self.languages
+            )
+            self._grams: Dict[str, Tuple[float, ...]] = {
+                gram: tuple(
+                    math.log((counts[language].get(gram, 0.0) + SMOOTHING) / (totals[language] + SMOOTHING * len(vocabulary)))
+                    for language in self.languages
+                )
+                for gram in vocabulary
+            }
+            self._known = {word: tuple(indexes) for word, indexes in known.items()}
+            self._loaded = True
+            logger.info(f"Language profiles built: {len(self.languages)} languages, {len(vocabulary)} n-grams")
+
+    def _word_scores(self, word: str) -> Tuple[float, ...]:
+        scores = self._words.get(word)
+        if scores is None:
+            totals = [0.0] * len(self.languages)
+            for gram in _ngrams(word):
+                row = self._grams.get(gram, self._unseen)
+                for index, value in enumerate(row):
+                    totals[index] += value
+            known = self._known.get(word)
+            if known:
+                best = max(totals)
+                for index in known:
+                    totals[index] = best
+            scores = tuple(totals)
+            if len(self._words) > MAX_CACHED_WORDS:
+                self._words.clear()
+            self._words[word] = scores
+        return scores
+
+    @staticmethod
+    def _script(text: str) -> Optional[str]:
+        """Language of the dominant non-Latin script, if letters of one make up most of the text"""
+        counts: Dict[str, int] = defaultdict(int)
+        letters = 0
+        for char in text[:500]:
+            if not char.isalpha():
+                continue
+            letters += 1
+            code = ord(char)
+            if code < 0x0370:
+                continue
+            for first, last, language in SCRIPT_RANGES:
+                if first <= code <= last:
+                    counts[language] += 1
+                    break
+        if not counts:
+            return None
+        language, count = max(counts.items(), key=lambda item: item[1])
+        return language if count * 2 >= letters else None
+
+    def detect(self, text: str, min_words: int = 1) -> Tuple[Optional[str], float]:
+        """
+        (language code, confidence in 0-1); (None, 0.0) when there is nothing to go on,
+        including Latin-script text of fewer than ``min_words`` words
+        """
+        self.load()
+        script = self._script(text)
+        if script is not None:
+            return script, 1.0
+
+        words = _WORD_RE.findall(text.lower())[:self.max_words]
+        if not words or len(words) < min_words:
+            return None, 0.0
+        totals = [0.0] * len(self.languages)
+        for word in words:
+            for index, value in enumerate(self._word_scores(word)):
+                totals[index] += value
+
+        # Posterior with a uniform prior, tempered so short texts get a low confidence
+        best = max(totals)
+        weights = [math.exp(TEMPERATURE * (total - best)) for total in totals]
+        index = weights.index(1.0)
+        return self.languages[index], 1.0 / sum(weights)
+
+    def detect_batch(self, texts: List[str]) -> List[Tuple[Optional[str], float]]:
+        return [self.detect(text) for text in texts]
+
+language_detector = LanguageDetector()
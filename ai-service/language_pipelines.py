@@ -0,0 +1,358 @@
+import re
+import json
+import logging
+from collections import Counter
+from typing import Optional, Dict, List, Tuple, Iterable, Callable
+
+from config import settings
+from startup import module_available
+from topic_taxonomy import TopicTaxonomy
+
+logger = logging.getLogger(__name__)
+
+# Reviews in English go through the TextBlob-compatible engine and the TF-IDF keyword indexes
+ENGLISH = "en"
+# Route of languages without a pipeline: keywords only, no sentiment
+GENERIC = "und"
+
+NUMPY_AVAILABLE = module_available("numpy")
+
+# Word roles are memoised per pipeline; the cache is cleared when it reaches this size
+MAX_CACHED_WORDS = 200000
+_NEGATION = "negation"
+_INTENSIFIER = "intensifier"
+_UNKNOWN = object()
+
+# Built-in resources per language. "sentiment" maps a word to its polarity, or to
+# [polarity, subjectivity] (subjectivity defaults to 0.6 + 0.4 * |polarity|).
+BUILTIN_LANGUAGES: Dict[str, Dict[str, object]] = {
+    "fr": {
+        "stop_words": (
+            "le la les un une des du de et ou mais en au aux dans par pour sur avec sans sous ce cet cette "
+            "ces je tu il elle nous vous ils elles on mon ma mes ton ta tes son sa ses notre nos votre vos "
+            "leur leurs qui que quoi dont où est sont était été être avoir ai as avait ont fait plus très "
+            "tout tous toute toutes aussi comme mais donc car alors ici cela ça pas ne"
+        ),
+        "negations": "ne pas jamais rien aucun aucune ni sans",
+        "intensifiers": "très trop vraiment super tellement extrêmement",
+        "sentiment": {
+            "excellent": 1.0, "excellente": 1.0, "parfait": 1.0, "parfaite": 1.0, "génial": 0.9, "géniale": 0.9,
+            "super": 0.7, "top": 0.7, "bon": 0.7, "bonne": 0.7, "bien": 0.5, "rapide": 0.5, "aimable": 0.6,
+            "sympa": 0.6, "agréable": 0.6, "satisfait": 0.6, "satisfaite": 0.6, "recommande": 0.5,
+            "merci": 0.4, "adore": 0.8, "j'adore": 0.8, "conforme": 0.3, "efficace": 0.5, "pro": 0.4,
+            "professionnel": 0.5, "impeccable": 0.9, "mauvais": -0.7, "mauvaise": -0.7, "nul": -0.8,
+            "nulle": -0.8, "médiocre": -0.7, "horrible": -1.0, "déçu": -0.7, "déçue": -0.7, "décevant": -0.7,
+            "retard": -0.5, "lent": -0.4, "lente": -0.4, "cassé": -0.7, "abîmé": -0.6, "panne": -0.6,
+            "défectueux": -0.8, "désagréable": -0.7, "injoignable": -0.6, "arnaque": -1.0, "cher": -0.3,
+            "problème": -0.4,
+        },
+        "topics": {
+            "product_quality": ["qualité", "bon", "mauvais", "excellent", "médiocre", "défectueux", "panne"],
+            "shipping": ["livraison", "livré", "rapide", "lent", "arrivé", "arrivée", "retard", "colis"],
+            "customer_service": ["service", "personnel", "accueil", "vendeur", "aimable", "désagréable", "sav"],
+            "price": ["prix", "coût", "cher", "chère", "rapport qualité prix", "argent"],
+            "packaging": ["emballage", "emballé", "carton", "abîmé", "boîte"],
+            "website": ["site", "internet", "application", "appli", "commande en ligne"],
+        },
+    },
+    "es": {
+        "stop_words": (
+            "el la los las un una unos unas de del al y o pero en por para con sin sobre este esta estos "
+            "estas ese esa eso yo tu él ella nosotros vosotros ellos ellas mi mis su sus nuestro que quien "
+            "cual es son fue era ser estar está están he ha han hay muy más también como todo todos toda "
+            "lo le les se me te nos ya no"
+        ),
+        "negations": "no nunca jamás nada ningún ninguna ni sin",
+        "intensifiers": "muy demasiado realmente súper tan",
+        "sentiment": {
+            "excelente": 1.0, "perfecto": 1.0, "perfecta": 1.0, "genial": 0.9, "bueno": 0.7, "buena": 0.7,
+            "buen": 0.7, "bien": 0.5, "rápido": 0.5, "rápida": 0.5, "amable": 0.6, "encantado": 0.8,
+            "encantada": 0.8, "recomiendo": 0.5, "gracias": 0.4, "contento": 0.6, "contenta": 0.6,
+            "satisfecho": 0.6, "satisfecha": 0.6, "malo": -0.7, "mala": -0.7, "mal": -0.6, "pésimo": -1.0,
+            "pésima": -1.0, "horrible": -1.0, "terrible": -1.0, "tarde": -0.4, "lento": -0.4, "lenta": -0.4,
+            "roto": -0.7, "rota": -0.7, "grosero": -0.7, "grosera": -0.7, "decepcionado": -0.7,
+            "decepcionada": -0.7, "caro": -0.3, "cara": -0.3, "problema": -0.4, "estafa": -1.0,
+        },
+        "topics": {
+            "product_quality": ["calidad", "bueno", "malo", "excelente", "defectuoso", "roto"],
+            "shipping": ["entrega", "envío", "rápido", "lento", "llegó", "tarde", "paquete"],
+            "customer_service": ["servicio", "atención", "personal", "amable", "grosero"],
+            "price": ["precio", "costo", "caro", "barato", "dinero"],
+            "packaging": ["embalaje", "caja", "envuelto", "dañado"],
+            "website": ["web", "página", "aplicación", "app", "en línea"],
+        },
+    },
+    "de": {
+        "stop_words": (
+            "der die das den dem des ein eine einer einem einen und oder aber in im an am auf aus bei mit "
+            "nach von vor zu zum zur für über unter durch ich du er sie es wir ihr mein dein sein ist sind "
+            "war waren wird werden hat haben hatte sich so wie als auch noch nur schon sehr mehr dass nicht"
+        ),
+        "negations": "nicht kein keine keinen nie niemals ohne",
+        "intensifiers": "sehr wirklich extrem total",
+        "sentiment": {
+            "ausgezeichnet": 1.0, "perfekt": 1.0, "hervorragend": 1.0, "super": 0.8, "toll": 0.8, "gut": 0.7,
+            "gute": 0.7, "guter": 0.7, "schnell": 0.5, "schnelle": 0.5, "freundlich": 0.6, "freundliche": 0.6,
+            "zufrieden": 0.6, "empfehlen": 0.5, "danke": 0.4, "schlecht": -0.7, "schlechte": -0.7,
+            "mangelhaft": -0.8, "schrecklich": -1.0, "furchtbar": -1.0, "enttäuscht": -0.7, "langsam": -0.4,
+            "kaputt": -0.7, "defekt": -0.8, "unfreundlich": -0.7, "teuer": -0.3, "leider": -0.3,
+            "problem": -0.4, "verspätet": -0.5,
+        },
+        "topics": {
+            "product_quality": ["qualität", "gut", "schlecht", "mangelhaft", "defekt", "kaputt"],
+            "shipping": ["lieferung", "versand", "schnell", "langsam", "geliefert", "verspätet", "paket"],
+            "customer_service": ["service", "kundenservice", "personal", "freundlich", "unfreundlich"],
+            "price": ["preis", "kosten", "teuer", "billig", "geld"],
+            "packaging": ["verpackung", "karton", "verpackt", "beschädigt"],
+            "website": ["webseite", "website", "online", "app", "shop"],
+        },
+    },
+    "ar": {
+        "stop_words": (
+            "في من على الى إلى عن مع هذا هذه ذلك تلك التي الذي هو هي هم انا أنا نحن كان كانت قد ثم او أو و "
+            "ما لم لن كل بعد قبل عند جدا"
+        ),
+        "negations": "لا لم لن ليس ليست غير ما",
+        "intensifiers": "جدا كثيرا للغاية",
+        "sentiment": {
+            "ممتاز": 1.0, "ممتازة": 1.0, "رائع": 0.9, "رائعة": 0.9, "جيد": 0.7, "جيدة": 0.7, "سريع": 0.5,
+            "سريعة": 0.5, "لطيف": 0.6, "لطفاء": 0.6, "شكرا": 0.4, "انصح": 0.5, "أنصح": 0.5, "ممتن": 0.6,
+            "سيء": -0.7, "سيئ": -0.7, "سيئة": -0.7, "رديء": -0.8, "رديئة": -0.8, "متأخر": -0.5,
+            "متأخرة": -0.5, "تعطل": -0.6, "مكسور": -0.7, "بطيء": -0.4, "غالي": -0.3, "مشكلة": -0.4,
+            "محبط": -0.7,
+        },
+        "topics": {
+            "product_quality": ["جودة", "الجودة", "المنتج", "ممتاز", "سيء", "تعطل"],
+            "shipping": ["توصيل", "التوصيل", "الشحن", "سريع", "متأخر", "الطرد", "وصل"],
+            "customer_service": ["خدمة", "خدمة العملاء", "الموظفون", "الموظفين", "لطفاء"],
+            "price": ["سعر", "السعر", "غالي", "رخيص"],
+            "packaging": ["تغليف", "التغليف", "علبة", "العلبة"],
+            "website": ["موقع", "الموقع", "تطبيق", "التطبيق"],
+        },
+    },
+}
+
+_TOKEN_RE = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+
+_ARABIC_DIACRITICS = re.compile("[\u064B-\u0652\u0640]")
+_ARABIC_LETTERS = str.maketrans({"أ": "ا", "إ": "ا", "آ": "ا", "ى": "ي"})
+
+def normalize_arabic(word: str) -> str:
+    """Strip diacritics and tatweel, unify alef and yeh forms"""
+    return _ARABIC_DIACRITICS.sub("", word).translate(_ARABIC_LETTERS)
+
+def _arabic_variants(word: str) -> Iterable[str]:
+    """The word, then without the "و" conjunction and the "ال" article"""
+    yield word
+    if word.startswith("و") and len(word) > 3:
+        word = word[1:]
+        yield word
+    if word.startswith("ال") and len(word) > 4:
+        yield word[2:]
+
+def _latin_variants(word: str) -> Iterable[str]:
+    """The word, then its singular when it ends with "s\""""
+    yield word
+    if word.endswith("s") and len(word) > 3:
+        yield word[:-1]
+
+def _identity(text: str) -> str:
+    return text
+
+NORMALIZERS: Dict[str, Callable[[str], str]] = {"ar": normalize_arabic}
+VARIANTS: Dict[str, Callable[[str], Iterable[str]]] = {"ar": _arabic_variants}
+
+def language_route(language: Optional[str]) -> str:
+    """Primary subtag of a language code ("fr-CA" -> "fr"), lower-cased"""
+    return (language or "").split("-")[0].split("_")[0].strip().lower()
+
+class LanguagePipeline:
+    """
+    Fallback analysis resources for one language: stop words, a polarity lexicon
+    with negations and intensifiers, and a topic taxonomy. Sentiment is the mean
+    polarity and subjectivity of the lexicon words, a negated word counting
+    -0.5 times its polarity as in pattern's scoring.
+    """
+
+    def __init__(
+        self,
+        code: str,
+        stop_words: Iterable[str] = (),
+        sentiment: Optional[Dict[str, object]] = None,
+        negations: Iterable[str] = (),
+        intensifiers: Iterable[str] = (),
+        topics: Optional[Dict[str, List[str]]] = None
+    ):
+        self.code = code
+        self._normalize = NORMALIZERS.get(code, _identity)
+        self._variants = VARIANTS.get(code, _latin_variants)
+        normalize = self._normalize
+        self.stop_words = frozenset(normalize(word.lower()) for word in stop_words)
+        self.negations = frozenset(normalize(word.lower()) for word in negations)
+        self.intensifiers = frozenset(normalize(word.lower()) for word in intensifiers)
+        self.lexicon: Dict[str, Tuple[float, float]] = {}
+        for word, value in (sentiment or {}).items():
+            polarity, subjectivity = (value[0], value[1]) if isinstance(value, (list, tuple)) else (value, None)
+            polarity = max(-1.0, min(float(polarity), 1.0))
+            if subjectivity is None:
+                subjectivity = 0.6 + 0.4 * abs(polarity)
+            self.lexicon[normalize(word.lower())] = (polarity, float(subjectivity))
+        self._excluded = self.stop_words | self.negations
+        self._roles: Dict[str, object] = {}
+        self.taxonomy = TopicTaxonomy(
+            f"lang:{code}",
+            {topic: [normalize(keyword.lower()) for keyword in keywords] for topic, keywords in (topics or {}).items()}
+        )
+
+    @property
+    def has_sentiment(self) -> bool:
+        return bool(self.lexicon)
+
+    def tokenize(self, text: str) -> List[str]:
+        """Normalised word tokens, stop words included"""
+        return _TOKEN_RE.findall(self._normalize(text.lower()))
+
+    def _word_role(self, word: str):
+        """_NEGATION, _INTENSIFIER, (polarity, subjectivity) or None; memoised per word"""
+        role = self._roles.get(word, _UNKNOWN)
+        if role is _UNKNOWN:
+            if word in self.negations:
+                role = _NEGATION
+            elif word in self.intensifiers:
+                role = _INTENSIFIER
+            else:
+                role = next((self.lexicon[variant] for variant in self._variants(word) if variant in self.lexicon), None)
+            if len(self._roles) > MAX_CACHED_WORDS:
+                self._roles.clear()
+            self._roles[word] = role
+        return role
+
+    def score_batch(self, texts: List[str], tokens: Optional[List[List[str]]] = None) -> List[Tuple[float, float]]:
+        """(polarity, subjectivity) of every text; the per-text means are one numpy pass"""
+        rows: List[int] = []
+        polarities: List[float] = []
+        subjectivities: List[float] = []
+        word_role = self._word_role
+        for row, words in enumerate(tokens if tokens is not None else map(self.tokenize, texts)):
+            negated = 0      # lexicon words still affected by a preceding negation
+            intensity = 1.0
+            for word in words:
+                role = word_role(word)
+                if role is None:
+                    continue
+                if role is _NEGATION:
+                    negated = 2
+                elif role is _INTENSIFIER:
+                    intensity = 1.5
+                else:
+                    polarity = max(-1.0, min(role[0] * intensity, 1.0))
+                    if negated:
+                        polarity *= -0.5
+                        negated -= 1
+                    rows.append(row)
+                    polarities.append(polarity)
+                    subjectivities.append(role[1])
+                    intensity = 1.0
+        return _row_means(rows, polarities, subjectivities, len(texts))
+
+    def keywords(self, text: str, limit: int = 10, tokens: Optional[List[str]] = None) -> List[str]:
+        """Most frequent words of 3+ letters that are not stop words"""
+        excluded = self._excluded
+        counts = Counter(
+            word for word in (tokens if tokens is not None else self.tokenize(text))
+            if len(word) >= 3 and word not in excluded
+        )
+        return [word for word, _ in counts.most_common(limit)]
+
+    def topics(self, text: str, limit: int = 5) -> List[str]:
+        return self.taxonomy.extract(self._normalize(text.lower()), limit=limit)
+
+def _row_means(rows: List[int], polarities: List[float], subjectivities: List[float], count: int) -> List[Tuple[float, float]]:
+    """Mean polarity and subjectivity per row; rows without lexicon words score 0"""
+    if NUMPY_AVAILABLE and rows:
+        import numpy as np
+        rows_array = np.array(rows, dtype=np.int64)
+        divisor = np.maximum(np.bincount(rows_array, minlength=count), 1)
+        polarity = np.bincount(rows_array, weights=polarities, minlength=count) / divisor
+        subjectivity = np.bincount(rows_array, weights=subjectivities, minlength=count) / divisor
+        return list(zip(polarity.tolist(), subjectivity.tolist()))
+
+    sums = [[0.0, 0.0, 0] for _ in range(count)]
+    for row, polarity, subjectivity in zip(rows, polarities, subjectivities):
+        sums[row][0] += polarity
+        sums[row][1] += subjectivity
+        sums[row][2] += 1
+    return [(p / (n or 1), s / (n or 1)) for p, s, n in sums]
+
+def _split(value) -> List[str]:
+    return value.split() if isinstance(value, str) else list(value or [])
+
+class LanguagePipelineRegistry:
+    """
+    Built-in pipelines plus languages defined or extended in a JSON file mapping a
+    language code to {"stop_words": [...], "negations": [...], "intensifiers": [...],
+    "sentiment": {"word": polarity}, "topics": {"topic": [...]}}. English is not a
+    pipeline: it keeps the TextBlob-compatible engine and the TF-IDF indexes.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self._config: Dict[str, Dict[str, object]] = {code: dict(config) for code, config in BUILTIN_LANGUAGES.items()}
+        if path:
+            self.load(path)
+        self._pipelines: Dict[str, LanguagePipeline] = {}
+        self._generic = LanguagePipeline(GENERIC)
+
+    def load(self, path: str):
+        try:
+            with open(path, encoding="utf-8") as handle:
+                config = json.load(handle)
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to load language resources from {path}: {e}")
+            return
+
+        for code, resources in config.items():
+            code = language_route(code)
+            merged = self._config.setdefault(code, {})
+            for key in ("stop_words", "negations", "intensifiers"):
+                if key in resources:
+                    merged[key] = _split(merged.get(key)) + _split(resources[key])
+            for key in ("sentiment", "topics"):
+                if key in resources:
+                    merged[key] = {**(merged.get(key) or {}), **resources[key]}
+        logger.info(f"Loaded language resources for {', '.join(sorted(config))} from {path}")
+
+    @property
+    def languages(self) -> List[str]:
+        return sorted(self._config)
+
+    def route(self, language: Optional[str]) -> str:
+        """ENGLISH, the code of a language with a pipeline, or GENERIC"""
+        code = language_route(language)
+        if code == ENGLISH:
+            return ENGLISH
+        return code if code in self._config else GENERIC
+
+    def has_sentiment(self, language: Optional[str]) -> bool:
+        """Whether the fallback analyzer can score the sentiment of this language"""
+        route = self.route(language)
+        return route == ENGLISH or self.get(route).has_sentiment
+
+    def get(self, route: str) -> LanguagePipeline:
+        """Pipeline for a route returned by route() (GENERIC for anything unknown)"""
+        if route not in self._config:
+            return self._generic
+        pipeline = self._pipelines.get(route)
+        if pipeline is None:
+            config = self._config[route]
+            pipeline = self._pipelines[route] = LanguagePipeline(
+                route,
+                stop_words=_split(config.get("stop_words")),
+                sentiment=config.get("sentiment"),
+                negations=_split(config.get("negations")),
+                intensifiers=_split(config.get("intensifiers")),
+                topics=config.get("topics")
+            )
+        return pipeline
+
+# Built once per process from settings.language_resources_path
+language_pipelines = LanguagePipelineRegistry(settings.language_resources_path)
@@ -1,19 +1,41 @@
-from fastapi import FastAPI, HTTPException, Depends
+from startup import startup_tracker, PROCESS_STARTED
+from fastapi import FastAPI, HTTPException, Depends, Request, Query, Header
+from fastapi.responses import StreamingResponse, PlainTextResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 import os
-from datetime import datetime
+import time
+import secrets
+import asyncio
+from datetime import datetime, date
 import logging
 
-from database import get_database, DatabaseManager
+from database import get_database, db_manager, DatabaseManager
 from ai_analyzer import AIAnalyzer
-from models import ReviewAnalysisRequest, ReviewAnalysisResponse, HealthResponse
+from text_segmenter import TextTooLongError
+from batch_processor import BatchProcessor
+from stream_processor import StreamProcessor, format_ndjson, format_sse
+from job_queue import create_job_store, JobWorkerPool
+from backfill import run_backfill, read_backfill_status, new_run_id
+from search_index import SearchIndex, search_arguments
+from trend_monitor import TrendMonitor
+from external_writes import ExternalWriteMarker
+from config import settings
+from instrumentation import registry, record_state, EventLoopLagMonitor, HTTP_REQUESTS, HTTP_LATENCY
+from profiler import profiler
+from models import (
+    ReviewAnalysisRequest, ReviewAnalysisResponse, HealthResponse, BatchAnalysisResponse,
+    JobCreateRequest, JobStatusResponse, BackfillRequest, ProfilerConfigRequest,
+    AnalysisQueryRequest, AnalysisDeleteRequest, SearchRequest, SearchResponse
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+startup_tracker.record("import_main", time.monotonic() - PROCESS_STARTED)
+
 # Initialize FastAPI app
 app = FastAPI(
     title="BOS AI Analysis Service",
@@ -30,16 +52,133 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def instrument_request(request: Request, call_next):
+    """Count and time requests per route template, and profile a sample of /analyze/* requests"""
+    sampled = profiler.enabled and request.url.path.startswith("/analyze/") and profiler.should_sample()
+    if not settings.metrics_enabled and not sampled:
+        return await call_next(request)
+    if sampled:
+        profiler.begin()
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        if sampled:
+            profiler.end()
+        if settings.metrics_enabled:
+            route = request.scope.get("route")
+            path = route.path if route is not None else "unmatched"
+            HTTP_LATENCY.observe(time.perf_counter() - started, method=request.method, path=path)
+            HTTP_REQUESTS.inc(method=request.method, path=path, status=status)
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Guard for /admin/* when ADMIN_TOKEN is configured"""
+    if settings.admin_token and not secrets.compare_digest(x_admin_token or "", settings.admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
 # Initialize AI Analyzer
 ai_analyzer = AIAnalyzer()
+batch_processor = BatchProcessor(ai_analyzer)
+stream_processor = StreamProcessor(ai_analyzer)
+
+# Analysis job queue (workers start on startup when running in-process)
+job_store = create_job_store()
+job_workers = JobWorkerPool(job_store, batch_processor, db_manager)
+
+# Writes of standalone job workers and backfills, which this process does not see
+external_writes = ExternalWriteMarker()
+
+# Inverted index behind /search, fed by every analysis write of this process
+search_index = SearchIndex(settings.search_index_dir) if settings.search_index_enabled else None
+db_manager.search_index = search_index
+if search_index is not None:
+    search_index.external_writes = external_writes
+search_rebuild_task: Optional[asyncio.Task] = None
+
+# Sentiment trends and anomaly alerts, fed the same way
+trend_monitor = TrendMonitor(settings.trend_checkpoint_path) if settings.trend_monitor_enabled else None
+db_manager.trend_monitor = trend_monitor
+if trend_monitor is not None:
+    trend_monitor.external_writes = external_writes
+
+# Backfill runs started through the API, by run id
+backfill_tasks: Dict[str, asyncio.Task] = {}
+
+event_loop_monitor = EventLoopLagMonitor()
+
+# Background warm-up started on startup in "background" mode
+warmup_task: Optional[asyncio.Task] = None
+
+async def warm_up():
+    """Load models and connect the database pool, recording how long each phase takes"""
+    try:
+        await ai_analyzer.ensure_initialized()
+    except Exception as e:
+        startup_tracker.error = str(e)
+        logger.error(f"Analyzer warm-up failed: {e}")
+
+    if search_index is not None:
+        with startup_tracker.timed("search_index_load"):
+            await asyncio.to_thread(search_index.load)
+    if trend_monitor is not None:
+        await asyncio.to_thread(trend_monitor.load)
+
+    # Keep retrying so an instance that started before MySQL still becomes ready
+    delay = 1.0
+    with startup_tracker.timed("database_connect"):
+        while not db_manager.is_connected:
+            try:
+                await db_manager.connect()
+            except Exception as e:
+                logger.error(f"Database pool unavailable at startup, retrying in {delay:.0f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup"""
-    logger.info("Starting AI Analysis Service...")
-    await ai_analyzer.initialize()
+    global warmup_task
+    logger.info(f"Starting AI Analysis Service ({settings.startup_mode} startup)...")
+    if settings.startup_mode == "eager":
+        await ai_analyzer.ensure_initialized()
+    if settings.startup_mode in ("eager", "background"):
+        warmup_task = asyncio.create_task(warm_up())
+    # "lazy": the analyzer initializes on the first analysis, the pool on the first query
+    if settings.job_workers_in_process:
+        job_workers.start()
+    elif search_index is not None or trend_monitor is not None:
+        logger.warning(
+            "Job workers run outside the API process (JOB_WORKERS_IN_PROCESS=false): their results do not reach "
+            "the sentiment trends, nor the search index until it is rebuilt (POST /admin/search/rebuild)"
+        )
+    if settings.metrics_enabled:
+        event_loop_monitor.start()
     logger.info("AI Analysis Service started successfully")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release shared resources on shutdown"""
+    logger.info("Stopping AI Analysis Service...")
+    for task in backfill_tasks.values():
+        task.cancel()
+    if warmup_task is not None:
+        warmup_task.cancel()
+    if search_rebuild_task is not None:
+        search_rebuild_task.cancel()
+    await event_loop_monitor.stop()
+    await job_workers.stop()
+    job_store.close()
+    await ai_analyzer.shutdown()
+    await db_manager.disconnect()
+    if search_index is not None:
+        search_index.close()
+    if trend_monitor is not None:
+        trend_monitor.close()
+
 @app.get("/", response_model=HealthResponse)
 async def root():
     """Health check endpoint"""
@@ -53,13 +192,105 @@ async def root():
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Detailed health check"""
+    google_status = ai_analyzer.get_google_status()
+    degraded = google_status is not None and google_status['circuit']['state'] != "closed"
     return HealthResponse(
-        status="healthy",
+        status="degraded" if degraded else "healthy",
         service="ai-analysis-service",
         version="1.0.0",
-        timestamp=datetime.utcnow()
+        timestamp=datetime.utcnow(),
+        database=db_manager.pool_stats(),
+        cache=ai_analyzer.cache.get_stats() if ai_analyzer.cache else None,
+        near_duplicates=ai_analyzer.near_duplicates.get_stats() if ai_analyzer.near_duplicates else None,
+        search_index=search_index.get_stats() if search_index else None,
+        trends=trend_monitor.get_stats() if trend_monitor else None,
+        google_cloud=google_status,
+        startup=startup_tracker.get_status()
     )
 
+@app.get("/health/live")
+async def liveness():
+    """
+    Liveness probe: the process is up and the event loop responds
+    """
+    return {"status": "alive", "uptime_seconds": startup_tracker.get_status()["uptime_seconds"]}
+
+@app.get("/health/ready")
+async def readiness():
+    """
+    Readiness probe: models are warm and the database pool is connected (503 until then)
+    """
+    # In lazy mode nothing warms up until traffic arrives, so the instance is ready as soon as it is alive
+    ready = settings.startup_mode == "lazy" or (ai_analyzer.ready and db_manager.is_connected)
+    body = {
+        "status": "ready" if ready else "starting",
+        "analyzer_ready": ai_analyzer.ready,
+        "database_connected": db_manager.is_connected,
+        **startup_tracker.get_status(),
+    }
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Prometheus metrics: request latency, analysis stage timings, backend selection,
+    database operations, event-loop lag and pool / cache / circuit state
+    """
+    if not settings.metrics_enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    record_state("database", db_manager.pool_stats())
+    if ai_analyzer.cache:
+        record_state("cache", ai_analyzer.cache.get_stats())
+    if ai_analyzer.near_duplicates:
+        record_state("near_duplicates", ai_analyzer.near_duplicates.get_stats())
+    google_status = ai_analyzer.get_google_status()
+    if google_status:
+        record_state("google", {key: value for key, value in google_status.items() if key != "circuit"})
+        circuit = google_status["circuit"]
+        record_state("circuit", {**circuit, "closed": circuit["state"] == "closed"})
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/admin/profiler", dependencies=[Depends(require_admin)])
+async def get_profiler_status():
+    """
+    Get sampling profiler settings and sample counts
+    """
+    return profiler.get_status()
+
+@app.post("/admin/profiler", dependencies=[Depends(require_admin)])
+async def configure_profiler(request: ProfilerConfigRequest):
+    """
+    Enable or disable the sampling profiler and change its sample rate or interval
+    """
+    profiler.configure(
+        enabled=request.enabled,
+        sample_rate=request.sample_rate,
+        interval=request.interval_ms / 1000 if request.interval_ms else None
+    )
+    return profiler.get_status()
+
+@app.delete("/admin/profiler", dependencies=[Depends(require_admin)])
+async def reset_profiler():
+    """
+    Discard collected samples
+    """
+    profiler.reset()
+    return profiler.get_status()
+
+@app.get("/admin/profiler/collapsed", response_class=PlainTextResponse, dependencies=[Depends(require_admin)])
+async def get_profiler_collapsed_stacks():
+    """
+    Collected stacks in collapsed format (input for flamegraph.pl, speedscope, inferno)
+    """
+    return PlainTextResponse(profiler.collapsed())
+
+@app.get("/admin/profiler/top", dependencies=[Depends(require_admin)])
+async def get_profiler_top(limit: int = Query(20, ge=1, le=500)):
+    """
+    Hottest functions by self samples
+    """
+    return {**profiler.get_status(), "functions": profiler.top(limit)}
+
 @app.post("/analyze/review", response_model=ReviewAnalysisResponse)
 async def analyze_review(
     request: ReviewAnalysisRequest,
@@ -71,10 +302,37 @@ async def analyze_review(
     try:
         logger.info(f"Analyzing review ID: {request.review_id}")
         
+        # Skip the analysis when the stored one is still current
+        await ai_analyzer.ensure_initialized()
+        key = ai_analyzer.analysis_key(request.content, request.language_code, request.sme_id, request.industry)
+        if settings.analysis_skip_unchanged:
+            current = await db.get_current_analyses(
+                {request.review_id: (key.content_hash, ai_analyzer.analysis_model)}
+            )
+            stored = current.get(request.review_id)
+            if stored is not None:
+                logger.info(f"Analysis of review ID {request.review_id} is unchanged")
+                return ReviewAnalysisResponse(
+                    review_id=request.review_id,
+                    analysis_id=stored['id'],
+                    sentiment_score=float(stored['sentiment_score']),
+                    sentiment_label=stored['sentiment_label'],
+                    confidence_score=float(stored['confidence_score']),
+                    keywords=stored['keywords'],
+                    topics=stored['topics'],
+                    emotions=stored['emotions'],
+                    language_code=stored['language_code'] or key.language,
+                    processed_at=stored['processed_at'] or datetime.utcnow(),
+                    unchanged=True
+                )
+        
         # Perform AI analysis
         analysis_result = await ai_analyzer.analyze_text(
             text=request.content,
-            language=request.language_code
+            language=key.language,
+            sme_id=request.sme_id,
+            industry=request.industry,
+            review_id=request.review_id
         )
         
         # Store results in database
@@ -94,17 +352,21 @@ async def analyze_review(
             topics=analysis_result.topics,
             emotions=analysis_result.emotions,
             language_code=analysis_result.language_code,
-            processed_at=datetime.utcnow()
+            processed_at=datetime.utcnow(),
+            duplicate_cluster_id=analysis_result.duplicate_cluster_id,
+            duplicate_similarity=analysis_result.duplicate_similarity
         )
         
         logger.info(f"Analysis completed for review ID: {request.review_id}")
         return response
         
+    except TextTooLongError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         logger.error(f"Error analyzing review {request.review_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
-@app.post("/analyze/batch")
+@app.post("/analyze/batch", response_model=BatchAnalysisResponse)
 async def analyze_batch_reviews(
     requests: List[ReviewAnalysisRequest],
     db: DatabaseManager = Depends(get_database)
@@ -114,41 +376,170 @@ async def analyze_batch_reviews(
     """
     try:
         logger.info(f"Batch analyzing {len(requests)} reviews")
-        
-        results = []
-        for request in requests:
-            try:
-                analysis_result = await ai_analyzer.analyze_text(
-                    text=request.content,
-                    language=request.language_code
-                )
-                
-                analysis_id = await db.store_analysis_result(
-                    review_id=request.review_id,
-                    analysis_result=analysis_result
-                )
-                
-                results.append({
-                    "review_id": request.review_id,
-                    "analysis_id": analysis_id,
-                    "status": "success",
-                    "sentiment": analysis_result.sentiment_label
-                })
-                
-            except Exception as e:
-                logger.error(f"Error in batch analysis for review {request.review_id}: {str(e)}")
-                results.append({
-                    "review_id": request.review_id,
-                    "status": "error",
-                    "error": str(e)
-                })
-        
-        return {"results": results, "total_processed": len(results)}
+        return await batch_processor.process(requests, db)
         
     except Exception as e:
         logger.error(f"Batch analysis failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Batch analysis failed: {str(e)}")
 
+@app.post("/analyze/stream")
+async def analyze_review_stream(
+    request: Request,
+    format: Optional[str] = None,
+    db: DatabaseManager = Depends(get_database)
+):
+    """
+    Analyze newline-delimited JSON reviews as they are uploaded and stream each
+    result back as soon as it is stored (NDJSON, or SSE with format=sse or
+    Accept: text/event-stream)
+    """
+    use_sse = format == "sse" or (format is None and "text/event-stream" in request.headers.get("accept", ""))
+    formatter = format_sse if use_sse else format_ndjson
+    
+    async def results():
+        async for result in stream_processor.process(request.stream(), db):
+            yield formatter(result)
+            
+    return StreamingResponse(
+        results(),
+        media_type="text/event-stream" if use_sse else "application/x-ndjson"
+    )
+
+@app.post("/jobs/analyze", response_model=JobStatusResponse, status_code=202)
+async def create_analysis_job(request: JobCreateRequest):
+    """
+    Queue reviews for background analysis and return immediately
+    """
+    items = [{"review_id": review_id} for review_id in request.review_ids]
+    items.extend(review.model_dump() for review in request.reviews)
+    if request.force:
+        for item in items:
+            item["force"] = True
+    if not items:
+        raise HTTPException(status_code=400, detail="No reviews to analyze")
+        
+    try:
+        job_id = await job_store.create_job(items)
+        job_workers.notify()
+        logger.info(f"Queued analysis job {job_id} with {len(items)} reviews")
+        return await job_store.get_job(job_id)
+        
+    except Exception as e:
+        logger.error(f"Failed to queue analysis job: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to queue analysis job")
+
+@app.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_analysis_job(job_id: str):
+    """
+    Get progress, throughput and errors of an analysis job
+    """
+    job = await job_store.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+def _start_backfill(run_id: str, request: BackfillRequest):
+    async def run():
+        try:
+            await run_backfill(request, run_id, db_manager, batch_processor)
+        except Exception:
+            pass  # recorded in the checkpoint
+        finally:
+            backfill_tasks.pop(run_id, None)
+            
+    backfill_tasks[run_id] = asyncio.create_task(run())
+
+@app.post("/backfill", status_code=202)
+async def start_backfill(request: BackfillRequest):
+    """
+    Start analyzing unanalyzed or stale reviews from customer_reviews in the background
+    """
+    run_id = new_run_id()
+    _start_backfill(run_id, request)
+    logger.info(f"Started backfill run {run_id}")
+    return {"run_id": run_id, "status": "running"}
+
+@app.post("/backfill/{run_id}/resume", status_code=202)
+async def resume_backfill(run_id: str):
+    """
+    Resume a stopped or failed backfill from its checkpoint
+    """
+    if run_id in backfill_tasks:
+        raise HTTPException(status_code=409, detail="Backfill is already running")
+    saved = read_backfill_status(run_id)
+    if saved is None:
+        raise HTTPException(status_code=404, detail="Backfill run not found")
+    _start_backfill(run_id, BackfillRequest(**saved.get("options", {})))
+    return {"run_id": run_id, "status": "running"}
+
+@app.get("/backfill/{run_id}")
+async def get_backfill_status(run_id: str):
+    """
+    Get progress of a backfill run
+    """
+    status = read_backfill_status(run_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Backfill run not found")
+    return status
+
+@app.post("/analysis/query")
+async def query_analysis_results(
+    request: AnalysisQueryRequest,
+    db: DatabaseManager = Depends(get_database)
+):
+    """
+    Get the latest analysis of many reviews (by id, or by SME and filters), one page per call
+    """
+    if request.review_ids is None and request.sme_id is None:
+        raise HTTPException(status_code=400, detail="Provide review_ids or sme_id")
+    try:
+        results = await db.get_analysis_results(
+            review_ids=request.review_ids,
+            sme_id=request.sme_id,
+            date_from=request.date_from,
+            date_to=request.date_to,
+            status=request.status,
+            fields=request.fields,
+            after_review_id=request.cursor,
+            limit=request.limit
+        )
+        full_page = len(results) == request.limit
+        return {
+            "results": results,
+            "count": len(results),
+            "next_cursor": results[-1]["review_id"] if full_page else None
+        }
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error retrieving analysis results: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve analysis results")
+
+@app.post("/analysis/delete")
+async def delete_analysis_results(
+    request: AnalysisDeleteRequest,
+    db: DatabaseManager = Depends(get_database)
+):
+    """
+    Delete the analysis results of many reviews (by id, or by SME and filters) in chunked transactions
+    """
+    if request.review_ids is None and request.sme_id is None:
+        raise HTTPException(status_code=400, detail="Provide review_ids or sme_id")
+    try:
+        deleted = await db.delete_analysis_results(
+            review_ids=request.review_ids,
+            sme_id=request.sme_id,
+            date_from=request.date_from,
+            date_to=request.date_to,
+            status=request.status
+        )
+        return {"deleted": deleted}
+        
+    except Exception as e:
+        logger.error(f"Error deleting analysis results: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to delete analysis results")
+
 @app.get("/analysis/{review_id}")
 async def get_analysis_result(
     review_id: int,
@@ -189,6 +580,99 @@ async def delete_analysis_result(
         logger.error(f"Error deleting analysis for review {review_id}: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to delete analysis")
 
+@app.get("/metrics/sme/{sme_id}")
+async def get_sme_metrics(
+    sme_id: int,
+    period_type: str = Query("daily", pattern="^(daily|weekly|monthly)$"),
+    date_from: Optional[date] = Query(None, description="First period start (inclusive)"),
+    date_to: Optional[date] = Query(None, description="Period start upper bound (exclusive)"),
+    top: int = Query(10, ge=1, le=100),
+    db: DatabaseManager = Depends(get_database)
+):
+    """
+    Get precomputed sentiment and topic rollups of an SME per period
+    """
+    try:
+        periods = await db.get_sme_metrics(sme_id, period_type, date_from, date_to, top)
+        return {"sme_id": sme_id, "period_type": period_type, "periods": periods}
+        
+    except Exception as e:
+        logger.error(f"Error retrieving metrics for SME {sme_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve metrics")
+
+@app.post("/search", response_model=SearchResponse)
+async def search_reviews(request: SearchRequest):
+    """
+    Find analyzed reviews by SME, sentiment, keywords, topics and review date, with facet counts
+    """
+    if search_index is None:
+        raise HTTPException(status_code=404, detail="Search index is disabled")
+    try:
+        if not search_index.loaded:
+            await asyncio.to_thread(search_index.load)
+        return search_index.search(**search_arguments(request))
+        
+    except Exception as e:
+        logger.error(f"Error searching reviews: {str(e)}")
+        raise HTTPException(status_code=500, detail="Search failed")
+
+@app.post("/admin/search/rebuild", status_code=202, dependencies=[Depends(require_admin)])
+async def rebuild_search_index(db: DatabaseManager = Depends(get_database)):
+    """
+    Re-index every stored analysis in the background; searches keep working meanwhile
+    """
+    global search_rebuild_task
+    if search_index is None:
+        raise HTTPException(status_code=404, detail="Search index is disabled")
+    if search_rebuild_task is not None and not search_rebuild_task.done():
+        raise HTTPException(status_code=409, detail="A rebuild is already running")
+        
+    async def run():
+        try:
+            await search_index.rebuild(db)
+        except Exception as e:
+            logger.error(f"Search index rebuild failed: {e}")
+            
+    search_rebuild_task = asyncio.create_task(run())
+    return {"status": "started"}
+
+@app.get("/alerts")
+async def get_alerts(
+    sme_id: Optional[int] = None,
+    kind: Optional[str] = Query(None, pattern="^(sentiment_drop|topic_spike)$"),
+    since: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """
+    Get recent sentiment drops and complaint topic spikes, newest first
+    """
+    if trend_monitor is None:
+        raise HTTPException(status_code=404, detail="Trend monitoring is disabled")
+    try:
+        alerts = trend_monitor.get_alerts(sme_id, kind, since, limit)
+        stale = trend_monitor.missed_writes_at() is not None
+        return {"alerts": alerts, "count": len(alerts), "stale": stale}
+        
+    except Exception as e:
+        logger.error(f"Error retrieving alerts: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve alerts")
+
+@app.get("/duplicates/{cluster_id}")
+async def get_duplicate_cluster(cluster_id: int, limit: int = Query(100, ge=1, le=1000)):
+    """
+    Get a near-duplicate cluster: its representative review and member reviews
+    """
+    if ai_analyzer.near_duplicates is None:
+        raise HTTPException(status_code=404, detail="Near-duplicate detection is disabled")
+    try:
+        cluster = await ai_analyzer.near_duplicates.get_cluster(cluster_id, limit)
+    except Exception as e:
+        logger.error(f"Error retrieving duplicate cluster {cluster_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve duplicate cluster")
+    if cluster is None:
+        raise HTTPException(status_code=404, detail="Duplicate cluster not found")
+    return cluster
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
@@ -0,0 +1,278 @@
+import json
+import logging
+import asyncio
+import argparse
+from collections import defaultdict
+from datetime import datetime, date, timedelta
+from typing import Optional, Dict, Any, List, Tuple, Iterable
+
+import aiomysql
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+PERIOD_TYPES = ("daily", "weekly", "monthly")
+
+REVIEW_COUNT = "review_count"
+SENTIMENT_SUM = "sentiment_score_sum"
+SENTIMENT_PREFIX = "sentiment:"
+TOPIC_PREFIX = "topic:"
+KEYWORD_PREFIX = "keyword:"
+
+# business_metrics.metric_name is VARCHAR(100)
+MAX_METRIC_NAME = 100
+
+def period_bounds(day: date, period_type: str) -> Tuple[date, date]:
+    """First and last day of the period containing ``day``"""
+    if period_type == "daily":
+        return day, day
+    if period_type == "weekly":
+        start = day - timedelta(days=day.weekday())
+        return start, start + timedelta(days=6)
+    start = day.replace(day=1)
+    next_month = (start + timedelta(days=32)).replace(day=1)
+    return start, next_month - timedelta(days=1)
+
+# Current analysis of a review, joined to the SME and review date it counts under
+CURRENT_RESULT_COLUMNS = """a.review_id, a.sentiment_label, a.sentiment_score, a.topics, a.keywords,
+       r.sme_id, r.review_date"""
+
+async def read_current_results(conn, review_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    """Current analysis of each review (one row per review), joined to its SME and review date"""
+    review_ids = list(set(review_ids))
+    if not review_ids:
+        return {}
+    marks = ", ".join(["%s"] * len(review_ids))
+    query = f"""
+    SELECT {CURRENT_RESULT_COLUMNS}
+    FROM ai_analysis_results a
+    JOIN customer_reviews r ON r.id = a.review_id
+    WHERE a.review_id IN ({marks})
+    """
+    async with conn.cursor(aiomysql.DictCursor) as cursor:
+        await cursor.execute(query, review_ids)
+        return {row['review_id']: row for row in await cursor.fetchall()}
+
+async def lock_reviews(conn, review_ids: Iterable[int]):
+    """Serialize concurrent writers of the same reviews for the rest of the transaction"""
+    review_ids = sorted(set(review_ids))
+    if not review_ids:
+        return
+    marks = ", ".join(["%s"] * len(review_ids))
+    async with conn.cursor() as cursor:
+        await cursor.execute(f"SELECT id FROM customer_reviews WHERE id IN ({marks}) FOR UPDATE", review_ids)
+
+def _as_list(value) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return json.loads(value) if value else []
+    return list(value)
+
+class MetricsRollup:
+    """
+    Keeps additive per-SME rollups (review count, sentiment sum and distribution,
+    topic and keyword counts) in business_metrics, per daily / weekly / monthly
+    period of the review date. Each review contributes its latest analysis only:
+    a new result replaces the previous contribution, a delete removes it.
+
+    Relies on the unique (sme_id, metric_name, period_type, period_start) index
+    on business_metrics for ON DUPLICATE KEY UPDATE.
+    """
+
+    def __init__(self, track_keywords: Optional[bool] = None):
+        self.track_keywords = settings.metrics_track_keywords if track_keywords is None else track_keywords
+
+    def _contributions(self, row: Dict[str, Any], sign: int, deltas: Dict[tuple, float]):
+        review_date = row['review_date']
+        if review_date is None:
+            return
+        day = review_date.date() if isinstance(review_date, datetime) else review_date
+
+        metrics = {
+            REVIEW_COUNT: 1.0,
+            SENTIMENT_SUM: float(row['sentiment_score'] or 0.0),
+            f"{SENTIMENT_PREFIX}{row['sentiment_label']}": 1.0,
+        }
+        for topic in set(_as_list(row['topics'])):
+            metrics[f"{TOPIC_PREFIX}{topic}"[:MAX_METRIC_NAME]] = 1.0
+        if self.track_keywords:
+            for keyword in set(_as_list(row['keywords'])):
+                metrics[f"{KEYWORD_PREFIX}{keyword}"[:MAX_METRIC_NAME]] = 1.0
+
+        for period_type in PERIOD_TYPES:
+            start, end = period_bounds(day, period_type)
+            for name, value in metrics.items():
+                deltas[(row['sme_id'], name, period_type, start, end)] += sign * value
+
+    async def apply(self, conn, before: Dict[int, Dict[str, Any]], after: Dict[int, Dict[str, Any]]):
+        """Replace the contribution of every review in ``before`` with its state in ``after``"""
+        deltas: Dict[tuple, float] = defaultdict(float)
+        for row in before.values():
+            self._contributions(row, -1, deltas)
+        for row in after.values():
+            self._contributions(row, +1, deltas)
+
+        rows = [(key, value) for key, value in deltas.items() if abs(value) > 1e-9]
+        if not rows:
+            return
+        # Lock business_metrics rows in unique key order, so concurrent writers cannot deadlock
+        rows.sort(key=lambda row: row[0][:4])
+
+        now = datetime.utcnow()
+        query = """
+        INSERT INTO business_metrics (
+            sme_id, metric_name, metric_value, metric_unit, period_type,
+            period_start, period_end, calculated_at, created_at, updated_at
+        ) VALUES {values}
+        ON DUPLICATE KEY UPDATE
+            metric_value = metric_value + VALUES(metric_value),
+            calculated_at = VALUES(calculated_at),
+            updated_at = VALUES(updated_at)
+        """
+        chunk_size = settings.db_bulk_chunk_size
+        async with conn.cursor() as cursor:
+            for offset in range(0, len(rows), chunk_size):
+                chunk = rows[offset:offset + chunk_size]
+                values = ", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"] * len(chunk))
+                params = []
+                for (sme_id, name, period_type, start, end), value in chunk:
+                    unit = "score" if name == SENTIMENT_SUM else "count"
+                    params.extend((sme_id, name, value, unit, period_type, start, end, now, now, now))
+                await cursor.execute(query.format(values=values), params)
+
+    async def rebuild(self, conn, sme_id: int, batch_size: int = 1000) -> int:
+        """Recompute all rollups of an SME from the latest analysis of each review"""
+        await conn.begin()
+        try:
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                # Lock the SME's reviews so no analysis write interleaves with the rebuild
+                await cursor.execute("SELECT id FROM customer_reviews WHERE sme_id = %s FOR UPDATE", (sme_id,))
+                await cursor.execute(
+                    """
+                    DELETE FROM business_metrics
+                    WHERE sme_id = %s AND period_type IN ('daily', 'weekly', 'monthly')
+                      AND (metric_name IN (%s, %s) OR metric_name LIKE 'sentiment:%%'
+                           OR metric_name LIKE 'topic:%%' OR metric_name LIKE 'keyword:%%')
+                    """,
+                    (sme_id, REVIEW_COUNT, SENTIMENT_SUM)
+                )
+
+                query = f"""
+                SELECT {CURRENT_RESULT_COLUMNS}
+                FROM ai_analysis_results a
+                JOIN customer_reviews r ON r.id = a.review_id
+                WHERE r.sme_id = %s
+                AND a.review_id > %s
+                ORDER BY a.review_id
+                LIMIT %s
+                """
+                reviews = 0
+                last_id = 0
+                while True:
+                    await cursor.execute(query, (sme_id, last_id, batch_size))
+                    rows = await cursor.fetchall()
+                    if not rows:
+                        break
+                    await self.apply(conn, {}, {row['review_id']: row for row in rows})
+                    reviews += len(rows)
+                    last_id = rows[-1]['review_id']
+
+            await conn.commit()
+            logger.info(f"Rebuilt metrics rollups for SME {sme_id} from {reviews} reviews")
+            return reviews
+
+        except BaseException:
+            await conn.rollback()
+            raise
+
+async def read_sme_metrics(
+    conn,
+    sme_id: int,
+    period_type: str = "daily",
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    top: int = 10
+) -> List[Dict[str, Any]]:
+    """
+    Dashboard view of the rollups: one entry per period starting in [date_from, date_to),
+    cost proportional to stored rollup rows
+    """
+    conditions = ["sme_id = %s", "period_type = %s"]
+    params: List[Any] = [sme_id, period_type]
+    if date_from is not None:
+        conditions.append("period_start >= %s")
+        params.append(date_from)
+    if date_to is not None:
+        conditions.append("period_start < %s")
+        params.append(date_to)
+
+    query = f"""
+    SELECT metric_name, metric_value, period_start, period_end
+    FROM business_metrics
+    WHERE {' AND '.join(conditions)}
+    ORDER BY period_start
+    """
+    async with conn.cursor(aiomysql.DictCursor) as cursor:
+        await cursor.execute(query, params)
+        rows = await cursor.fetchall()
+
+    periods: Dict[date, Dict[str, Any]] = {}
+    for row in rows:
+        period = periods.setdefault(row['period_start'], {
+            "period_start": row['period_start'],
+            "period_end": row['period_end'],
+            "metrics": {},
+        })
+        period["metrics"][row['metric_name']] = float(row['metric_value'])
+
+    result = []
+    for period in periods.values():
+        metrics = period.pop("metrics")
+        count = metrics.get(REVIEW_COUNT, 0.0)
+        if count <= 0:
+            continue
+
+        def ranked(prefix: str) -> List[Dict[str, Any]]:
+            items = [(name[len(prefix):], value) for name, value in metrics.items() if name.startswith(prefix) and value > 0]
+            items.sort(key=lambda item: -item[1])
+            return [{"name": name, "count": int(value)} for name, value in items[:top]]
+
+        result.append({
+            **period,
+            "review_count": int(count),
+            "average_sentiment": round(metrics.get(SENTIMENT_SUM, 0.0) / count, 4),
+            "sentiment_distribution": {
+                label: int(metrics.get(f"{SENTIMENT_PREFIX}{label}", 0.0))
+                for label in ("positive", "negative", "neutral")
+            },
+            "top_topics": ranked(TOPIC_PREFIX),
+            "top_keywords": ranked(KEYWORD_PREFIX),
+        })
+    return result
+
+async def _rebuild(sme_ids: List[int]):
+    from database import DatabaseManager
+
+    db = DatabaseManager()
+    await db.connect()
+    try:
+        async with db._connection() as conn:
+            if not sme_ids:
+                async with conn.cursor() as cursor:
+                    await cursor.execute("SELECT DISTINCT sme_id FROM customer_reviews ORDER BY sme_id")
+                    sme_ids = [row[0] for row in await cursor.fetchall()]
+            rollup = MetricsRollup()
+            for sme_id in sme_ids:
+                await rollup.rebuild(conn, sme_id)
+    finally:
+        await db.disconnect()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild per-SME analysis rollups in business_metrics")
+    parser.add_argument("--sme-id", type=int, action="append", default=[], help="SME to rebuild (repeatable, default: all)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_rebuild(args.sme_id))
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
-from datetime import datetime
+from typing import Optional, List, Dict, Any, Literal
+from datetime import datetime, date
 from enum import Enum
 
 class SentimentLabel(str, Enum):
@@ -8,10 +8,15 @@ class SentimentLabel(str, Enum):
     NEGATIVE = "negative"
     NEUTRAL = "neutral"
 
+# Values of the customer_reviews.status enum column
+ReviewStatus = Literal["new", "in_progress", "resolved", "closed"]
+
 class ReviewAnalysisRequest(BaseModel):
     review_id: int = Field(..., description="ID of the review to analyze")
     content: str = Field(..., description="Review content text")
-    language_code: Optional[str] = Field("en", description="Language code (e.g., 'en', 'es', 'fr')")
+    language_code: Optional[str] = Field(None, description="Language code (e.g., 'en', 'es', 'fr'); detected when omitted")
+    sme_id: Optional[int] = Field(None, description="SME the review belongs to, selects its topic taxonomy")
+    industry: Optional[str] = Field(None, description="Industry used to select a topic taxonomy")
     
     class Config:
         json_schema_extra = {
@@ -33,6 +38,9 @@ class ReviewAnalysisResponse(BaseModel):
     emotions: Dict[str, float] = Field(default_factory=dict, description="Detected emotions with scores")
     language_code: str
     processed_at: datetime
+    duplicate_cluster_id: Optional[int] = Field(None, description="Near-duplicate cluster whose analysis was reused")
+    duplicate_similarity: Optional[float] = Field(None, description="Estimated Jaccard similarity to the cluster representative")
+    unchanged: bool = Field(False, description="The stored analysis was current: nothing was analyzed or written")
     
     class Config:
         json_schema_extra = {
@@ -60,12 +68,22 @@ class AnalysisResult(BaseModel):
     emotions: Dict[str, float]
     language_code: str
     analysis_model: str
+    content_hash: Optional[str] = None
+    duplicate_cluster_id: Optional[int] = None
+    duplicate_similarity: Optional[float] = None
 
 class HealthResponse(BaseModel):
     status: str
     service: str
     version: str
     timestamp: datetime
+    database: Optional[Dict[str, Any]] = None
+    cache: Optional[Dict[str, Any]] = None
+    near_duplicates: Optional[Dict[str, Any]] = None
+    search_index: Optional[Dict[str, Any]] = None
+    trends: Optional[Dict[str, Any]] = None
+    google_cloud: Optional[Dict[str, Any]] = None
+    startup: Optional[Dict[str, Any]] = None
     
 class ErrorResponse(BaseModel):
     error: str
@@ -75,8 +93,90 @@ class ErrorResponse(BaseModel):
 class BatchAnalysisRequest(BaseModel):
     reviews: List[ReviewAnalysisRequest]
     
+class JobCreateRequest(BaseModel):
+    review_ids: List[int] = Field(default_factory=list, description="Reviews to analyze, content is read from customer_reviews")
+    reviews: List[ReviewAnalysisRequest] = Field(default_factory=list, description="Reviews to analyze with their content")
+    force: bool = Field(False, description="Reanalyze reviews whose stored result is current")
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: str
+    total: int
+    processed: int
+    success_count: int
+    error_count: int
+    progress: float = Field(..., description="Fraction of items processed, 0.0 to 1.0")
+    reviews_per_second: Optional[float] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    errors: List[Dict[str, Any]] = Field(default_factory=list, description="First failed items")
+
+class BackfillRequest(BaseModel):
+    sme_id: Optional[int] = Field(None, description="Only reviews of this SME")
+    date_from: Optional[date] = Field(None, description="Review date lower bound (inclusive)")
+    date_to: Optional[date] = Field(None, description="Review date upper bound (exclusive)")
+    stale_before: Optional[datetime] = Field(None, description="Reanalyze reviews whose latest result is older than this")
+    analysis_model: Optional[str] = Field(None, description="Reanalyze reviews not yet analyzed by this model")
+    language_code: Optional[str] = Field(None, description="Language of every review; detected per review when omitted")
+    set_status: Optional[ReviewStatus] = Field(None, description="customer_reviews status to set after a successful analysis")
+    force: bool = Field(False, description="Reanalyze reviews whose stored result is current (implied by stale_before)")
+    page_size: Optional[int] = None
+
 class BatchAnalysisResponse(BaseModel):
     results: List[Dict[str, Any]]
     total_processed: int
     success_count: int
-    error_count: int 
\ No newline at end of file
+    error_count: int 
+
+class ProfilerConfigRequest(BaseModel):
+    enabled: Optional[bool] = None
+    sample_rate: Optional[float] = Field(None, ge=0.0, le=1.0, description="Fraction of /analyze/* requests to profile")
+    interval_ms: Optional[float] = Field(None, gt=0, description="Time between stack samples")
+
+class AnalysisQueryRequest(BaseModel):
+    review_ids: Optional[List[int]] = Field(None, max_length=1000, description="Reviews to read; or select them by SME and filters")
+    sme_id: Optional[int] = None
+    date_from: Optional[date] = Field(None, description="Review date lower bound (inclusive)")
+    date_to: Optional[date] = Field(None, description="Review date upper bound (exclusive)")
+    status: Optional[ReviewStatus] = Field(None, description="customer_reviews status")
+    fields: Optional[List[str]] = Field(None, description="Columns to return (review_id is always included)")
+    limit: int = Field(100, ge=1, le=1000)
+    cursor: Optional[int] = Field(None, description="next_cursor of the previous page")
+
+class AnalysisDeleteRequest(BaseModel):
+    review_ids: Optional[List[int]] = Field(None, max_length=10000)
+    sme_id: Optional[int] = None
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    status: Optional[ReviewStatus] = None
+
+class SearchRequest(BaseModel):
+    sme_id: Optional[int] = None
+    sentiment: List[SentimentLabel] = Field(default_factory=list, description="Any of these labels")
+    keywords: List[str] = Field(default_factory=list, max_length=50, description="All of these keywords")
+    keywords_any: List[str] = Field(default_factory=list, max_length=50, description="At least one of these keywords")
+    topics: List[str] = Field(default_factory=list, max_length=50, description="All of these topics")
+    topics_any: List[str] = Field(default_factory=list, max_length=50, description="At least one of these topics")
+    exclude_keywords: List[str] = Field(default_factory=list, max_length=50)
+    exclude_topics: List[str] = Field(default_factory=list, max_length=50)
+    date_from: Optional[date] = Field(None, description="Review date lower bound (inclusive)")
+    date_to: Optional[date] = Field(None, description="Review date upper bound (exclusive)")
+    facets: List[Literal["sentiment", "topic", "keyword", "sme"]] = Field(
+        default_factory=lambda: ["sentiment", "topic"], description="Fields to count over all matches"
+    )
+    facet_limit: int = Field(10, ge=1, le=100)
+    limit: int = Field(100, ge=0, le=1000, description="Review ids per page, 0 for facets only")
+    cursor: Optional[int] = Field(None, description="next_cursor of the previous page")
+
+class FacetCount(BaseModel):
+    value: Any
+    count: int
+
+class SearchResponse(BaseModel):
+    total: int = Field(..., description="Matching reviews, across all pages")
+    review_ids: List[int]
+    next_cursor: Optional[int] = None
+    facets: Dict[str, List[FacetCount]] = Field(default_factory=dict)
+    stale: bool = Field(False, description="Results were written outside the API process since the last index rebuild")
+    took_ms: float
@@ -0,0 +1,392 @@
+import os
+import re
+import time
+import zlib
+import random
+import sqlite3
+import hashlib
+import logging
+import asyncio
+import threading
+from array import array
+from concurrent.futures import Executor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Dict, Any, List, NamedTuple, Sequence
+
+from config import settings
+from startup import module_available
+from analysis_cache import normalize_text
+from models import AnalysisResult
+
+logger = logging.getLogger(__name__)
+
+# numpy is optional: signatures are computed in pure Python without it
+NUMPY_AVAILABLE = module_available("numpy")
+
+_TOKEN = re.compile(r"\w+")
+
+# Universal hashing (a * x + b) mod p over 32-bit shingle hashes
+_MERSENNE_PRIME = (1 << 61) - 1
+_MASK_64 = (1 << 64) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Fixed so signatures stay comparable across restarts and workers
+PERMUTATION_SEED = 1
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS clusters ("
+    "cluster_id INTEGER PRIMARY KEY, review_id INTEGER, signature BLOB NOT NULL, result TEXT NOT NULL, "
+    "member_count INTEGER NOT NULL DEFAULT 1, created_at REAL NOT NULL, updated_at REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS cluster_members ("
+    "cluster_id INTEGER NOT NULL, review_id INTEGER NOT NULL, similarity REAL NOT NULL, created_at REAL NOT NULL, "
+    "PRIMARY KEY (cluster_id, review_id)) WITHOUT ROWID",
+    # One row per (band hash, cluster); only cluster representatives are indexed, so buckets stay small
+    "CREATE TABLE IF NOT EXISTS lsh_buckets ("
+    "bucket INTEGER NOT NULL, cluster_id INTEGER NOT NULL, PRIMARY KEY (bucket, cluster_id)) WITHOUT ROWID",
+)
+
+class Fingerprint(NamedTuple):
+    """MinHash signature of a text and its LSH band buckets"""
+    signature: array
+    buckets: List[int]
+
+class DuplicateMatch(NamedTuple):
+    cluster_id: int
+    review_id: Optional[int]
+    similarity: float
+    result: AnalysisResult
+
+def shingles(text: str, size: int) -> List[str]:
+    """Word n-grams of the normalised text"""
+    tokens = _TOKEN.findall(normalize_text(text))
+    if len(tokens) <= size:
+        return [" ".join(tokens)] if tokens else []
+    return list({" ".join(tokens[index:index + size]) for index in range(len(tokens) - size + 1)})
+
+def estimate_similarity(first: Sequence[int], second: Sequence[int]) -> float:
+    """Jaccard similarity estimate: the fraction of equal MinHash components"""
+    if not first or len(first) != len(second):
+        return 0.0
+    return sum(1 for a, b in zip(first, second) if a == b) / len(first)
+
+class MinHasher:
+    """MinHash signatures over word shingles, with banding for LSH lookups"""
+
+    def __init__(self, num_perm: int, bands: int, shingle_size: int):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        generator = random.Random(PERMUTATION_SEED)
+        self._a = [generator.randrange(1, _MERSENNE_PRIME) for _ in range(num_perm)]
+        self._b = [generator.randrange(0, _MERSENNE_PRIME) for _ in range(num_perm)]
+        self._np_a = self._np_b = None
+        if NUMPY_AVAILABLE:
+            import numpy as np
+            self._np_a = np.array(self._a, dtype=np.uint64)
+            self._np_b = np.array(self._b, dtype=np.uint64)
+
+    def signature(self, text: str) -> Optional[array]:
+        hashes = [zlib.crc32(shingle.encode("utf-8")) for shingle in shingles(text, self.shingle_size)]
+        if not hashes:
+            return None
+        if self._np_a is not None:
+            import numpy as np
+            # uint64 arithmetic wraps, which matches the masking in the pure Python path
+            values = np.array(hashes, dtype=np.uint64)[:, None] * self._np_a + self._np_b
+            minimums = ((values % np.uint64(_MERSENNE_PRIME)) & np.uint64(_MAX_HASH)).min(axis=0)
+            return array("I", minimums.astype(np.uint32).tobytes())
+        return array("I", [
+            min((((a * value + b) & _MASK_64) % _MERSENNE_PRIME) & _MAX_HASH for value in hashes)
+            for a, b in zip(self._a, self._b)
+        ])
+
+    def buckets(self, signature: array, namespace: str) -> List[int]:
+        """One 63-bit bucket id per band, scoped to the namespace"""
+        prefix = namespace.encode("utf-8") + b"\x1f"
+        raw = signature.tobytes()
+        width = self.rows * signature.itemsize
+        buckets = []
+        for band in range(self.bands):
+            digest = hashlib.blake2b(
+                prefix + band.to_bytes(2, "little") + raw[band * width:(band + 1) * width], digest_size=8
+            ).digest()
+            buckets.append(int.from_bytes(digest, "little", signed=True))
+        return buckets
+
+def compute_fingerprint(hasher: MinHasher, text: str, namespace: str) -> Optional[Fingerprint]:
+    """Executor entry point: a text's signature and buckets (the hasher pickles with its permutations)"""
+    signature = hasher.signature(text)
+    if signature is None:
+        return None
+    return Fingerprint(signature, hasher.buckets(signature, namespace))
+
+class SQLiteNearDuplicateStore:
+    """Clusters, their representative signatures and the LSH buckets, persisted in SQLite"""
+
+    def __init__(self, path: str, params: Dict[str, Any]):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            self._conn.execute(statement)
+        self._check_params({name: str(value) for name, value in params.items()})
+
+    def _check_params(self, params: Dict[str, str]):
+        """Signatures built with other MinHash parameters are not comparable, so start over"""
+        stored = dict(self._conn.execute("SELECT name, value FROM meta").fetchall())
+        if stored == params:
+            return
+        if stored:
+            logger.warning(f"Near-duplicate index parameters changed ({stored} -> {params}), clearing {self.path}")
+        with self._lock:
+            self._conn.execute("BEGIN")
+            for table in ("meta", "clusters", "cluster_members", "lsh_buckets"):
+                self._conn.execute(f"DELETE FROM {table}")
+            self._conn.executemany("INSERT INTO meta (name, value) VALUES (?, ?)", list(params.items()))
+            self._conn.execute("COMMIT")
+
+    def _best_match(self, fingerprint: Fingerprint, threshold: float, max_candidates: int) -> Optional[tuple]:
+        marks = ", ".join(["?"] * len(fingerprint.buckets))
+        candidates = [row[0] for row in self._conn.execute(
+            f"SELECT DISTINCT cluster_id FROM lsh_buckets WHERE bucket IN ({marks}) LIMIT ?",
+            (*fingerprint.buckets, max_candidates)
+        )]
+        if not candidates:
+            return None
+
+        marks = ", ".join(["?"] * len(candidates))
+        best = None
+        for cluster_id, review_id, signature, result in self._conn.execute(
+            f"SELECT cluster_id, review_id, signature, result FROM clusters WHERE cluster_id IN ({marks})", candidates
+        ):
+            similarity = estimate_similarity(fingerprint.signature, array("I", signature))
+            if similarity >= threshold and (best is None or similarity > best[2]):
+                best = (cluster_id, review_id, similarity, result)
+        return best
+
+    def find(self, fingerprint: Fingerprint, threshold: float, max_candidates: int) -> Optional[tuple]:
+        with self._lock:
+            return self._best_match(fingerprint, threshold, max_candidates)
+
+    def add_member(self, cluster_id: int, review_id: Optional[int], similarity: float):
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                inserted = 1
+                if review_id is not None:
+                    inserted = self._conn.execute(
+                        "INSERT OR IGNORE INTO cluster_members (cluster_id, review_id, similarity, created_at) VALUES (?, ?, ?, ?)",
+                        (cluster_id, review_id, similarity, now)
+                    ).rowcount
+                if inserted:
+                    self._conn.execute(
+                        "UPDATE clusters SET member_count = member_count + 1, updated_at = ? WHERE cluster_id = ?",
+                        (now, cluster_id)
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def add(
+        self,
+        fingerprint: Fingerprint,
+        review_id: Optional[int],
+        result: str,
+        threshold: float,
+        max_candidates: int
+    ) -> Optional[tuple]:
+        """Start a new cluster, unless a concurrent writer already indexed a near-duplicate (returned instead)"""
+        now = time.time()
+        with self._lock:
+            match = self._best_match(fingerprint, threshold, max_candidates)
+            if match is None:
+                self._conn.execute("BEGIN")
+                try:
+                    cluster_id = self._conn.execute(
+                        "INSERT INTO clusters (review_id, signature, result, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                        (review_id, fingerprint.signature.tobytes(), result, now, now)
+                    ).lastrowid
+                    self._conn.executemany(
+                        "INSERT OR IGNORE INTO lsh_buckets (bucket, cluster_id) VALUES (?, ?)",
+                        [(bucket, cluster_id) for bucket in fingerprint.buckets]
+                    )
+                    if review_id is not None:
+                        self._conn.execute(
+                            "INSERT INTO cluster_members (cluster_id, review_id, similarity, created_at) VALUES (?, ?, 1.0, ?)",
+                            (cluster_id, review_id, now)
+                        )
+                    self._conn.execute("COMMIT")
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+                return None
+
+        self.add_member(match[0], review_id, match[2])
+        return match
+
+    def get_cluster(self, cluster_id: int, limit: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT review_id, member_count, created_at, updated_at FROM clusters WHERE cluster_id = ?", (cluster_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            members = self._conn.execute(
+                "SELECT review_id, similarity FROM cluster_members WHERE cluster_id = ? ORDER BY review_id LIMIT ?",
+                (cluster_id, limit)
+            ).fetchall()
+        return {
+            "cluster_id": cluster_id,
+            "representative_review_id": row[0],
+            "member_count": row[1],
+            "created_at": row[2],
+            "updated_at": row[3],
+            "members": [{"review_id": review_id, "similarity": similarity} for review_id, similarity in members],
+        }
+
+    def cluster_count(self) -> int:
+        with self._lock:
+            # The largest rowid is O(1), unlike COUNT(*); clusters are never deleted
+            return self._conn.execute("SELECT COALESCE(MAX(cluster_id), 0) FROM clusters").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class NearDuplicateIndex:
+    """
+    Near-duplicate stage in front of the analysis. Each analyzed review is
+    reduced to a MinHash signature; the first review of a group of
+    near-duplicates becomes the cluster representative and is indexed in
+    ``bands`` LSH buckets together with its analysis. A later review whose
+    estimated Jaccard similarity to a representative reaches ``threshold``
+    reuses that analysis and is recorded as a cluster member.
+
+    A lookup is one indexed query over the review's band buckets plus a
+    signature comparison for each candidate, so its cost does not grow with
+    the number of indexed reviews. Signatures and buckets are namespaced by
+    analysis model, language and taxonomy variant, like the result cache.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        threshold: Optional[float] = None,
+        num_perm: Optional[int] = None,
+        bands: Optional[int] = None,
+        shingle_size: Optional[int] = None,
+        min_tokens: Optional[int] = None,
+        max_candidates: Optional[int] = None
+    ):
+        self.threshold = threshold if threshold is not None else settings.near_duplicate_threshold
+        self.min_tokens = min_tokens if min_tokens is not None else settings.near_duplicate_min_tokens
+        self.max_candidates = max_candidates or settings.near_duplicate_max_candidates
+        self.hasher = MinHasher(
+            num_perm or settings.near_duplicate_num_perm,
+            bands or settings.near_duplicate_bands,
+            shingle_size or settings.near_duplicate_shingle_size
+        )
+        self.store = SQLiteNearDuplicateStore(path or settings.near_duplicate_path, {
+            "num_perm": self.hasher.num_perm,
+            "bands": self.hasher.bands,
+            "shingle_size": self.hasher.shingle_size,
+            "seed": PERMUTATION_SEED,
+        })
+        self.stats = {
+            'lookups': 0,
+            'duplicates': 0,
+            'indexed': 0,
+            'skipped_short': 0,
+            'errors': 0,
+        }
+
+    def fingerprint(self, text: str, namespace: str) -> Optional[Fingerprint]:
+        """Signature and buckets of a text, or None when it is too short to compare reliably"""
+        if len(_TOKEN.findall(text)) < self.min_tokens:
+            self.stats['skipped_short'] += 1
+            return None
+        return compute_fingerprint(self.hasher, text, namespace)
+
+    async def fingerprint_async(self, text: str, namespace: str, executor: Optional[Executor] = None) -> Optional[Fingerprint]:
+        """
+        ``fingerprint`` off the event loop when it is expensive: without numpy the
+        signature is num_perm passes over the shingles in pure Python, so it runs in
+        ``executor`` (the fallback analyzer's workers) or a thread
+        """
+        if NUMPY_AVAILABLE:
+            return self.fingerprint(text, namespace)
+        if len(_TOKEN.findall(text)) < self.min_tokens:
+            self.stats['skipped_short'] += 1
+            return None
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(executor, compute_fingerprint, self.hasher, text, namespace)
+        except BrokenProcessPool:
+            # The fallback analyzer restarts its pool on its next call
+            return await asyncio.to_thread(compute_fingerprint, self.hasher, text, namespace)
+
+    async def lookup(self, fingerprint: Fingerprint) -> Optional[DuplicateMatch]:
+        self.stats['lookups'] += 1
+        try:
+            match = await asyncio.to_thread(self.store.find, fingerprint, self.threshold, self.max_candidates)
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.warning(f"Near-duplicate lookup failed: {e}")
+            return None
+        if match is None:
+            return None
+        self.stats['duplicates'] += 1
+        cluster_id, review_id, similarity, result = match
+        return DuplicateMatch(cluster_id, review_id, similarity, AnalysisResult.model_validate_json(result))
+
+    async def add_member(self, match: DuplicateMatch, review_id: Optional[int]):
+        try:
+            await asyncio.to_thread(self.store.add_member, match.cluster_id, review_id, match.similarity)
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.warning(f"Failed to record review {review_id} in duplicate cluster {match.cluster_id}: {e}")
+
+    async def add(self, fingerprint: Fingerprint, result: AnalysisResult, review_id: Optional[int]) -> Optional[DuplicateMatch]:
+        """Index a freshly analyzed review; returns the cluster it joined if a concurrent copy got there first"""
+        try:
+            match = await asyncio.to_thread(
+                self.store.add, fingerprint, review_id, result.model_dump_json(), self.threshold, self.max_candidates
+            )
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.warning(f"Failed to index review {review_id} for near-duplicate detection: {e}")
+            return None
+        if match is None:
+            self.stats['indexed'] += 1
+            return None
+        self.stats['duplicates'] += 1
+        cluster_id, representative_id, similarity, _ = match
+        return DuplicateMatch(cluster_id, representative_id, similarity, result)
+
+    async def get_cluster(self, cluster_id: int, limit: int = 100) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self.store.get_cluster, cluster_id, limit)
+
+    def close(self):
+        self.store.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'clusters': self.store.cluster_count(),
+            'threshold': self.threshold,
+            'num_perm': self.hasher.num_perm,
+            'bands': self.hasher.bands,
+            'duplicate_ratio': round(self.stats['duplicates'] / self.stats['lookups'], 4) if self.stats['lookups'] else 0.0,
+            **self.stats,
+        }
@@ -0,0 +1,156 @@
+import os
+import sys
+import time
+import random
+import logging
+import threading
+from collections import Counter
+from typing import Optional, Dict, Any, List
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+MAX_STACK_DEPTH = 64
+
+# Leaf frames in these modules are threads parked waiting for work (the event
+# loop in select(), executor threads on their queue); they are not CPU time
+IDLE_MODULES = frozenset({"selectors.py", "threading.py", "queue.py", "thread.py"})
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+class SamplingProfiler:
+    """
+    Statistical profiler for the analysis hot path. While at least one sampled
+    request is in flight, a background thread snapshots the stacks of all other
+    threads every ``interval`` seconds and aggregates them. When disabled the
+    only cost per request is one attribute check.
+
+    Stacks are aggregated per process: with concurrent requests on one event
+    loop, a sample cannot be attributed to a single request. Work done in
+    fallback process workers is not visible here (use FALLBACK_EXECUTOR=thread
+    or inline while profiling it).
+    """
+
+    def __init__(self, enabled: bool = False, sample_rate: float = 0.1, interval: float = 0.005):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.idle_samples = 0
+        self.sampled_requests = 0
+        self.started_at: Optional[float] = time.time() if enabled else None
+        self._active = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def configure(self, enabled: Optional[bool] = None, sample_rate: Optional[float] = None, interval: Optional[float] = None):
+        with self._lock:
+            if sample_rate is not None:
+                self.sample_rate = min(1.0, max(0.0, sample_rate))
+            if interval is not None:
+                self.interval = max(0.001, interval)
+            if enabled is not None and enabled != self.enabled:
+                self.enabled = enabled
+                self.started_at = time.time() if enabled else self.started_at
+                logger.info(f"Sampling profiler {'enabled' if enabled else 'disabled'} (sample_rate={self.sample_rate}, interval={self.interval}s)")
+
+    def should_sample(self) -> bool:
+        return self.enabled and random.random() < self.sample_rate
+
+    def begin(self):
+        """Mark a sampled request as in flight; starts the sampler thread if needed"""
+        with self._lock:
+            self._active += 1
+            self.sampled_requests += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+                self._thread.start()
+
+    def end(self):
+        with self._lock:
+            self._active -= 1
+
+    def reset(self):
+        with self._lock:
+            self.stacks.clear()
+            self.samples = 0
+            self.idle_samples = 0
+            self.sampled_requests = 0
+            self.started_at = time.time() if self.enabled else None
+
+    def _run(self):
+        own_thread = threading.get_ident()
+        while True:
+            with self._lock:
+                if self._active <= 0:
+                    self._thread = None
+                    return
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_thread:
+                    self._record(frame)
+            time.sleep(self.interval)
+
+    def _record(self, frame):
+        if os.path.basename(frame.f_code.co_filename) in IDLE_MODULES:
+            with self._lock:
+                self.idle_samples += 1
+            return
+        stack: List[str] = []
+        while frame is not None and len(stack) < MAX_STACK_DEPTH:
+            stack.append(_frame_label(frame))
+            frame = frame.f_back
+        with self._lock:
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """Stacks in the collapsed format read by flamegraph.pl, speedscope and inferno"""
+        with self._lock:
+            stacks = list(self.stacks.items())
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(stacks))
+
+    def top(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Hottest functions by self samples, with inclusive (total) samples"""
+        with self._lock:
+            stacks = list(self.stacks.items())
+            samples = self.samples
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in stacks:
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for function in set(frames):
+                total[function] += count
+        return [
+            {
+                "function": function,
+                "self_samples": count,
+                "total_samples": total[function],
+                "self_percent": round(100.0 * count / samples, 2) if samples else 0.0,
+                "total_percent": round(100.0 * total[function] / samples, 2) if samples else 0.0,
+            }
+            for function, count in own.most_common(limit)
+        ]
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "interval_seconds": self.interval,
+            "sampled_requests": self.sampled_requests,
+            "active_requests": self._active,
+            "samples": self.samples,
+            "idle_samples": self.idle_samples,
+            "distinct_stacks": len(self.stacks),
+            "started_at": self.started_at,
+        }
+
+profiler = SamplingProfiler(
+    enabled=settings.profiler_enabled,
+    sample_rate=settings.profiler_sample_rate,
+    interval=settings.profiler_interval_seconds
+)
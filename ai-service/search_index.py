@@ -0,0 +1,645 @@
+import os
+import re
+import json
+import time
+import heapq
+import struct
+import asyncio
+import logging
+import argparse
+import threading
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from itertools import chain
+from datetime import date, datetime
+from typing import Optional, Dict, Any, List, Tuple, Iterable, Sequence, NamedTuple, Union
+
+from config import settings
+from startup import module_available
+from models import SearchRequest
+
+logger = logging.getLogger(__name__)
+
+# numpy is optional: postings are intersected as Python sets without it
+NUMPY_AVAILABLE = module_available("numpy")
+
+FIELDS = ("keyword", "topic", "sentiment", "sme")
+
+SNAPSHOT_FILE = "snapshot.bin"
+SNAPSHOT_MAGIC = b"RSIX"
+SNAPSHOT_VERSION = 1
+_SNAPSHOT_HEADER = struct.Struct("<4sII")  # magic, version, metadata length
+_JOURNAL_NAME = re.compile(r"^journal\.(\d+)\.ndjson$")
+
+NO_DATE = -1
+
+# Facet counting cost, in units of walking the terms of one review: counting a term
+# against a bitmap of the matches costs TERM_COST plus one per POSTINGS_PER_REVIEW postings
+TERM_COST = 20
+POSTINGS_PER_REVIEW = 300
+
+class Document(NamedTuple):
+    """What the index knows about a review: its terms and review date (a date ordinal or NO_DATE)"""
+    review_id: int
+    day: int
+    terms: Tuple[str, ...]
+
+def term(field: str, value: Any) -> str:
+    """Index term of a field value, e.g. keyword:delivery"""
+    return f"{field}:{str(value).strip().lower()}"
+
+def document_from_row(row: Dict[str, Any]) -> Document:
+    """Document of a current-results row (review_id, sentiment_label, topics, keywords, sme_id, review_date)"""
+    terms = {term("sentiment", row['sentiment_label'])}
+    if row.get('sme_id') is not None:
+        terms.add(term("sme", row['sme_id']))
+    for field, column in (("topic", 'topics'), ("keyword", 'keywords')):
+        values = row.get(column)
+        if isinstance(values, str):
+            values = json.loads(values) if values else []
+        terms.update(term(field, value) for value in values or ())
+
+    review_date = row.get('review_date')
+    if isinstance(review_date, datetime):
+        review_date = review_date.date()
+    day = review_date.toordinal() if review_date is not None else NO_DATE
+    return Document(row['review_id'], day, tuple(sorted(terms)))
+
+def _discard(posting: array, number: int):
+    index = bisect_left(posting, number)
+    if index < len(posting) and posting[index] == number:
+        del posting[index]
+
+def _contains(haystack, needles):
+    """numpy: which of the sorted ``needles`` occur in the sorted ``haystack``"""
+    import numpy as np
+    if len(haystack) == 0 or len(needles) == 0:
+        return np.zeros(len(needles), dtype=bool)
+    index = np.minimum(np.searchsorted(haystack, needles), len(haystack) - 1)
+    return haystack[index] == needles
+
+class SearchIndex:
+    """
+    In-memory inverted index over the current analysis of each review: keyword,
+    topic, sentiment label and SME terms, plus the review date.
+
+    Reviews get dense document numbers and every term's postings are a sorted
+    array('I') of them, so filters are sorted-array intersections (vectorised
+    with numpy). New reviews append to postings; a reanalysis only moves the terms
+    that changed. Updates are appended to a journal and folded into a binary
+    snapshot every ``compact_every`` records, so a restart reloads the index from
+    disk without reading MySQL. Writes of other processes are only covered by a
+    rebuild; with ``external_writes`` set, results say when the index missed some.
+    """
+
+    def __init__(self, directory: Optional[str] = None, compact_every: Optional[int] = None):
+        self.directory = directory
+        self.compact_every = max(1, compact_every or settings.search_index_compact_every)
+        self.loaded = directory is None
+        self._lock = threading.RLock()
+        self._generation = 0
+        self._journal = None
+        self._journal_records = 0
+        self._compacting = False
+        # Changes made while a rebuild reads MySQL, replayed onto the rebuilt index
+        self._rebuild_log: Optional[List[Union[Document, int]]] = None
+        # When the last rebuild started reading MySQL (persisted in the snapshot)
+        self._rebuilt_at = 0.0
+        self.external_writes = None
+        self._reset()
+
+    def _reset(self):
+        self._term_ids: Dict[str, int] = {}
+        self._terms: List[str] = []
+        self._term_fields = array('B')
+        self._field_terms: Dict[int, List[int]] = {index: [] for index in range(len(FIELDS))}
+        self._postings: List[array] = []
+        self._doc_numbers: Dict[int, int] = {}
+        self._reviews = array('Q')
+        self._days = array('i')
+        self._alive = bytearray()
+        self._forward: List[Optional[array]] = []
+
+    def _adopt(self, other: "SearchIndex"):
+        for name in ("_term_ids", "_terms", "_term_fields", "_field_terms", "_postings", "_doc_numbers",
+                     "_reviews", "_days", "_alive", "_forward"):
+            setattr(self, name, getattr(other, name))
+
+    # Updates
+
+    def _term_id(self, name: str) -> int:
+        term_id = self._term_ids.get(name)
+        if term_id is None:
+            term_id = len(self._terms)
+            self._term_ids[name] = term_id
+            self._terms.append(name)
+            field_index = FIELDS.index(name.split(":", 1)[0])
+            self._term_fields.append(field_index)
+            self._field_terms[field_index].append(term_id)
+            self._postings.append(array('I'))
+        return term_id
+
+    def _put(self, document: Document):
+        term_ids = array('I', sorted({self._term_id(name) for name in document.terms}))
+        number = self._doc_numbers.get(document.review_id)
+        if number is None:
+            number = len(self._reviews)
+            self._doc_numbers[document.review_id] = number
+            self._reviews.append(document.review_id)
+            self._days.append(document.day)
+            self._alive.append(1)
+            self._forward.append(term_ids)
+            # The newest document number sorts last, so appending keeps postings sorted
+            for term_id in term_ids:
+                self._postings[term_id].append(number)
+            return
+
+        old, new = set(self._forward[number]), set(term_ids)
+        for term_id in old - new:
+            _discard(self._postings[term_id], number)
+        for term_id in new - old:
+            insort(self._postings[term_id], number)
+        self._forward[number] = term_ids
+        self._days[number] = document.day
+
+    def _delete(self, review_id: int):
+        number = self._doc_numbers.pop(review_id, None)
+        if number is None:
+            return
+        for term_id in self._forward[number]:
+            _discard(self._postings[term_id], number)
+        # The slot stays empty until the next load, which renumbers the documents
+        self._forward[number] = None
+        self._alive[number] = 0
+
+    def _apply_change(self, change: Union[Document, int]):
+        if isinstance(change, Document):
+            self._put(change)
+        else:
+            self._delete(change)
+
+    def apply(self, review_ids: Iterable[int], current: Dict[int, Dict[str, Any]]):
+        """Index the current analysis of each review; reviews missing from ``current`` lost theirs"""
+        changes: List[Union[Document, int]] = [
+            document_from_row(current[review_id]) if review_id in current else review_id
+            for review_id in dict.fromkeys(review_ids)
+        ]
+        if not changes:
+            return
+        self.load()
+        with self._lock:
+            for change in changes:
+                self._apply_change(change)
+            if self._rebuild_log is not None:
+                self._rebuild_log.extend(changes)
+            self._write_journal(changes)
+            compact = self._journal_records >= self.compact_every and not self._compacting
+            if compact:
+                self._compacting = True
+        if compact:
+            threading.Thread(target=self.compact, name="search-index-compact", daemon=True).start()
+
+    # Queries
+
+    def _union_sets(self, term_ids: List[int]) -> set:
+        return set(chain.from_iterable(self._postings[term_id] for term_id in term_ids))
+
+    def _match(self, groups: List[List[int]], excluded: List[int], day_from: Optional[int], day_to: Optional[int]):
+        """Sorted document numbers matching every group, none of ``excluded`` and the date range"""
+        # Cheapest group first: every later step only filters the (shrinking) matches
+        groups = sorted(groups, key=lambda term_ids: sum(len(self._postings[term_id]) for term_id in term_ids))
+        if NUMPY_AVAILABLE:
+            import numpy as np
+            postings = lambda term_id: np.frombuffer(self._postings[term_id], dtype=np.uint32)
+            if groups:
+                first = [postings(term_id) for term_id in groups[0]]
+                matches = first[0] if len(first) == 1 else np.unique(np.concatenate(first))
+            else:
+                matches = np.flatnonzero(np.frombuffer(self._alive, dtype=np.uint8)).astype(np.uint32)
+            for term_ids in groups[1:]:
+                found = np.zeros(len(matches), dtype=bool)
+                for term_id in term_ids:
+                    found |= _contains(postings(term_id), matches)
+                matches = matches[found]
+            for term_id in excluded:
+                matches = matches[~_contains(postings(term_id), matches)]
+            if day_from is not None or day_to is not None:
+                days = np.frombuffer(self._days, dtype=np.int32)[matches]
+                keep = days != NO_DATE
+                if day_from is not None:
+                    keep &= days >= day_from
+                if day_to is not None:
+                    keep &= days < day_to
+                matches = matches[keep]
+            return matches
+
+        if groups:
+            matches = self._union_sets(groups[0])
+            for term_ids in groups[1:]:
+                matches &= self._union_sets(term_ids)
+        else:
+            matches = {number for number, alive in enumerate(self._alive) if alive}
+        if excluded:
+            matches -= self._union_sets(excluded)
+        if day_from is not None or day_to is not None:
+            low = day_from if day_from is not None else 0
+            high = day_to if day_to is not None else date.max.toordinal() + 1
+            matches = {number for number in matches if low <= self._days[number] < high}
+        return sorted(matches)
+
+    def _facets(self, matches, fields: Sequence[str], limit: int) -> Dict[str, List[Dict[str, Any]]]:
+        counts: Dict[str, Counter] = {}
+        by_terms = []
+        matched = None
+        # Walking the reviews that do not match is enough when most reviews match
+        walked = min(len(matches), len(self._doc_numbers) - len(matches))
+        for field in fields:
+            field_index = FIELDS.index(field)
+            term_ids = self._field_terms[field_index]
+            if NUMPY_AVAILABLE and len(term_ids) * TERM_COST < walked and (
+                len(term_ids) * TERM_COST + sum(len(self._postings[term_id]) for term_id in term_ids) / POSTINGS_PER_REVIEW < walked
+            ):
+                import numpy as np
+                if matched is None:
+                    # Bitmap of the matches: counting a term is one gather over its postings
+                    matched = np.zeros(len(self._alive), dtype=bool)
+                    matched[matches] = True
+                counts[field] = Counter({
+                    term_id: int(np.count_nonzero(matched[np.frombuffer(self._postings[term_id], dtype=np.uint32)]))
+                    for term_id in term_ids if len(self._postings[term_id])
+                })
+            else:
+                by_terms.append(field_index)
+
+        if by_terms:
+            # One pass over the terms of every match covers all the remaining fields. When most
+            # reviews match, walk the others instead and subtract from the posting lengths.
+            complement = walked < len(matches)
+            if not complement:
+                numbers = matches.tolist() if NUMPY_AVAILABLE else matches
+            elif NUMPY_AVAILABLE:
+                import numpy as np
+                others = np.frombuffer(self._alive, dtype=np.uint8).astype(bool)
+                others[matches] = False
+                numbers = np.flatnonzero(others).tolist()
+            else:
+                matched = set(matches)
+                numbers = [number for number, alive in enumerate(self._alive) if alive and number not in matched]
+            totals = Counter(chain.from_iterable(self._forward[number] for number in numbers))
+            for field_index in by_terms:
+                term_ids = self._field_terms[field_index]
+                if complement:
+                    counts[FIELDS[field_index]] = Counter({
+                        term_id: len(self._postings[term_id]) - totals[term_id] for term_id in term_ids
+                    })
+                else:
+                    counts[FIELDS[field_index]] = Counter({
+                        term_id: count for term_id, count in totals.items() if self._term_fields[term_id] == field_index
+                    })
+
+        facets = {}
+        for field in fields:
+            top = heapq.nlargest(limit, ((count, term_id) for term_id, count in counts[field].items() if count > 0))
+            facets[field] = []
+            for count, term_id in top:
+                value = self._terms[term_id].split(":", 1)[1]
+                facets[field].append({"value": int(value) if field == "sme" else value, "count": count})
+        return facets
+
+    def search(
+        self,
+        all_of: Sequence[Sequence[str]] = (),
+        none_of: Sequence[str] = (),
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        facets: Sequence[str] = (),
+        facet_limit: int = 10,
+        limit: int = 100,
+        after_review_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Reviews matching at least one term of every group in ``all_of`` and none of
+        ``none_of``, with a review date in [date_from, date_to). Returns the total,
+        one page of review ids in id order and facet counts over all matches.
+        """
+        started = time.perf_counter()
+        self.load()
+        with self._lock:
+            groups = []
+            for group in all_of:
+                term_ids = [self._term_ids[name] for name in group if name in self._term_ids]
+                term_ids = [term_id for term_id in term_ids if len(self._postings[term_id])]
+                if not term_ids:
+                    groups = None
+                    break
+                groups.append(term_ids)
+            excluded = [self._term_ids[name] for name in none_of if name in self._term_ids]
+
+            if groups is None:
+                matches = []
+            else:
+                matches = self._match(
+                    groups, excluded,
+                    date_from.toordinal() if date_from is not None else None,
+                    date_to.toordinal() if date_to is not None else None
+                )
+            if NUMPY_AVAILABLE and len(matches):
+                import numpy as np
+                review_ids = np.sort(np.frombuffer(self._reviews, dtype=np.uint64)[matches])
+                if after_review_id is not None:
+                    review_ids = review_ids[np.searchsorted(review_ids, after_review_id, side="right"):]
+                page = review_ids[:limit].tolist()
+                more = len(review_ids) > limit
+            else:
+                review_ids = sorted(self._reviews[number] for number in matches)
+                if after_review_id is not None:
+                    review_ids = review_ids[bisect_left(review_ids, after_review_id + 1):]
+                page = review_ids[:limit]
+                more = len(review_ids) > limit
+            facet_counts = self._facets(matches, facets, facet_limit) if facets and len(matches) else {field: [] for field in facets}
+
+        return {
+            "total": len(matches),
+            "review_ids": page,
+            "next_cursor": page[-1] if more and page else None,
+            "facets": facet_counts,
+            "stale": self.missed_writes_at() is not None,
+            "took_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+
+    def missed_writes_at(self) -> Optional[float]:
+        """Time of the latest write made outside this process since the last rebuild, if any"""
+        if self.external_writes is None:
+            return None
+        return self.external_writes.missed_since(self._rebuilt_at, "search index")
+
+    # Persistence
+
+    def _journal_path(self, generation: int) -> str:
+        return os.path.join(self.directory, f"journal.{generation}.ndjson")
+
+    def _journal_generations(self) -> List[int]:
+        generations = []
+        for name in os.listdir(self.directory):
+            match = _JOURNAL_NAME.match(name)
+            if match:
+                generations.append(int(match.group(1)))
+        return sorted(generations)
+
+    def _write_journal(self, changes: List[Union[Document, int]]):
+        if self._journal is None:
+            return
+        for change in changes:
+            record = [change.review_id, change.day, change.terms] if isinstance(change, Document) else [change]
+            self._journal.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._journal.flush()
+        self._journal_records += len(changes)
+
+    def _replay(self, path: str) -> int:
+        records = 0
+        with open(path, encoding="utf-8") as journal:
+            for line in journal:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn last line from a crash; everything before it is complete
+                    logger.warning(f"Skipping an incomplete record at the end of {path}")
+                    break
+                if len(record) == 3:
+                    self._put(Document(record[0], record[1], tuple(record[2])))
+                else:
+                    self._delete(record[0])
+                records += 1
+        return records
+
+    def _serialize(self) -> Tuple[Dict[str, Any], List[bytes]]:
+        """Live documents only: deleted slots are dropped and documents renumbered on load"""
+        live = [number for number, alive in enumerate(self._alive) if alive]
+        reviews = array('Q', (self._reviews[number] for number in live))
+        days = array('i', (self._days[number] for number in live))
+        lengths = array('I', (len(self._forward[number]) for number in live))
+        terms = b"".join(self._forward[number].tobytes() for number in live)
+        meta = {"generation": self._generation, "documents": len(live), "terms": self._terms, "rebuilt_at": self._rebuilt_at}
+        return meta, [reviews.tobytes(), days.tobytes(), lengths.tobytes(), terms]
+
+    def _write_snapshot(self, meta: Dict[str, Any], blocks: List[bytes]):
+        path = os.path.join(self.directory, SNAPSHOT_FILE)
+        encoded = json.dumps(meta, separators=(",", ":")).encode("utf-8")
+        with open(path + ".tmp", "wb") as snapshot:
+            snapshot.write(_SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(encoded)))
+            snapshot.write(encoded)
+            for block in blocks:
+                snapshot.write(block)
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(path + ".tmp", path)
+
+    def _read_snapshot(self) -> int:
+        """Load the snapshot, if any; returns the first journal generation it does not cover"""
+        path = os.path.join(self.directory, SNAPSHOT_FILE)
+        if not os.path.exists(path):
+            return 0
+        with open(path, "rb") as snapshot:
+            data = snapshot.read()
+        magic, version, meta_length = _SNAPSHOT_HEADER.unpack_from(data)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError(f"{path} is not a version {SNAPSHOT_VERSION} search index snapshot")
+        offset = _SNAPSHOT_HEADER.size
+        meta = json.loads(data[offset:offset + meta_length])
+        offset += meta_length
+
+        def block(typecode: str, count: int) -> array:
+            nonlocal offset
+            values = array(typecode)
+            values.frombytes(data[offset:offset + count * values.itemsize])
+            offset += count * values.itemsize
+            return values
+
+        count = meta["documents"]
+        self._rebuilt_at = meta.get("rebuilt_at", 0.0)
+        self._reviews = block('Q', count)
+        self._days = block('i', count)
+        lengths = block('I', count)
+        flat = block('I', sum(lengths))
+        for name in meta["terms"]:
+            self._term_id(name)
+
+        self._forward = []
+        start = 0
+        for length in lengths:
+            self._forward.append(flat[start:start + length])
+            start += length
+        self._doc_numbers = {review_id: number for number, review_id in enumerate(self._reviews)}
+        self._alive = bytearray(b"\x01" * count)
+
+        # Invert the forward index: documents are read in number order, so postings come out sorted
+        if NUMPY_AVAILABLE and len(flat):
+            import numpy as np
+            term_ids = np.frombuffer(flat, dtype=np.uint32)
+            numbers = np.repeat(np.arange(count, dtype=np.uint32), np.frombuffer(lengths, dtype=np.uint32))
+            numbers = numbers[np.argsort(term_ids, kind="stable")]
+            bounds = np.cumsum(np.bincount(term_ids, minlength=len(self._terms)))
+            start = 0
+            for term_id, end in enumerate(bounds.tolist()):
+                self._postings[term_id].frombytes(numbers[start:end].tobytes())
+                start = end
+        else:
+            for number, term_ids in enumerate(self._forward):
+                for term_id in term_ids:
+                    self._postings[term_id].append(number)
+        return meta["generation"]
+
+    def load(self):
+        """Read the snapshot and replay newer journals (once; later calls return at once)"""
+        if self.loaded:
+            return
+        with self._lock:
+            if self.loaded:
+                return
+            started = time.perf_counter()
+            if NUMPY_AVAILABLE:
+                import numpy  # the first search should not pay for the import
+            os.makedirs(self.directory, exist_ok=True)
+            self._reset()
+            try:
+                generation = self._read_snapshot()
+            except Exception as e:
+                logger.error(f"Unreadable search index snapshot in {self.directory} ({e}), starting empty: rebuild it")
+                self._reset()
+                generation = 0
+            journals = [number for number in self._journal_generations() if number >= generation]
+            records = sum(self._replay(self._journal_path(number)) for number in journals)
+
+            self._generation = max([generation, *journals])
+            self._journal = open(self._journal_path(self._generation), "a", encoding="utf-8")
+            self._journal_records = records
+            self.loaded = True
+            logger.info(
+                f"Search index loaded: {len(self._doc_numbers)} reviews, {len(self._terms)} terms, "
+                f"{records} journal records replayed in {time.perf_counter() - started:.2f}s"
+            )
+
+    def compact(self):
+        """Write a snapshot of the current state and drop the journals it covers"""
+        if self.directory is None:
+            return
+        with self._lock:
+            self._compacting = True
+            if self._journal is not None:
+                self._journal.close()
+            # Changes from here on go to the next journal, which the snapshot does not cover
+            self._generation += 1
+            self._journal = open(self._journal_path(self._generation), "a", encoding="utf-8")
+            self._journal_records = 0
+            meta, blocks = self._serialize()
+        try:
+            self._write_snapshot(meta, blocks)
+            for number in self._journal_generations():
+                if number < self._generation:
+                    os.remove(self._journal_path(number))
+            logger.info(f"Search index snapshot written: {meta['documents']} reviews (generation {self._generation})")
+        except OSError as e:
+            logger.error(f"Failed to write the search index snapshot: {e}")
+        finally:
+            self._compacting = False
+
+    async def rebuild(self, db, batch_size: int = 1000) -> int:
+        """
+        Re-index the current analysis of every review from MySQL. Writes that happen
+        meanwhile keep updating this index and are replayed onto the rebuilt one.
+        """
+        self.load()
+        fresh = SearchIndex()
+        started_at = time.time()
+        with self._lock:
+            self._rebuild_log = []
+        try:
+            reviews = 0
+            async for rows in db.iter_current_results(batch_size):
+                for row in rows:
+                    fresh._put(document_from_row(row))
+                reviews += len(rows)
+            with self._lock:
+                for change in self._rebuild_log:
+                    fresh._apply_change(change)
+                self._adopt(fresh)
+                self._rebuilt_at = started_at
+        finally:
+            with self._lock:
+                self._rebuild_log = None
+        await asyncio.to_thread(self.compact)
+        logger.info(f"Search index rebuilt from {reviews} reviews")
+        return reviews
+
+    def close(self):
+        """Fold the journal into a snapshot so the next start loads quickly"""
+        if not self.loaded or self.directory is None:
+            return
+        if self._journal_records:
+            self.compact()
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "loaded": self.loaded,
+                "reviews": len(self._doc_numbers),
+                "terms": len(self._terms),
+                "postings": sum(len(posting) for posting in self._postings),
+                "empty_slots": len(self._alive) - len(self._doc_numbers),
+                "journal_records": self._journal_records,
+                "generation": self._generation,
+                "rebuilt_at": self._rebuilt_at or None,
+                "missed_external_writes_at": self.missed_writes_at(),
+            }
+
+def search_arguments(request: SearchRequest) -> Dict[str, Any]:
+    """SearchIndex.search arguments for a /search request"""
+    all_of: List[List[str]] = []
+    if request.sme_id is not None:
+        all_of.append([term("sme", request.sme_id)])
+    if request.sentiment:
+        all_of.append([term("sentiment", label.value) for label in request.sentiment])
+    all_of.extend([term("keyword", keyword)] for keyword in request.keywords)
+    all_of.extend([term("topic", topic)] for topic in request.topics)
+    if request.keywords_any:
+        all_of.append([term("keyword", keyword) for keyword in request.keywords_any])
+    if request.topics_any:
+        all_of.append([term("topic", topic) for topic in request.topics_any])
+    none_of = [term("keyword", keyword) for keyword in request.exclude_keywords]
+    none_of += [term("topic", topic) for topic in request.exclude_topics]
+    return {
+        "all_of": all_of,
+        "none_of": none_of,
+        "date_from": request.date_from,
+        "date_to": request.date_to,
+        "facets": list(dict.fromkeys(request.facets)),
+        "facet_limit": request.facet_limit,
+        "limit": request.limit,
+        "after_review_id": request.cursor,
+    }
+
+async def _rebuild():
+    from database import DatabaseManager
+
+    db = DatabaseManager()
+    await db.connect()
+    try:
+        index = SearchIndex(settings.search_index_dir)
+        await index.rebuild(db)
+        index.close()
+    finally:
+        await db.disconnect()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Rebuild the /search index from MySQL (stop the API first, or use POST /admin/search/rebuild)"
+    )
+    parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_rebuild())
@@ -0,0 +1,292 @@
+import re
+import logging
+import threading
+from typing import Optional, Dict, List, Tuple, NamedTuple
+
+from startup import module_available
+
+logger = logging.getLogger(__name__)
+
+# numpy is optional: without it batches are scored review by review with the same rules
+NUMPY_AVAILABLE = module_available("numpy")
+
+# Chunks split by the tokenizer are memoised; the cache is cleared when it reaches this size
+MAX_CACHED_CHUNKS = 200000
+
+class TokenInfo(NamedTuple):
+    """Everything Sentiment.assessments looks at for one (lower-cased) token"""
+    word_id: int                   # index into the lexicon arrays, -1 when unknown
+    modifier: bool                 # known word with an adverb (RB) sense
+    ly: bool                       # ends with "ly" (a modifier of a following negation)
+    negation: bool
+    resets_negation: bool          # len(w.strip("'")) > 1
+    resets_modifier: bool          # len(w) > 2
+    emoticon: Optional[float]      # polarity of an emoticon token
+    simple: bool                   # no effect beyond its own (polarity, subjectivity)
+
+class BatchSentimentEngine:
+    """
+    Polarity and subjectivity with the semantics of TextBlob's PatternAnalyzer
+    (the pattern.en lexicon, intensifiers, negation, exclamation marks and
+    emoticons), scored a whole batch at a time.
+
+    The lexicon is read once into arrays indexed by word id. Texts are tokenized
+    like pattern's find_tokens, with the per-chunk punctuation splitting
+    memoised. Reviews whose tokens carry no modifier, negation, "!" or emoticon
+    (each known word then simply contributes its own scores) are averaged for
+    the whole batch with numpy; the others go through a port of
+    Sentiment.assessments over the pre-resolved tokens. Scores match TextBlob up
+    to floating-point rounding.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._chunks: Dict[str, List[str]] = {}
+        self._tokens: Dict[str, TokenInfo] = {}
+
+    def load(self):
+        """Read the pattern.en lexicon (imports TextBlob on first use)"""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            from textblob import _text
+            from textblob.en import sentiment as lexicon
+
+            len(lexicon)  # lazydict: loads en-sentiment.xml and the derived -ly adverbs
+            words = sorted(dict.keys(lexicon))
+            self._text = _text
+            self._negations = frozenset(lexicon.negations)
+            self._modifiers = tuple(lexicon.modifiers)
+            self._vocabulary = {word: index for index, word in enumerate(words)}
+            self._polarity = [float(dict.__getitem__(lexicon, word)[None][0]) for word in words]
+            self._subjectivity = [float(dict.__getitem__(lexicon, word)[None][1]) for word in words]
+            self._intensity = [float(dict.__getitem__(lexicon, word)[None][2]) for word in words]
+            self._is_modifier = [
+                any(pos in dict.__getitem__(lexicon, word) for pos in self._modifiers) for word in words
+            ]
+            # First match wins, in EMOTICONS order, as in Sentiment.assessments
+            self._emoticons: Dict[str, float] = {}
+            for (_, polarity), faces in _text.EMOTICONS.items():
+                for face in faces:
+                    self._emoticons.setdefault(face.lower(), polarity)
+            self._punctuation = tuple(_text.PUNCTUATION.replace(".", ""))
+            self._replacements = [(re.compile(a), b) for a, b in _text.replacements.items()]
+            self._linebreak = re.compile(r"\n{2,}")
+            self._whitespace = re.compile(r"\s+")
+            self._np_polarity = self._np_subjectivity = None
+            if NUMPY_AVAILABLE:
+                import numpy as np
+                self._np_polarity = np.array(self._polarity, dtype=np.float64)
+                self._np_subjectivity = np.array(self._subjectivity, dtype=np.float64)
+            self._loaded = True
+            logger.info(f"Sentiment lexicon loaded: {len(words)} words")
+
+    def _split_chunk(self, chunk: str) -> List[str]:
+        """Punctuation splitting of one whitespace-delimited chunk, as in find_tokens"""
+        _text = self._text
+        punctuation = self._punctuation
+        replace = _text.replacements
+        tokens, tail = [], []
+        t = chunk
+        while t.startswith(punctuation) and t not in replace:
+            tokens.append(t[0])
+            t = t[1:]
+        while t.endswith(punctuation + (".",)) and t not in replace:
+            if t.endswith(punctuation):
+                tail.append(t[-1])
+                t = t[:-1]
+            if t.endswith("..."):
+                tail.append("...")
+                t = t[:-3].rstrip(".")
+            if t.endswith("."):
+                if t in _text.ABBREVIATIONS or _text.RE_ABBR1.match(t) is not None \
+                        or _text.RE_ABBR2.match(t) is not None or _text.RE_ABBR3.match(t) is not None:
+                    break
+                tail.append(t[-1])
+                t = t[:-1]
+        if t != "":
+            tokens.append(t)
+        tokens.extend(reversed(tail))
+        return tokens
+
+    def tokenize(self, text: str) -> List[str]:
+        """Lower-cased tokens, identical to " ".join(find_tokens(text)).split() as used by PatternAnalyzer"""
+        _text = self._text
+        string = text
+        for pattern, replacement in self._replacements:
+            string = pattern.sub(replacement, string)
+        string = string.replace("“", " “ ").replace("”", " ” ").replace("‘", " ‘ ") \
+            .replace("’", " ’ ").replace("'", " ' ").replace('"', ' " ')
+        string = string.replace("\r\n", "\n")
+        string = self._linebreak.sub(" %s " % _text.EOS, string)
+        string = self._whitespace.sub(" ", string)
+
+        chunks = self._chunks
+        if len(chunks) > MAX_CACHED_CHUNKS:
+            chunks.clear()
+        tokens: List[str] = []
+        for chunk in _text.TOKEN.findall(string + " "):
+            split = chunks.get(chunk)
+            if split is None:
+                split = chunks[chunk] = self._split_chunk(chunk)
+            tokens.extend(split)
+
+        # Sentence grouping matters only for the sarcasm / emoticon merges below. A
+        # per-sentence match is also a match in the joined text, so without one
+        # the grouping can be skipped (find_tokens drops every EOS marker).
+        eos = _text.EOS
+        joined = " ".join(token for token in tokens if token != eos)
+        if "(" not in joined and _text.RE_EMOTICONS.search(joined) is None:
+            return joined.lower().split()
+
+        sentences, i, j = [[]], 0, 0
+        while j < len(tokens):
+            if tokens[j] in ("...", ".", "!", "?", eos):
+                while j < len(tokens) and tokens[j] in ("'", "\"", "”", "’", "...", ".", "!", "?", ")", eos):
+                    if tokens[j] in ("'", "\"") and sentences[-1].count(tokens[j]) % 2 == 0:
+                        break
+                    j += 1
+                sentences[-1].extend(t for t in tokens[i:j] if t != eos)
+                sentences.append([])
+                i = j
+            j += 1
+        sentences[-1].extend(tokens[i:j])
+
+        words: List[str] = []
+        for sentence in sentences:
+            if not sentence:
+                continue
+            sentence = " ".join(sentence)
+            if "(" in sentence:
+                sentence = _text.RE_SARCASM.sub("(!)", sentence)
+            sentence = _text.RE_EMOTICONS.sub(lambda m: m.group(1).replace(" ", "") + m.group(2), sentence)
+            words.extend(sentence.split())
+        return [word.lower() for word in words]
+
+    def _token_info(self, word: str) -> TokenInfo:
+        info = self._tokens.get(word)
+        if info is not None:
+            return info
+        word_id = self._vocabulary.get(word, -1)
+        negation = word in self._negations
+        emoticon = None
+        if word_id < 0 and word.isalpha() is False and len(word) <= 5 and word not in self._text.PUNCTUATION:
+            emoticon = self._emoticons.get(word)
+        modifier = word_id >= 0 and self._is_modifier[word_id]
+        info = TokenInfo(
+            word_id=word_id,
+            modifier=modifier,
+            ly=word.endswith("ly"),
+            negation=negation,
+            resets_negation=len(word.strip("'")) > 1,
+            resets_modifier=len(word) > 2,
+            emoticon=emoticon,
+            simple=not (modifier or negation or emoticon is not None or word in ("!", "(!)")),
+        )
+        if len(self._tokens) > MAX_CACHED_CHUNKS:
+            self._tokens.clear()
+        self._tokens[word] = info
+        return info
+
+    def _assess(self, words: List[str], infos: List[TokenInfo]) -> Tuple[float, float]:
+        """Port of pattern's Sentiment.assessments + average for one token sequence"""
+        polarity, subjectivity, intensity, negated = [], [], [], []
+        modifier_ly: Optional[bool] = None  # set while the previous known word is a modifier
+        negation = False
+        for word, info in zip(words, infos):
+            if info.word_id >= 0:
+                p = self._polarity[info.word_id]
+                s = self._subjectivity[info.word_id]
+                i = self._intensity[info.word_id]
+                if modifier_ly is None:
+                    polarity.append(p)
+                    subjectivity.append(s)
+                    intensity.append(i)
+                    negated.append(False)
+                else:
+                    polarity[-1] = max(-1.0, min(p * intensity[-1], +1.0))
+                    subjectivity[-1] = max(-1.0, min(s * intensity[-1], +1.0))
+                    intensity[-1] = i
+                if negation:
+                    intensity[-1] = 1.0 / intensity[-1]
+                    negated[-1] = True
+                modifier_ly = info.ly if info.modifier else None
+                negation = info.negation
+            else:
+                if info.negation:
+                    negation = True
+                elif negation and info.resets_negation:
+                    negation = False
+                if negation and modifier_ly is not None and modifier_ly:
+                    negated[-1] = True
+                    negation = False
+                elif modifier_ly is not None and info.resets_modifier:
+                    modifier_ly = None
+                if word == "!" and polarity:
+                    polarity[-1] = max(-1.0, min(polarity[-1] * 1.25, +1.0))
+                if word == "(!)":
+                    polarity.append(0.0)
+                    subjectivity.append(1.0)
+                    intensity.append(1.0)
+                    negated.append(False)
+                if info.emoticon is not None:
+                    polarity.append(info.emoticon)
+                    subjectivity.append(1.0)
+                    intensity.append(1.0)
+                    negated.append(False)
+        if not polarity:
+            return 0.0, 0.0
+        total = sum(p * -0.5 if n else p for p, n in zip(polarity, negated))
+        return total / len(polarity), sum(subjectivity) / len(subjectivity)
+
+    def score(self, text: str) -> Tuple[float, float]:
+        """(polarity, subjectivity) of one text"""
+        return self.score_batch([text])[0]
+
+    def score_batch(self, texts: List[str]) -> List[Tuple[float, float]]:
+        """(polarity, subjectivity) of every text, in input order"""
+        self.load()
+        scores: List[Optional[Tuple[float, float]]] = [None] * len(texts)
+        simple_rows: List[int] = []
+        simple_ids: List[int] = []
+        simple_texts: List[int] = []
+
+        for index, text in enumerate(texts):
+            words = self.tokenize(text)
+            infos = [self._token_info(word) for word in words]
+            if all(info.simple for info in infos):
+                ids = [info.word_id for info in infos if info.word_id >= 0]
+                simple_texts.append(index)
+                simple_rows.extend([len(simple_texts) - 1] * len(ids))
+                simple_ids.extend(ids)
+            else:
+                scores[index] = self._assess(words, infos)
+
+        if simple_texts:
+            for index, score in zip(simple_texts, self._average(simple_rows, simple_ids, len(simple_texts))):
+                scores[index] = score
+        return scores
+
+    def _average(self, rows: List[int], ids: List[int], count: int) -> List[Tuple[float, float]]:
+        """Mean lexicon polarity and subjectivity per row; rows without known words score 0"""
+        if self._np_polarity is not None:
+            import numpy as np
+            rows_array = np.array(rows, dtype=np.int64)
+            ids_array = np.array(ids, dtype=np.int64)
+            counts = np.bincount(rows_array, minlength=count)
+            divisor = np.maximum(counts, 1)
+            polarity = np.bincount(rows_array, weights=self._np_polarity[ids_array], minlength=count) / divisor
+            subjectivity = np.bincount(rows_array, weights=self._np_subjectivity[ids_array], minlength=count) / divisor
+            return list(zip(polarity.tolist(), subjectivity.tolist()))
+
+        sums = [[0.0, 0.0, 0] for _ in range(count)]
+        for row, word_id in zip(rows, ids):
+            sums[row][0] += self._polarity[word_id]
+            sums[row][1] += self._subjectivity[word_id]
+            sums[row][2] += 1
+        return [(p / (n or 1), s / (n or 1)) for p, s, n in sums]
+
+sentiment_engine = BatchSentimentEngine()
@@ -0,0 +1,53 @@
+import time
+import logging
+import importlib.util
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, Iterator
+
+logger = logging.getLogger(__name__)
+
+# Reference point for startup timings; main imports this module first
+PROCESS_STARTED = time.monotonic()
+
+STARTUP_MODES = ("eager", "background", "lazy")
+
+def module_available(name: str) -> bool:
+    """Whether a module can be imported, without importing it"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+class StartupTracker:
+    """Durations of import and warm-up phases, and whether the service is ready to serve"""
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self.ready_at: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def record(self, phase: str, seconds: float):
+        self.phases[phase] = round(seconds, 4)
+
+    @contextmanager
+    def timed(self, phase: str) -> Iterator[None]:
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record(phase, time.monotonic() - started)
+
+    def mark_ready(self):
+        if self.ready_at is None:
+            self.ready_at = time.monotonic()
+            logger.info(f"Service ready {self.ready_at - PROCESS_STARTED:.2f}s after start: {self.phases}")
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "uptime_seconds": round(time.monotonic() - PROCESS_STARTED, 3),
+            "ready_after_seconds": round(self.ready_at - PROCESS_STARTED, 3) if self.ready_at else None,
+            "phases": dict(self.phases),
+            "error": self.error,
+        }
+
+startup_tracker = StartupTracker()
@@ -0,0 +1,263 @@
+import json
+import time
+import logging
+import asyncio
+from typing import Optional, Dict, Any, AsyncIterator, List, Tuple
+
+from pydantic import ValidationError
+
+from config import settings
+from database import DatabaseManager
+from ai_analyzer import AIAnalyzer
+from models import ReviewAnalysisRequest, AnalysisResult
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+async def iter_ndjson_lines(body: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[Tuple[int, bytes]]:
+    """Split a byte stream into (line number, line) pairs without buffering the whole body"""
+    buffer = b""
+    line_number = 0
+    async for chunk in body:
+        buffer += chunk
+        # Scan with an offset and keep the unfinished line once per chunk, not once per line
+        start = 0
+        while True:
+            newline = buffer.find(b"\n", start)
+            if newline < 0:
+                break
+            line = buffer[start:newline]
+            start = newline + 1
+            line_number += 1
+            if line.strip():
+                yield line_number, line
+        buffer = buffer[start:]
+        if len(buffer) > max_line_bytes:
+            raise ValueError(f"Line {line_number + 1} exceeds {max_line_bytes} bytes")
+    if buffer.strip():
+        yield line_number + 1, buffer
+
+class StreamProcessor:
+    """
+    Incremental NDJSON analysis: records are parsed as they arrive, checked against
+    their stored results in batches, analyzed by a fixed number of workers, written
+    in small bulk batches and emitted as soon as they are stored. Queues between the stages are bounded, so reading the request
+    pauses while the window is full and memory is bounded by the window size.
+    """
+
+    def __init__(self, analyzer: AIAnalyzer, concurrency: Optional[int] = None):
+        self.analyzer = analyzer
+        self.concurrency = max(1, concurrency or settings.batch_concurrency)
+
+    async def process(self, body: AsyncIterator[bytes], db: DatabaseManager) -> AsyncIterator[Dict[str, Any]]:
+        """Yield one result dict per record, in completion order, then a summary dict"""
+        window = self.concurrency * 2
+        inbox: asyncio.Queue = asyncio.Queue(maxsize=window)
+        to_analyze: asyncio.Queue = asyncio.Queue(maxsize=window)
+        to_store: asyncio.Queue = asyncio.Queue(maxsize=window)
+        outbox: asyncio.Queue = asyncio.Queue(maxsize=window)
+        summary = {"total_processed": 0, "success_count": 0, "error_count": 0}
+        started = time.perf_counter()
+
+        tasks = [asyncio.create_task(self._read(body, inbox, outbox))]
+        tasks.append(asyncio.create_task(self._check(inbox, to_analyze, to_store, db)))
+        tasks += [asyncio.create_task(self._analyze(to_analyze, to_store)) for _ in range(self.concurrency)]
+        tasks.append(asyncio.create_task(self._store(to_store, outbox, db)))
+
+        try:
+            while True:
+                result = await outbox.get()
+                if result is _END:
+                    break
+                summary["total_processed"] += 1
+                summary["success_count" if result["status"] == "success" else "error_count"] += 1
+                yield result
+
+            # Surface a reader failure (e.g. an oversized line) in the summary
+            reader_error = tasks[0].exception() if tasks[0].done() else None
+            if reader_error is not None:
+                summary["error"] = str(reader_error)
+
+            summary["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+            yield {"summary": summary}
+
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _read(self, body: AsyncIterator[bytes], inbox: asyncio.Queue, outbox: asyncio.Queue):
+        try:
+            async for line_number, line in iter_ndjson_lines(body, settings.stream_max_line_bytes):
+                try:
+                    request = ReviewAnalysisRequest.model_validate_json(line)
+                except ValidationError as e:
+                    await outbox.put({"line": line_number, "status": "error", "error": f"Invalid record: {e.errors()[0]['msg']}"})
+                    continue
+                await inbox.put((line_number, request))
+        finally:
+            await inbox.put(_END)
+
+    async def _check(self, inbox: asyncio.Queue, to_analyze: asyncio.Queue, to_store: asyncio.Queue, db: DatabaseManager):
+        """
+        Resolve the analysis key of the records that are ready and look up their stored
+        results in one query; current ones go straight to the writer, the others to the analyzers
+        """
+        if not self.analyzer.ready:
+            await self.analyzer.ensure_initialized()
+        try:
+            finished = False
+            while not finished:
+                ready = [await inbox.get()]
+                while not inbox.empty() and len(ready) < settings.db_bulk_chunk_size:
+                    ready.append(inbox.get_nowait())
+                if ready[-1] is _END:
+                    ready.pop()
+                    finished = True
+
+                keyed = []
+                for line_number, request in ready:
+                    try:
+                        key = self.analyzer.analysis_key(
+                            request.content, request.language_code, request.sme_id, request.industry
+                        )
+                    except Exception as e:
+                        logger.error(f"Error in stream analysis for review {request.review_id}: {str(e)}")
+                        await to_store.put((line_number, request, None, str(e), None))
+                        continue
+                    keyed.append((line_number, request, key))
+
+                current = await self._current_analyses(keyed, db)
+                for line_number, request, key in keyed:
+                    stored = current.get(request.review_id)
+                    if stored is not None and stored["content_hash"] == key.content_hash:
+                        await to_store.put((line_number, request, None, None, stored))
+                    else:
+                        await to_analyze.put((line_number, request, key))
+        finally:
+            for _ in range(self.concurrency):
+                await to_analyze.put(_END)
+
+    async def _analyze(self, to_analyze: asyncio.Queue, to_store: asyncio.Queue):
+        try:
+            while True:
+                item = await to_analyze.get()
+                if item is _END:
+                    return
+                line_number, request, key = item
+                try:
+                    analysis = await self.analyzer.analyze_text(
+                        text=request.content,
+                        language=key.language,
+                        sme_id=request.sme_id,
+                        industry=request.industry,
+                        review_id=request.review_id
+                    )
+                    await to_store.put((line_number, request, analysis, None, None))
+                except Exception as e:
+                    logger.error(f"Error in stream analysis for review {request.review_id}: {str(e)}")
+                    await to_store.put((line_number, request, None, str(e), None))
+        finally:
+            await to_store.put(_END)
+
+    async def _current_analyses(self, keyed: List[tuple], db: DatabaseManager) -> Dict[int, Dict[str, Any]]:
+        """Stored results of the records that are still current, read in one query"""
+        if not settings.analysis_skip_unchanged or not keyed:
+            return {}
+        analysis_model = self.analyzer.analysis_model
+        wanted = {request.review_id: (key.content_hash, analysis_model) for _, request, key in keyed}
+        try:
+            return await db.get_current_analyses(wanted)
+        except Exception as e:
+            logger.warning(f"Could not read stored analyses ({e}), analyzing {len(keyed)} streamed reviews")
+            return {}
+
+    async def _store(self, to_store: asyncio.Queue, outbox: asyncio.Queue, db: DatabaseManager):
+        """Write whatever analyses are ready as one bulk insert, then emit them"""
+        finished_workers = 0
+        try:
+            while finished_workers < self.concurrency:
+                ready = [await to_store.get()]
+                while not to_store.empty() and len(ready) < settings.db_bulk_chunk_size:
+                    ready.append(to_store.get_nowait())
+
+                batch = []
+                for item in ready:
+                    if item is _END:
+                        finished_workers += 1
+                    else:
+                        batch.append(item)
+                for result in await self._write(batch, db):
+                    await outbox.put(result)
+        finally:
+            await outbox.put(_END)
+
+    async def _write(self, batch: List[tuple], db: DatabaseManager) -> List[Dict[str, Any]]:
+        analyzed = [(line, request, analysis) for line, request, analysis, error, stored in batch if analysis is not None]
+        results = [
+            self._unchanged(line, request, stored)
+            for line, request, analysis, error, stored in batch if stored is not None
+        ] + [
+            {"line": line, "review_id": request.review_id, "status": "error", "error": error}
+            for line, request, analysis, error, stored in batch if error is not None
+        ]
+        if not analyzed:
+            return results
+
+        try:
+            analysis_ids = await db.store_analysis_results_bulk(
+                [(request.review_id, analysis) for _, request, analysis in analyzed]
+            )
+        except Exception as e:
+            logger.error(f"Failed to store streamed analysis results: {e}")
+            return results + [
+                {"line": line, "review_id": request.review_id, "status": "error", "error": str(e)}
+                for line, request, _ in analyzed
+            ]
+
+        return results + [
+            self._success(line, request, analysis, analysis_id)
+            for (line, request, analysis), analysis_id in zip(analyzed, analysis_ids)
+        ]
+
+    @staticmethod
+    def _success(line: int, request: ReviewAnalysisRequest, analysis: AnalysisResult, analysis_id: int) -> Dict[str, Any]:
+        return {
+            "line": line,
+            "review_id": request.review_id,
+            "analysis_id": analysis_id,
+            "status": "success",
+            "sentiment_score": analysis.sentiment_score,
+            "sentiment_label": analysis.sentiment_label.value,
+            "confidence_score": analysis.confidence_score,
+            "keywords": analysis.keywords,
+            "topics": analysis.topics,
+            "emotions": analysis.emotions,
+            "duplicate_cluster_id": analysis.duplicate_cluster_id,
+        }
+
+    @staticmethod
+    def _unchanged(line: int, request: ReviewAnalysisRequest, stored: Dict[str, Any]) -> Dict[str, Any]:
+        """Result for a review whose stored analysis is current; nothing was written"""
+        return {
+            "line": line,
+            "review_id": request.review_id,
+            "analysis_id": stored["id"],
+            "status": "success",
+            "unchanged": True,
+            "sentiment_score": float(stored["sentiment_score"]),
+            "sentiment_label": stored["sentiment_label"],
+            "confidence_score": float(stored["confidence_score"]),
+            "keywords": stored["keywords"],
+            "topics": stored["topics"],
+            "emotions": stored["emotions"],
+            "duplicate_cluster_id": None,
+        }
+
+def format_ndjson(result: Dict[str, Any]) -> bytes:
+    return (json.dumps(result) + "\n").encode("utf-8")
+
+def format_sse(result: Dict[str, Any]) -> bytes:
+    event = "summary" if "summary" in result else "result"
+    return f"event: {event}\ndata: {json.dumps(result)}\n\n".encode("utf-8")
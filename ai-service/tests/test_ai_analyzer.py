@@ -0,0 +1,78 @@
+import asyncio
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from ai_analyzer import AIAnalyzer
+from analysis_cache import AnalysisCache
+from near_duplicates import NearDuplicateIndex
+
+class BrokenPool(Executor):
+    def __init__(self):
+        self.shutdowns = []
+
+    def submit(self, function, *args, **kwargs):
+        future = Future()
+        future.set_exception(BrokenProcessPool("a worker died"))
+        return future
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self.shutdowns.append((wait, cancel_futures))
+
+def test_broken_pool_is_restarted_once_for_all_callers():
+    analyzer = AIAnalyzer()
+    broken = analyzer.executor = BrokenPool()
+    pools = []
+
+    async def setup():
+        await asyncio.sleep(0.01)
+        pools.append(ThreadPoolExecutor(1))
+        analyzer.executor = pools[-1]
+
+    analyzer._setup_fallback_executor = setup
+
+    async def scenario():
+        return await asyncio.gather(*(analyzer._run_in_executor(pow, value, 2) for value in range(8)))
+
+    try:
+        assert asyncio.run(scenario()) == [value * value for value in range(8)]
+        assert len(pools) == 1
+        assert broken.shutdowns == [(False, True)]
+    finally:
+        for pool in pools:
+            pool.shutdown()
+
+REVIEW = "The delivery was late and the package arrived damaged but support replaced it quickly"
+SIMILAR = "The delivery was late and the package arrived damaged but support replaced it very quickly"
+
+def test_exact_repeats_skip_the_near_duplicate_lookup(tmp_path):
+    analyzer = AIAnalyzer()
+    analyzer.ready = True
+    analyzer.cache = AnalysisCache(disk_path=str(tmp_path / "cache.sqlite3"))
+    analyzer.near_duplicates = NearDuplicateIndex(path=str(tmp_path / "near_duplicates.sqlite3"), min_tokens=8)
+    lookups = []
+    fingerprint_async = analyzer.near_duplicates.fingerprint_async
+
+    async def counting(text, namespace, executor=None):
+        lookups.append(text)
+        return await fingerprint_async(text, namespace, executor)
+
+    analyzer.near_duplicates.fingerprint_async = counting
+
+    async def scenario():
+        first = await analyzer.analyze_text(REVIEW, "en", review_id=1)
+        repeat = await analyzer.analyze_text(REVIEW, "en", review_id=2)
+        similar = await analyzer.analyze_text(SIMILAR, "en", review_id=3)
+        similar_repeat = await analyzer.analyze_text(SIMILAR, "en", review_id=4)
+        return first, repeat, similar, similar_repeat
+
+    try:
+        first, repeat, similar, similar_repeat = asyncio.run(scenario())
+        assert repeat == first
+        # The near-duplicate hit fills the exact cache, flag included
+        assert similar.duplicate_cluster_id is not None
+        assert similar_repeat == similar
+        assert lookups == [REVIEW, SIMILAR]
+        assert analyzer.cache.stats["hits"] == 2
+    finally:
+        analyzer.near_duplicates.close()
+        analyzer.cache.close()
@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from analysis_cache import AnalysisCache
+from models import AnalysisResult
+
+def make_result(model: str = "textblob") -> AnalysisResult:
+    return AnalysisResult(
+        sentiment_score=0.5,
+        sentiment_label="positive",
+        confidence_score=0.5,
+        keywords=[],
+        topics=[],
+        emotions={},
+        language_code="en",
+        analysis_model=model,
+    )
+
+def test_concurrent_identical_calls_compute_once():
+    async def scenario():
+        cache = AnalysisCache(max_entries=10, ttl_seconds=60, disk_path="")
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return make_result()
+
+        results = await asyncio.gather(*(
+            cache.get_or_compute("Great service", "en", "textblob", compute) for _ in range(5)
+        ))
+        return cache, calls, results
+
+    cache, calls, results = asyncio.run(scenario())
+    assert calls == 1
+    assert all(result == results[0] for result in results)
+    assert cache.stats['coalesced'] == 4
+    assert cache.stats['hits'] == 0
+
+def test_cancelling_the_first_caller_does_not_cancel_waiters():
+    async def scenario():
+        cache = AnalysisCache(max_entries=10, ttl_seconds=60, disk_path="")
+        release = asyncio.Event()
+
+        async def compute():
+            await release.wait()
+            return make_result()
+
+        first = asyncio.create_task(cache.get_or_compute("Great service", "en", "textblob", compute))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get_or_compute("Great service", "en", "textblob", compute))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        result = await waiter
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        cached = await cache.get_or_compute("Great service", "en", "textblob", compute)
+        return cache, result, cached
+
+    cache, result, cached = asyncio.run(scenario())
+    assert result.sentiment_label == "positive"
+    assert cached == result
+    assert cache.stats['hits'] == 1
+    assert not cache._inflight
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    async def scenario():
+        cache = AnalysisCache(max_entries=10, ttl_seconds=60, disk_path="")
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("backend down")
+
+        outcomes = await asyncio.gather(
+            cache.get_or_compute("Great service", "en", "textblob", fail),
+            cache.get_or_compute("Great service", "en", "textblob", fail),
+            return_exceptions=True
+        )
+        return cache, outcomes
+
+    cache, outcomes = asyncio.run(scenario())
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+    assert not cache._entries
+    assert not cache._inflight
+
+def test_degraded_results_are_not_cached():
+    async def scenario():
+        cache = AnalysisCache(max_entries=10, ttl_seconds=60, disk_path="")
+
+        async def degraded():
+            return make_result("textblob")
+
+        await cache.get_or_compute("Great service", "en", "google_cloud", degraded)
+        return cache
+
+    assert not asyncio.run(scenario())._entries
@@ -0,0 +1,109 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List
+
+import pytest
+
+from ai_analyzer import AIAnalyzer
+from backfill import BackfillCheckpoint, BackfillPipeline
+from batch_processor import BatchProcessor
+from benchmarks.fakes import FakeDatabase
+from config import settings
+from models import BackfillRequest, ReviewAnalysisRequest
+
+@pytest.fixture
+def analyzer(monkeypatch):
+    monkeypatch.setattr(settings, "fallback_executor", "inline")
+    monkeypatch.setattr(settings, "cache_enabled", False)
+    monkeypatch.setattr(settings, "near_duplicate_enabled", False)
+    monkeypatch.setattr(settings, "analysis_skip_unchanged", True)
+    analyzer = AIAnalyzer()
+    asyncio.run(analyzer.initialize())
+    yield analyzer
+    asyncio.run(analyzer.shutdown())
+
+def reviews(*contents: str) -> List[ReviewAnalysisRequest]:
+    return [
+        ReviewAnalysisRequest(review_id=index + 1, content=content, language_code="en", sme_id=1)
+        for index, content in enumerate(contents)
+    ]
+
+def test_unchanged_reviews_are_skipped(analyzer):
+    db = FakeDatabase(round_trip_ms=0, per_row_ms=0)
+    processor = BatchProcessor(analyzer)
+
+    async def scenario():
+        first = await processor.process(reviews("Great product, fast delivery", "Slow shipping"), db)
+        second = await processor.process(reviews("Great product, fast delivery", "Slow shipping"), db)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert not any(result.get("unchanged") for result in first.results)
+    assert all(result["unchanged"] for result in second.results)
+    assert [result["analysis_id"] for result in second.results] == [result["analysis_id"] for result in first.results]
+    assert second.success_count == 2
+
+def test_edited_review_is_reanalyzed_in_place(analyzer):
+    db = FakeDatabase(round_trip_ms=0, per_row_ms=0)
+    processor = BatchProcessor(analyzer)
+
+    async def scenario():
+        first = await processor.process(reviews("Great product, fast delivery", "Slow shipping"), db)
+        second = await processor.process(reviews("Terrible product, broken on arrival", "Slow shipping"), db)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    edited, untouched = second.results
+    assert not edited.get("unchanged")
+    assert untouched["unchanged"]
+    assert edited["analysis_id"] == first.results[0]["analysis_id"]
+    assert db.results[1]["sentiment_label"] == "negative"
+
+def test_force_reanalyzes_current_results(analyzer):
+    db = FakeDatabase(round_trip_ms=0, per_row_ms=0)
+    processor = BatchProcessor(analyzer)
+
+    async def scenario():
+        await processor.process(reviews("Great product, fast delivery"), db)
+        stored_at = db.results[1]["processed_at"]
+        forced = await processor.process(reviews("Great product, fast delivery"), db, force=True)
+        return stored_at, forced
+
+    stored_at, forced = asyncio.run(scenario())
+    assert not forced.results[0].get("unchanged")
+    assert db.results[1]["processed_at"] >= stored_at
+
+class BackfillDatabase(FakeDatabase):
+    """FakeDatabase with a customer_reviews table for the backfill to page through"""
+
+    def __init__(self, contents: List[str]):
+        super().__init__(round_trip_ms=0, per_row_ms=0)
+        self.reviews = [
+            {"id": index + 1, "sme_id": 1, "content": content} for index, content in enumerate(contents)
+        ]
+
+    async def fetch_reviews_for_analysis(self, after_id: int, limit: int, **filters: Any) -> List[Dict[str, Any]]:
+        return [review for review in self.reviews if review["id"] > after_id][:limit]
+
+@pytest.mark.parametrize("options, reanalyzed", [
+    (BackfillRequest(), 0),
+    (BackfillRequest(force=True), 2),
+    (BackfillRequest(stale_before=datetime(2100, 1, 1)), 2),
+])
+def test_backfill_force_and_stale_before_bypass_the_skip(analyzer, tmp_path, options, reanalyzed):
+    db = BackfillDatabase(["Great product, fast delivery", "Slow shipping"])
+    processor = BatchProcessor(analyzer)
+
+    async def scenario():
+        await processor.process(reviews("Great product, fast delivery", "Slow shipping"), db)
+        stored_at = {review_id: row["processed_at"] for review_id, row in db.results.items()}
+        await asyncio.sleep(0.001)
+        checkpoint = BackfillCheckpoint(str(tmp_path / "run.json"))
+        state = await BackfillPipeline(db, processor, options, checkpoint).run()
+        rewritten = sum(1 for review_id, row in db.results.items() if row["processed_at"] != stored_at[review_id])
+        return state, rewritten
+
+    state, rewritten = asyncio.run(scenario())
+    assert state["status"] == "completed"
+    assert state["success_count"] == 2
+    assert rewritten == reanalyzed
@@ -0,0 +1,104 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import date
+
+import pytest
+from pymysql.err import OperationalError
+
+from database import DatabaseManager
+from metrics_rollup import MetricsRollup
+from models import AnalysisResult, SentimentLabel
+
+class Cursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.lastrowid = 7
+        self.rowcount = 1
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, query, params=None):
+        self.conn.statements.append((query, params))
+        if self.conn.failures and "INSERT INTO ai_analysis_results" in query:
+            raise self.conn.failures.pop(0)
+
+    async def fetchall(self):
+        return []
+
+class Conn:
+    def __init__(self, failures=()):
+        self.failures = list(failures)
+        self.statements = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self, *args):
+        return Cursor(self)
+
+    async def begin(self):
+        pass
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+def manager(conn):
+    db = DatabaseManager()
+    db.rollup = None
+
+    @asynccontextmanager
+    async def connection(operation="other"):
+        yield conn
+
+    db._connection = connection
+    return db
+
+def result():
+    return AnalysisResult(
+        sentiment_score=0.5, sentiment_label=SentimentLabel.POSITIVE, confidence_score=0.9,
+        keywords=["fast"], topics=["shipping"], emotions={}, language_code="en", analysis_model="test"
+    )
+
+@pytest.mark.parametrize("code", [1213, 1205])
+def test_store_retries_once_after_a_deadlock_or_lock_wait_timeout(code):
+    conn = Conn([OperationalError(code, "rolled back")])
+    assert asyncio.run(manager(conn).store_analysis_result(1, result())) == 7
+    assert (conn.rollbacks, conn.commits) == (1, 1)
+
+def test_store_gives_up_after_the_retry():
+    conn = Conn([OperationalError(1213, "rolled back"), OperationalError(1213, "rolled back")])
+    with pytest.raises(OperationalError):
+        asyncio.run(manager(conn).store_analysis_result(1, result()))
+    assert (conn.rollbacks, conn.commits) == (2, 0)
+
+def test_other_errors_are_not_retried():
+    conn = Conn([OperationalError(1062, "duplicate")])
+    with pytest.raises(OperationalError):
+        asyncio.run(manager(conn).store_analysis_result(1, result()))
+    assert conn.rollbacks == 1
+
+def test_rollups_are_upserted_in_unique_key_order():
+    conn = Conn()
+    rows = {
+        review_id: {
+            "review_id": review_id, "sme_id": sme_id, "review_date": review_date,
+            "sentiment_score": 0.5, "sentiment_label": "positive", "topics": topics, "keywords": ["fast", "cheap"],
+        }
+        for review_id, sme_id, review_date, topics in [
+            (1, 2, date(2025, 8, 31), ["shipping"]),
+            (2, 1, date(2025, 9, 1), ["price", "app"]),
+            (3, 1, date(2025, 8, 4), ["delivery"]),
+        ]
+    }
+    asyncio.run(MetricsRollup(track_keywords=True).apply(conn, {}, rows))
+
+    params = [value for _, statement_params in conn.statements for value in statement_params]
+    keys = [(row[0], row[1], row[4], row[5]) for row in zip(*[iter(params)] * 10)]
+    assert len(keys) == len(set(keys)) > 20
+    assert keys == sorted(keys)
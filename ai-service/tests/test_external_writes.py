@@ -0,0 +1,35 @@
+import time
+
+import external_writes
+from external_writes import ExternalWriteMarker
+
+def test_write_within_the_interval_is_flushed_when_it_ends(tmp_path, monkeypatch):
+    monkeypatch.setattr(external_writes, "MARK_INTERVAL_SECONDS", 0.2)
+    marker = ExternalWriteMarker(str(tmp_path / "external_writes.json"))
+    marker.mark(10)
+    first = marker.last_write()
+
+    # A rebuild covers the first write, then the last job batch lands within the interval
+    covered_until = time.time()
+    time.sleep(0.01)
+    marker.mark(3)
+    assert marker.missed_since(covered_until, "search index") is None
+
+    deadline = time.time() + 2
+    while marker.missed_since(covered_until, "search index") is None and time.time() < deadline:
+        time.sleep(0.02)
+    assert marker.last_write() > covered_until > first
+
+def test_flush_records_the_newest_write(tmp_path):
+    marker = ExternalWriteMarker(str(tmp_path / "external_writes.json"))
+    marker.mark(10)
+    covered_until = time.time()
+    marker.mark(3)
+    before = time.time()
+    marker.mark(2)
+    after = time.time()
+
+    # As at process exit
+    marker.flush()
+    assert before <= marker.last_write() <= after
+    assert marker.missed_since(covered_until, "sentiment trends") == marker.last_write()
@@ -0,0 +1,154 @@
+import asyncio
+
+import pytest
+
+from config import settings
+from job_queue import JobStore, JobWorkerPool, SQLiteJobStore, JOB_COMPLETED, JOB_FAILED, JOB_PENDING, JOB_RUNNING
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+    yield store
+    store.close()
+
+def outcome(item, status="success", **extra):
+    return {**item, "status": status, **extra}
+
+def test_job_store_is_abstract():
+    with pytest.raises(TypeError):
+        JobStore()
+
+def test_claim_leases_each_item_once(store):
+    async def scenario():
+        job_id = await store.create_job([{"review_id": review_id} for review_id in range(5)])
+        first = await store.claim_items("worker-a", 3)
+        second = await store.claim_items("worker-b", 3)
+        third = await store.claim_items("worker-c", 3)
+        return job_id, first, second, third, await store.get_job(job_id)
+
+    job_id, first, second, third, job = asyncio.run(scenario())
+    assert [item["review_id"] for item in first] == [0, 1, 2]
+    assert [item["review_id"] for item in second] == [3, 4]
+    assert third == []
+    assert all(item["job_id"] == job_id for item in first + second)
+    assert job["status"] == JOB_RUNNING
+    assert job["processed"] == 0
+
+def test_complete_rolls_up_progress(store):
+    async def scenario():
+        job_id = await store.create_job([{"review_id": 1}, {"review_id": 2}])
+        items = await store.claim_items("worker-a", 10)
+        recorded = await store.complete_items("worker-a", [
+            outcome(items[0], analysis_id=10),
+            outcome(items[1], "error", error="boom"),
+        ])
+        return recorded, await store.get_job(job_id)
+
+    recorded, job = asyncio.run(scenario())
+    assert recorded == 2
+    assert job["status"] == JOB_COMPLETED
+    assert (job["processed"], job["success_count"], job["error_count"]) == (2, 1, 1)
+    assert job["progress"] == 1.0
+    assert job["finished_at"] is not None
+    assert job["errors"] == [{"review_id": 2, "error": "boom"}]
+
+def test_job_fails_when_every_item_failed(store):
+    async def scenario():
+        job_id = await store.create_job([{"review_id": 1}, {"review_id": 2}])
+        items = await store.claim_items("worker-a", 10)
+        await store.complete_items("worker-a", [outcome(item, "error", error="boom") for item in items])
+        return await store.get_job(job_id)
+
+    assert asyncio.run(scenario())["status"] == JOB_FAILED
+
+def test_requeued_lease_is_counted_once(store):
+    async def scenario():
+        job_id = await store.create_job([{"review_id": 1}])
+        slow = await store.claim_items("worker-slow", 10)
+        # The lease expires while worker-slow is still analyzing
+        requeued = await store.requeue_stale(lease_seconds=-1)
+        pending = await store.get_job(job_id)
+        fast = await store.claim_items("worker-fast", 10)
+        fast_recorded = await store.complete_items("worker-fast", [outcome(fast[0], analysis_id=2)])
+        slow_recorded = await store.complete_items("worker-slow", [outcome(slow[0], analysis_id=1)])
+        return requeued, pending, fast_recorded, slow_recorded, await store.get_job(job_id)
+
+    requeued, pending, fast_recorded, slow_recorded, job = asyncio.run(scenario())
+    assert requeued == 1
+    assert pending["processed"] == 0
+    assert (fast_recorded, slow_recorded) == (1, 0)
+    assert (job["processed"], job["success_count"], job["total"]) == (1, 1, 1)
+    assert job["progress"] == 1.0
+
+def test_fresh_leases_are_not_requeued(store):
+    async def scenario():
+        await store.create_job([{"review_id": 1}])
+        await store.claim_items("worker-a", 10)
+        return await store.requeue_stale(lease_seconds=300), await store.claim_items("worker-b", 10)
+
+    requeued, claimed = asyncio.run(scenario())
+    assert requeued == 0
+    assert claimed == []
+
+def test_jobs_survive_reopening(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+
+    async def create():
+        store = SQLiteJobStore(path)
+        try:
+            return await store.create_job([{"review_id": 7, "content": "Great"}])
+        finally:
+            store.close()
+
+    async def reopen(job_id):
+        store = SQLiteJobStore(path)
+        try:
+            return await store.get_job(job_id), await store.claim_items("worker-a", 10)
+        finally:
+            store.close()
+
+    job_id = asyncio.run(create())
+    job, items = asyncio.run(reopen(job_id))
+    assert job["status"] == JOB_PENDING
+    assert items[0]["content"] == "Great"
+
+def test_enqueue_during_an_empty_claim_wakes_the_worker(monkeypatch):
+    monkeypatch.setattr(settings, "job_poll_interval_seconds", 30.0)
+
+    class Store:
+        def __init__(self):
+            self.claims = 0
+            self.completed = asyncio.Event()
+
+        async def claim_items(self, worker_id, limit):
+            self.claims += 1
+            if self.claims == 1:
+                # A job is submitted while the claim runs, after it found nothing
+                pool.notify()
+                return []
+            if self.claims == 2:
+                return [{"id": 1, "job_id": "job", "review_id": 1}]
+            return []
+
+        async def complete_items(self, worker_id, results):
+            self.completed.set()
+            return len(results)
+
+    store = Store()
+    pool = JobWorkerPool(store, None, None, workers=1)
+
+    async def process(items):
+        return [outcome(item) for item in items]
+
+    pool._process = process
+
+    async def scenario():
+        worker = asyncio.create_task(pool._worker("worker-a"))
+        try:
+            await asyncio.wait_for(store.completed.wait(), timeout=2)
+        finally:
+            worker.cancel()
+            await asyncio.gather(worker, return_exceptions=True)
+
+    asyncio.run(scenario())
+    assert store.claims >= 2
@@ -0,0 +1,52 @@
+import pytest
+
+from ai_analyzer import AIAnalyzer
+from config import settings
+from language_detection import language_detector
+
+@pytest.fixture
+def analyzer():
+    return AIAnalyzer()
+
+@pytest.mark.parametrize("text", ["ok", "Perfect", "Excellent", "Super", "Nice", "Super service", "Excellent experience"])
+def test_short_reviews_use_the_default_language(analyzer, text):
+    assert analyzer.resolve_language(text) == settings.default_language
+
+@pytest.mark.parametrize("text", [
+    "Excellent service overall",
+    "Nice product, excellent service",
+    "Super fast delivery",
+    "Excellent product quality",
+])
+def test_cognates_do_not_outvote_english(analyzer, text):
+    assert analyzer.resolve_language(text) == "en"
+
+@pytest.mark.parametrize("text, language", [
+    ("Très bon produit, livraison rapide", "fr"),
+    ("El pedido llegó tarde otra vez", "es"),
+    ("Schnelle Lieferung, gerne wieder", "de"),
+    ("خدمة ممتازة", "ar"),
+])
+def test_supported_languages_are_detected(analyzer, text, language):
+    assert analyzer.resolve_language(text) == language
+
+def test_explicit_language_is_never_overridden(analyzer):
+    assert analyzer.resolve_language("ok", "nl") == "nl"
+    assert analyzer.resolve_language("Très bon produit", "auto") == "fr"
+
+def test_languages_without_a_lexicon_fall_back_to_the_default(analyzer):
+    text = "Ottimo prodotto, consegna veloce"
+    assert language_detector.detect(text, settings.language_detection_min_words)[0] == "it"
+    assert analyzer.resolve_language(text) == settings.default_language
+    analyzer.use_google_cloud = True
+    assert analyzer.resolve_language(text) == "it"
+
+def test_short_english_review_keeps_its_sentiment(analyzer):
+    language = analyzer.resolve_language("Perfect")
+    result = analyzer._analyze_fallback_sync("Perfect", language)
+    assert result.sentiment_label == "positive"
+    assert result.sentiment_score > 0
+
+def test_min_words_only_applies_to_latin_script():
+    assert language_detector.detect("ok", 3) == (None, 0.0)
+    assert language_detector.detect("ممتاز", 3) == ("ar", 1.0)
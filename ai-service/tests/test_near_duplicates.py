@@ -0,0 +1,66 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import near_duplicates
+from near_duplicates import NearDuplicateIndex
+from models import AnalysisResult
+
+TEXT = "The delivery was late and the package arrived damaged but support replaced it quickly"
+
+@pytest.fixture
+def index(tmp_path):
+    index = NearDuplicateIndex(path=str(tmp_path / "near_duplicates.sqlite3"), min_tokens=8)
+    yield index
+    index.close()
+
+@pytest.fixture
+def pure_python(index, monkeypatch):
+    monkeypatch.setattr(near_duplicates, "NUMPY_AVAILABLE", False)
+    monkeypatch.setattr(index.hasher, "_np_a", None)
+    monkeypatch.setattr(index.hasher, "_np_b", None)
+
+@pytest.mark.skipif(not near_duplicates.NUMPY_AVAILABLE, reason="numpy not installed")
+def test_numpy_and_pure_python_signatures_match(index):
+    with_numpy = index.fingerprint(TEXT, "ns")
+    index.hasher._np_a = index.hasher._np_b = None
+    assert index.fingerprint(TEXT, "ns") == with_numpy
+
+@pytest.mark.parametrize("executor_factory", [lambda: None, lambda: ThreadPoolExecutor(1)])
+def test_fingerprint_async_runs_off_the_loop_without_numpy(index, pure_python, executor_factory):
+    executor = executor_factory()
+
+    async def scenario():
+        return (
+            await index.fingerprint_async(TEXT, "ns", executor),
+            await index.fingerprint_async("too short", "ns", executor),
+        )
+
+    try:
+        fingerprint, short = asyncio.run(scenario())
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    assert fingerprint == index.fingerprint(TEXT, "ns")
+    assert short is None
+    assert index.stats['skipped_short'] == 1
+
+def test_edited_copy_matches_its_cluster(index):
+    async def scenario():
+        original = index.fingerprint(TEXT, "ns")
+        await index.add(original, _result(), review_id=1)
+        edited = index.fingerprint(TEXT.replace("quickly", "promptly"), "ns")
+        other = index.fingerprint("Friendly staff, clean rooms and a great breakfast every single morning", "ns")
+        return await index.lookup(edited), await index.lookup(other)
+
+    match, miss = asyncio.run(scenario())
+    assert match is not None and match.review_id == 1
+    assert match.similarity >= index.threshold
+    assert miss is None
+
+def _result():
+    return AnalysisResult(
+        sentiment_score=-0.2, sentiment_label="negative", confidence_score=0.4,
+        keywords=[], topics=["shipping"], emotions={}, language_code="en", analysis_model="textblob"
+    )
@@ -0,0 +1,133 @@
+import asyncio
+import os
+from datetime import date
+
+import pytest
+
+import search_index
+from external_writes import ExternalWriteMarker
+from search_index import SearchIndex, term
+
+def row(review_id, sentiment="negative", topics=(), keywords=(), sme_id=1, review_date=date(2025, 8, 10)):
+    return {
+        "review_id": review_id,
+        "sentiment_label": sentiment,
+        "topics": list(topics),
+        "keywords": list(keywords),
+        "sme_id": sme_id,
+        "review_date": review_date,
+    }
+
+def put(index, *rows):
+    index.apply([r["review_id"] for r in rows], {r["review_id"]: r for r in rows})
+
+def matching(index, *groups, **filters):
+    return index.search(all_of=[list(group) for group in groups], limit=1000, **filters)["review_ids"]
+
+@pytest.fixture(params=[True, False], ids=["numpy", "sets"])
+def numpy_mode(request, monkeypatch):
+    if request.param and not search_index.NUMPY_AVAILABLE:
+        pytest.skip("numpy not installed")
+    monkeypatch.setattr(search_index, "NUMPY_AVAILABLE", request.param)
+
+@pytest.fixture
+def index(tmp_path, numpy_mode):
+    index = SearchIndex(str(tmp_path / "index"), compact_every=1000)
+    yield index
+    index.close()
+
+def test_put_and_search(index):
+    put(
+        index,
+        row(1, "negative", ["shipping"], ["delivery", "late"]),
+        row(2, "positive", ["shipping"], ["delivery"]),
+        row(3, "negative", ["price"], ["expensive"], sme_id=2, review_date=date(2025, 9, 2)),
+    )
+    assert matching(index, [term("sentiment", "negative")]) == [1, 3]
+    assert matching(index, [term("keyword", "delivery")], [term("sentiment", "negative")]) == [1]
+    assert matching(index, [term("sme", 1)], date_from=date(2025, 8, 1), date_to=date(2025, 9, 1)) == [1, 2]
+    assert matching(index, [term("sme", 2)], date_to=date(2025, 9, 2)) == []
+    result = index.search(all_of=[[term("topic", "shipping")]], facets=["sentiment"])
+    assert result["total"] == 2
+    assert {facet["value"]: facet["count"] for facet in result["facets"]["sentiment"]} == {"negative": 1, "positive": 1}
+    assert result["stale"] is False
+
+def test_reanalysis_moves_terms_and_delete_removes_the_review(index):
+    put(index, row(1, "negative", ["shipping"], ["late"]), row(2, "negative", ["shipping"], ["late"]))
+    put(index, row(1, "positive", ["price"], ["cheap"]))
+    index.apply([2], {})
+
+    assert matching(index, [term("sentiment", "negative")]) == []
+    assert matching(index, [term("topic", "shipping")]) == []
+    assert matching(index, [term("keyword", "cheap")]) == [1]
+    assert index.get_stats()["reviews"] == 1
+
+def test_journal_replay_restores_the_index(tmp_path, numpy_mode):
+    directory = str(tmp_path / "index")
+    first = SearchIndex(directory, compact_every=1000)
+    put(first, row(1, topics=["shipping"]), row(2, topics=["shipping"]), row(3, topics=["price"]))
+    put(first, row(2, "positive", ["price"]))
+    first.apply([3], {})
+    # No close: a crash leaves only the journal
+    first._journal.flush()
+
+    second = SearchIndex(directory, compact_every=1000)
+    second.load()
+    try:
+        assert second.get_stats()["journal_records"] == 5
+        assert matching(second, [term("topic", "shipping")]) == [1]
+        assert matching(second, [term("topic", "price")]) == [2]
+        assert matching(second, [term("sentiment", "positive")]) == [2]
+    finally:
+        second.close()
+        first._journal.close()
+
+def test_compaction_writes_a_snapshot_and_drops_old_journals(tmp_path, numpy_mode):
+    directory = str(tmp_path / "index")
+    index = SearchIndex(directory, compact_every=1000)
+    put(index, *(row(review_id, topics=["shipping"]) for review_id in range(1, 6)))
+    index.apply([2, 4], {})
+    index.compact()
+    put(index, row(6, topics=["price"]))
+    index.close()
+
+    journals = sorted(name for name in os.listdir(directory) if name.startswith("journal."))
+    assert "snapshot.bin" in os.listdir(directory)
+    assert journals == [f"journal.{index._generation}.ndjson"]
+
+    reloaded = SearchIndex(directory, compact_every=1000)
+    reloaded.load()
+    try:
+        stats = reloaded.get_stats()
+        assert stats["reviews"] == 4
+        assert stats["empty_slots"] == 0
+        assert matching(reloaded, [term("topic", "shipping")]) == [1, 3, 5]
+        assert matching(reloaded, [term("topic", "price")]) == [6]
+    finally:
+        reloaded.close()
+
+class Database:
+    """iter_current_results of DatabaseManager over a fixed set of rows"""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def iter_current_results(self, batch_size):
+        for offset in range(0, len(self.rows), batch_size):
+            yield self.rows[offset:offset + batch_size]
+
+def test_external_writes_mark_the_index_stale_until_rebuilt(index, tmp_path):
+    marker = ExternalWriteMarker(str(tmp_path / "external_writes.json"))
+    index.external_writes = marker
+    put(index, row(1, topics=["shipping"]))
+    assert index.search(all_of=[[term("topic", "shipping")]])["stale"] is False
+
+    # A standalone job worker wrote review 2
+    marker.mark(1)
+    assert index.search(all_of=[[term("topic", "shipping")]])["stale"] is True
+    assert index.get_stats()["missed_external_writes_at"] is not None
+
+    asyncio.run(index.rebuild(Database([row(1, topics=["shipping"]), row(2, topics=["shipping"])]), batch_size=1))
+    result = index.search(all_of=[[term("topic", "shipping")]])
+    assert result["review_ids"] == [1, 2]
+    assert result["stale"] is False
@@ -0,0 +1,71 @@
+import asyncio
+import json
+
+import pytest
+
+from ai_analyzer import AIAnalyzer
+from benchmarks.fakes import FakeDatabase
+from config import settings
+from stream_processor import StreamProcessor, iter_ndjson_lines
+
+@pytest.fixture
+def analyzer(monkeypatch):
+    monkeypatch.setattr(settings, "fallback_executor", "inline")
+    monkeypatch.setattr(settings, "cache_enabled", False)
+    monkeypatch.setattr(settings, "near_duplicate_enabled", False)
+    monkeypatch.setattr(settings, "analysis_skip_unchanged", True)
+    analyzer = AIAnalyzer()
+    asyncio.run(analyzer.initialize())
+    yield analyzer
+    asyncio.run(analyzer.shutdown())
+
+async def chunked(data: bytes, size: int):
+    for offset in range(0, len(data), size):
+        yield data[offset:offset + size]
+
+def lines(data: bytes, size: int, max_line_bytes: int = 1024):
+    async def collect():
+        return [entry async for entry in iter_ndjson_lines(chunked(data, size), max_line_bytes)]
+    return asyncio.run(collect())
+
+@pytest.mark.parametrize("size", [1, 3, 7, 1000])
+def test_lines_split_across_chunks(size):
+    data = b'{"a": 1}\n\n{"b": 2}\r\n{"c": 3}'
+    assert lines(data, size) == [(1, b'{"a": 1}'), (3, b'{"b": 2}\r'), (4, b'{"c": 3}')]
+
+def test_oversized_line_is_rejected():
+    with pytest.raises(ValueError, match="Line 2"):
+        lines(b"short\n" + b"x" * 40, 8, max_line_bytes=16)
+
+def body(count: int) -> bytes:
+    records = [
+        {"review_id": review_id, "content": f"Great product number {review_id}, fast delivery", "language_code": "en"}
+        for review_id in range(1, count + 1)
+    ]
+    return "".join(json.dumps(record) + "\n" for record in records).encode("utf-8")
+
+def test_stored_results_are_looked_up_per_batch(analyzer):
+    db = FakeDatabase(round_trip_ms=0, per_row_ms=0)
+    lookups = []
+    get_current_analyses = db.get_current_analyses
+
+    async def counting(keys, fields=None):
+        lookups.append(len(keys))
+        return await get_current_analyses(keys, fields)
+
+    db.get_current_analyses = counting
+    processor = StreamProcessor(analyzer, concurrency=4)
+
+    async def run():
+        return [result async for result in processor.process(chunked(body(40), 4096), db)]
+
+    first = asyncio.run(run())
+    assert first[-1]["summary"]["success_count"] == 40
+    assert sum(lookups) == 40
+    assert len(lookups) <= 10
+
+    lookups.clear()
+    second = asyncio.run(run())
+    assert all(result.get("unchanged") for result in second[:-1])
+    assert len(second) == 41
+    assert len(lookups) <= 10
@@ -0,0 +1,13 @@
+from topic_taxonomy import TopicTaxonomy
+
+def test_keywords_match_whole_words_only():
+    taxonomy = TopicTaxonomy("test", {"website": ["app", "check in"], "shipping": ["delivery"]})
+    assert taxonomy.match("Happy with the app, delivery was quick") == {"website": 1, "shipping": 1}
+    assert taxonomy.match("Check   in was smooth; deliveryman was rude") == {"website": 1}
+    assert taxonomy.match("happy applicants") == {}
+
+def test_keywords_with_non_word_edges():
+    taxonomy = TopicTaxonomy("tech", {"stack": ["c++", ".net", "c"], "support": ["24/7"]})
+    assert taxonomy.match("We ship C++ and .NET apps with 24/7 support") == {"stack": 2, "support": 1}
+    assert taxonomy.match("c, then c++") == {"stack": 2}
+    assert taxonomy.match("abc++ and asp.netcore and 124/7") == {}
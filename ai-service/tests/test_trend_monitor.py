@@ -0,0 +1,118 @@
+import asyncio
+import json
+import time
+from datetime import datetime
+
+import pytest
+
+from config import settings
+from external_writes import ExternalWriteMarker
+from trend_monitor import TrendMonitor
+
+def test_external_writes_mark_trends_stale_while_in_the_window(tmp_path):
+    monitor = TrendMonitor()
+    marker = ExternalWriteMarker(str(tmp_path / "external_writes.json"))
+    monitor.external_writes = marker
+    assert monitor.missed_writes_at() is None
+
+    # A standalone job worker wrote results the monitor never saw
+    marker.mark(1)
+    assert monitor.missed_writes_at() is not None
+    assert monitor.get_stats()["missed_external_writes_at"] is not None
+
+    # Once the write is older than the rolling window, the series no longer miss it
+    with open(marker.path, "w", encoding="utf-8") as handle:
+        json.dump({"written_at": time.time() - monitor.bucket_seconds * monitor.window - 60}, handle)
+    assert monitor.missed_writes_at() is None
+
+def row(review_id, score, bucket, monitor, sentiment=None, topics=(), sme_id=1):
+    return {
+        "review_id": review_id,
+        "sme_id": sme_id,
+        "review_date": datetime.utcfromtimestamp(bucket * monitor.bucket_seconds + 60),
+        "sentiment_score": score,
+        "sentiment_label": sentiment or ("negative" if score < 0 else "positive"),
+        "topics": list(topics),
+    }
+
+def current_bucket(monitor):
+    return int(time.time() // monitor.bucket_seconds)
+
+def monitor_with_baseline(buckets=8, reviews=10):
+    """A monitor whose SME 1 had ``reviews`` positive reviews and one shipping complaint per past bucket"""
+    monitor = TrendMonitor()
+    monitor.min_buckets, monitor.min_reviews, monitor.min_mentions = 6, 10, 5
+    now = current_bucket(monitor)
+    review_id = 1000
+    for bucket in range(now - buckets, now):
+        rows = []
+        for index in range(reviews):
+            review_id += 1
+            rows.append(row(review_id, 0.5 + 0.01 * (index % 3), bucket, monitor))
+        review_id += 1
+        rows.append(row(review_id, -0.5, bucket, monitor, topics=["shipping"]))
+        monitor.observe(rows)
+    return monitor
+
+def test_sentiment_drop_raises_one_alert_per_bucket():
+    monitor = monitor_with_baseline()
+    now = current_bucket(monitor)
+    monitor.observe(row(review_id, -0.8, now, monitor) for review_id in range(1, 16))
+
+    alerts = monitor.get_alerts(kind="sentiment_drop")
+    assert len(alerts) == 1
+    assert alerts[0]["sme_id"] == 1
+    assert alerts[0]["value"] == -0.8
+    assert alerts[0]["baseline"] > 0.4
+    assert alerts[0]["reviews"] == 10
+
+def test_reanalysis_replaces_the_previous_result():
+    monitor = monitor_with_baseline()
+    now = current_bucket(monitor)
+    complaint = row(1, -0.6, now, monitor, topics=["shipping"])
+    monitor.apply({}, {1: complaint})
+
+    # Reanalyzing the same review over and over is not a spike of complaints
+    for _ in range(10):
+        monitor.apply({1: complaint}, {1: complaint})
+    assert monitor._sentiment[1].count == 1
+    assert monitor._topics[(1, "shipping")].count == 1
+    assert monitor.get_alerts() == []
+
+    # The new result moves the review out of the complaints
+    praise = row(1, 0.7, now, monitor, topics=["shipping"])
+    monitor.apply({1: complaint}, {1: praise})
+    assert monitor._sentiment[1].count == 1
+    assert monitor._sentiment[1].total == pytest.approx(0.7)
+    assert monitor._topics[(1, "shipping")].count == 0
+
+def test_delete_retracts_only_open_buckets():
+    monitor = monitor_with_baseline()
+    now = current_bucket(monitor)
+    fresh = row(1, -0.6, now, monitor, topics=["shipping"])
+    old = row(2, -0.6, now - 3, monitor, topics=["shipping"])
+    monitor.apply({}, {1: fresh})
+    closed = (monitor._sentiment[1].mean, monitor._sentiment[1].closed)
+
+    monitor.apply({1: fresh, 2: old}, {})
+    assert monitor._sentiment[1].count == 0
+    assert monitor._topics[(1, "shipping")].count == 0
+    # Closed buckets are folded into the baseline and stay as they are
+    assert (monitor._sentiment[1].mean, monitor._sentiment[1].closed) == closed
+
+def test_alerts_report_stale_trends(tmp_path, monkeypatch):
+    # Keep the files the API module opens on import out of the working tree
+    monkeypatch.setattr(settings, "job_store_path", str(tmp_path / "jobs.sqlite3"))
+    import main
+
+    monitor = TrendMonitor()
+    marker = ExternalWriteMarker(str(tmp_path / "external_writes.json"))
+    monitor.external_writes = marker
+    monkeypatch.setattr(main, "trend_monitor", monitor)
+
+    def alerts():
+        return asyncio.run(main.get_alerts(sme_id=None, kind=None, since=None, limit=100))
+
+    assert alerts()["stale"] is False
+    marker.mark(1)
+    assert alerts()["stale"] is True
@@ -0,0 +1,76 @@
+import re
+import logging
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+LENGTH_POLICIES = ("truncate", "reject")
+
+# Sentence ends: terminal punctuation (with closing quotes / brackets) followed by
+# whitespace, or a line break. Covers Latin and Arabic punctuation.
+_SENTENCE_END = re.compile(r"(?:(?<=[.!?؟。…])|(?<=[.!?؟。…][\"'”’)\]]))\s+|\s*\n\s*")
+_WHITESPACE = re.compile(r"\s+")
+
+class TextTooLongError(ValueError):
+    """Raised when a text exceeds max_text_length and the policy is "reject\""""
+
+def split_sentences(text: str) -> List[str]:
+    """Sentences of a text, with their whitespace trimmed"""
+    return [sentence.strip() for sentence in _SENTENCE_END.split(text) if sentence and sentence.strip()]
+
+def _split_long_sentence(sentence: str, max_chars: int) -> List[str]:
+    """Split a sentence longer than max_chars at whitespace (or anywhere, for a single huge word)"""
+    pieces: List[str] = []
+    current = ""
+    for word in sentence.split():
+        while len(word) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(word[:max_chars])
+            word = word[max_chars:]
+        if current and len(current) + 1 + len(word) > max_chars:
+            pieces.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        pieces.append(current)
+    return pieces
+
+def segment(text: str, max_chars: int) -> List[str]:
+    """Pack consecutive sentences into chunks of at most max_chars characters"""
+    if max_chars <= 0 or len(text) <= max_chars:
+        return [text]
+
+    chunks: List[str] = []
+    current = ""
+    for sentence in split_sentences(text):
+        for piece in (_split_long_sentence(sentence, max_chars) if len(sentence) > max_chars else [sentence]):
+            if current and len(current) + 1 + len(piece) > max_chars:
+                chunks.append(current)
+                current = piece
+            else:
+                current = f"{current} {piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks or [text]
+
+def enforce_max_length(text: str, max_length: int, policy: str = "truncate") -> str:
+    """
+    Apply the length policy: texts over max_length are rejected, or cut at the
+    last sentence end (else the last whitespace) before the limit
+    """
+    if max_length <= 0 or len(text) <= max_length:
+        return text
+    if policy == "reject":
+        raise TextTooLongError(f"Text is {len(text)} characters long, the limit is {max_length}")
+
+    head = text[:max_length]
+    cut = max((match.start() for match in _SENTENCE_END.finditer(head)), default=-1)
+    if cut < max_length // 2:
+        # No sentence end in the second half: cut at a word boundary instead
+        cut = max((match.start() for match in _WHITESPACE.finditer(head)), default=-1)
+    truncated = (head[:cut] if cut > 0 else head).rstrip()
+    logger.debug(f"Truncated text from {len(text)} to {len(truncated)} characters")
+    return truncated
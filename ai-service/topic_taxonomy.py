@@ -0,0 +1,133 @@
+import json
+import logging
+import re
+from collections import defaultdict
+from typing import Optional, Dict, List, Tuple, Iterable
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TAXONOMY = "default"
+
+DEFAULT_TOPIC_KEYWORDS: Dict[str, List[str]] = {
+    'product_quality': ['quality', 'good', 'bad', 'excellent', 'poor', 'defective'],
+    'shipping': ['delivery', 'shipping', 'fast', 'slow', 'arrived', 'delayed'],
+    'customer_service': ['service', 'support', 'staff', 'helpful', 'rude', 'friendly'],
+    'price': ['price', 'cost', 'expensive', 'cheap', 'value', 'money'],
+    'packaging': ['packaging', 'box', 'wrapped', 'damaged', 'package'],
+    'website': ['website', 'online', 'app', 'interface', 'easy', 'difficult']
+}
+
+def _trie_pattern(terms: Iterable[str]) -> str:
+    """
+    Build a regex alternation shaped like a trie, so matching cost depends on
+    the text length rather than on the number of terms.
+    """
+    trie: Dict[str, dict] = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def render(node: Dict[str, dict]) -> str:
+        optional = '' in node
+        branches = [
+            (r'\s+' if char == ' ' else re.escape(char)) + render(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if optional:
+            body = ('(?:' + body + ')' if len(branches) == 1 and len(body) > 1 else body) + '?'
+        return body
+
+    return render(trie)
+
+class TopicTaxonomy:
+    """Topic -> keyword taxonomy compiled into one word-boundary-aware regex"""
+
+    def __init__(self, name: str, topic_keywords: Dict[str, List[str]]):
+        self.name = name
+        self.topics = list(topic_keywords)
+        self._keyword_topics: Dict[str, List[str]] = defaultdict(list)
+        for topic, keywords in topic_keywords.items():
+            for keyword in keywords:
+                term = ' '.join(keyword.lower().split())
+                if term and topic not in self._keyword_topics[term]:
+                    self._keyword_topics[term].append(topic)
+
+        self._order = {topic: index for index, topic in enumerate(self.topics)}
+        # Not next to a word character; unlike \b this also holds for terms such as "c++" or ".net"
+        self._pattern = re.compile(r'(?<!\w)' + _trie_pattern(self._keyword_topics) + r'(?!\w)') if self._keyword_topics else None
+
+    def __len__(self) -> int:
+        return len(self.topics)
+
+    def match(self, text: str) -> Dict[str, int]:
+        """Count keyword hits per topic in a single pass over the text"""
+        if self._pattern is None:
+            return {}
+        hits: Dict[str, int] = defaultdict(int)
+        for found in self._pattern.findall(text.lower()):
+            for topic in self._keyword_topics[' '.join(found.split())]:
+                hits[topic] += 1
+        return dict(hits)
+
+    def score(self, text: str) -> List[Tuple[str, int, float]]:
+        """(topic, hits, share of all hits) ordered by hits, then taxonomy order"""
+        hits = self.match(text)
+        total = sum(hits.values())
+        ranked = sorted(hits.items(), key=lambda item: (-item[1], self._order[item[0]]))
+        return [(topic, count, round(count / total, 4)) for topic, count in ranked]
+
+    def extract(self, text: str, limit: int = 5) -> List[str]:
+        return [topic for topic, _, _ in self.score(text)[:limit]]
+
+class TaxonomyRegistry:
+    """
+    Default, per-industry and per-SME taxonomies. A JSON config file may define
+    {"default": {...}, "industries": {"<name>": {...}}, "smes": {"<id>": {...}}},
+    each mapping topic names to keyword lists.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self._taxonomies: Dict[str, TopicTaxonomy] = {
+            DEFAULT_TAXONOMY: TopicTaxonomy(DEFAULT_TAXONOMY, DEFAULT_TOPIC_KEYWORDS)
+        }
+        if path:
+            self.load(path)
+
+    def load(self, path: str):
+        try:
+            with open(path, encoding='utf-8') as handle:
+                config = json.load(handle)
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to load topic taxonomies from {path}: {e}")
+            return
+
+        if config.get('default'):
+            self._taxonomies[DEFAULT_TAXONOMY] = TopicTaxonomy(DEFAULT_TAXONOMY, config['default'])
+        for industry, topics in config.get('industries', {}).items():
+            name = f"industry:{industry.lower()}"
+            self._taxonomies[name] = TopicTaxonomy(name, topics)
+        for sme_id, topics in config.get('smes', {}).items():
+            name = f"sme:{sme_id}"
+            self._taxonomies[name] = TopicTaxonomy(name, topics)
+        logger.info(f"Loaded {len(self._taxonomies)} topic taxonomies from {path}")
+
+    def resolve(self, sme_id: Optional[int] = None, industry: Optional[str] = None) -> str:
+        """Name of the most specific taxonomy for an SME / industry"""
+        if sme_id is not None and f"sme:{sme_id}" in self._taxonomies:
+            return f"sme:{sme_id}"
+        if industry and f"industry:{industry.lower()}" in self._taxonomies:
+            return f"industry:{industry.lower()}"
+        return DEFAULT_TAXONOMY
+
+    def get(self, name: str = DEFAULT_TAXONOMY) -> TopicTaxonomy:
+        return self._taxonomies.get(name) or self._taxonomies[DEFAULT_TAXONOMY]
+
+# Built once per process from settings.topic_taxonomy_path
+taxonomy_registry = TaxonomyRegistry(settings.topic_taxonomy_path)
@@ -0,0 +1,381 @@
+import os
+import json
+import math
+import time
+import logging
+import calendar
+import threading
+from array import array
+from collections import deque
+from datetime import date, datetime, timezone
+from typing import Optional, Dict, Any, List, Iterable, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+SENTIMENT_DROP = "sentiment_drop"
+TOPIC_SPIKE = "topic_spike"
+
+CHECKPOINT_VERSION = 1
+
+# Smallest spread assumed for a bucket's average sentiment, so a very stable
+# baseline does not turn a small dip into an alert
+MIN_SENTIMENT_DEVIATION = 0.05
+
+def _bucket_of(moment: Any, bucket_seconds: int) -> int:
+    """Bucket number of a review date (UTC, like every timestamp the service writes); now when unknown"""
+    if isinstance(moment, datetime):
+        seconds = calendar.timegm(moment.utctimetuple())
+    elif isinstance(moment, date):
+        seconds = calendar.timegm(moment.timetuple())
+    else:
+        seconds = time.time()
+    return int(seconds // bucket_seconds)
+
+class Series:
+    """
+    One tracked quantity per bucket (an SME's review count and sentiment sum, or its
+    negative mentions of a topic): the open bucket, an exponentially weighted mean
+    and variance of closed buckets, and a ring of the last ``window`` buckets.
+    """
+
+    __slots__ = ("bucket", "count", "total", "mean", "var", "closed", "alerted", "slots", "counts", "totals")
+
+    def __init__(self, window: int, bucket: int = -1):
+        self.bucket = bucket
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self.var = 0.0
+        self.closed = 0
+        self.alerted = -1
+        self.slots = array('q', [-1] * window)
+        self.counts = array('I', [0] * window)
+        self.totals = array('d', [0.0] * window)
+
+    def _fold(self, value: float, alpha: float):
+        if self.closed == 0:
+            self.mean, self.var = value, 0.0
+        else:
+            diff = value - self.mean
+            increment = alpha * diff
+            self.mean += increment
+            self.var = (1 - alpha) * (self.var + diff * increment)
+        self.closed += 1
+
+    def advance(self, bucket: int, alpha: float, zero_filled: bool):
+        """
+        Close the open bucket and open ``bucket``. Count series also fold the empty
+        buckets in between as zeros (at most one window of them; older ones only decay).
+        """
+        if self.bucket >= 0:
+            window = len(self.slots)
+            index = self.bucket % window
+            self.slots[index], self.counts[index], self.totals[index] = self.bucket, self.count, self.total
+            if zero_filled:
+                self._fold(float(self.count), alpha)
+                gap = bucket - self.bucket - 1
+                for _ in range(min(gap, window)):
+                    self._fold(0.0, alpha)
+                if gap > window:
+                    decay = (1 - alpha) ** (gap - window)
+                    self.mean *= decay
+                    self.var *= decay
+            elif self.count:
+                self._fold(self.total / self.count, alpha)
+        self.bucket, self.count, self.total = bucket, 0, 0.0
+
+    def window_stats(self) -> Tuple[int, float]:
+        """Count and total over the closed buckets of the rolling window"""
+        oldest = self.bucket - len(self.slots)
+        count, total = 0, 0.0
+        for slot, slot_count, slot_total in zip(self.slots, self.counts, self.totals):
+            if slot >= oldest:
+                count += slot_count
+                total += slot_total
+        return count, total
+
+    def to_list(self) -> list:
+        return [self.bucket, self.count, self.total, self.mean, self.var, self.closed, self.alerted,
+                self.slots.tolist(), self.counts.tolist(), self.totals.tolist()]
+
+    @classmethod
+    def from_list(cls, values: list) -> "Series":
+        series = cls(len(values[7]))
+        (series.bucket, series.count, series.total, series.mean, series.var,
+         series.closed, series.alerted) = values[:7]
+        series.slots, series.counts, series.totals = array('q', values[7]), array('I', values[8]), array('d', values[9])
+        return series
+
+class TrendMonitor:
+    """
+    Online sentiment trends and anomaly detection per SME, fed by the analysis write
+    path. Each SME has a sentiment series (average score per time bucket of the review
+    date) and one series per topic (negative reviews mentioning it per bucket). A new
+    result updates its open buckets and compares them with the exponentially weighted
+    baseline of past buckets, so detection costs O(1) per result and never scans stored
+    results. State and recent alerts are checkpointed to a JSON file.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.bucket_seconds = max(1, settings.trend_bucket_seconds)
+        self.window = max(1, settings.trend_window_buckets)
+        self.alpha = settings.trend_ewma_alpha
+        self.threshold = settings.trend_z_threshold
+        self.min_buckets = settings.trend_min_buckets
+        self.min_reviews = settings.trend_min_reviews
+        self.min_mentions = settings.trend_min_mentions
+        self.loaded = path is None
+        self._lock = threading.Lock()
+        self._sentiment: Dict[int, Series] = {}
+        self._topics: Dict[Tuple[int, str], Series] = {}
+        self._alerts: deque = deque(maxlen=settings.trend_alert_history)
+        self._next_alert_id = 1
+        self._late = 0
+        self._dirty = False
+        self._last_checkpoint = time.monotonic()
+        self._checkpointing = False
+        self.external_writes = None
+
+    def _params(self) -> Dict[str, Any]:
+        return {"bucket_seconds": self.bucket_seconds, "window": self.window}
+
+    def _series(self, table: dict, key, bucket: int) -> Series:
+        series = table.get(key)
+        if series is None:
+            series = table[key] = Series(self.window, bucket)
+        return series
+
+    def _raise(self, kind: str, sme_id: int, topic: Optional[str], series: Series, value: float, deviation: float, z_score: float):
+        series.alerted = series.bucket
+        window_count, window_total = series.window_stats()
+        if kind == SENTIMENT_DROP:
+            window_mean = window_total / window_count if window_count else None
+        else:
+            window_mean = window_count / self.window
+        alert = {
+            "id": self._next_alert_id,
+            "kind": kind,
+            "sme_id": sme_id,
+            "topic": topic,
+            "bucket_start": datetime.utcfromtimestamp(series.bucket * self.bucket_seconds).isoformat(),
+            "value": round(value, 4),
+            "baseline": round(series.mean, 4),
+            "deviation": round(deviation, 4),
+            "z_score": round(z_score, 2),
+            "reviews": series.count,
+            "window_mean": round(window_mean, 4) if window_mean is not None else None,
+            "raised_at": datetime.utcnow().isoformat(),
+        }
+        self._next_alert_id += 1
+        self._alerts.append(alert)
+        subject = f"topic '{topic}'" if topic else "sentiment"
+        logger.warning(f"{kind} for SME {sme_id} {subject}: {alert['value']} against a baseline of {alert['baseline']} (z={alert['z_score']})")
+
+    def _observe(self, row: Dict[str, Any], recent: int):
+        sme_id = row.get('sme_id')
+        if sme_id is None or row.get('sentiment_score') is None:
+            return
+        bucket = _bucket_of(row.get('review_date'), self.bucket_seconds)
+
+        series = self._series(self._sentiment, sme_id, bucket)
+        if bucket < series.bucket:
+            # Past buckets are already folded into the baseline
+            self._late += 1
+            return
+        if bucket > series.bucket:
+            series.advance(bucket, self.alpha, zero_filled=False)
+        series.count += 1
+        series.total += float(row['sentiment_score'])
+        if series.count >= self.min_reviews and series.closed >= self.min_buckets and series.alerted != bucket and bucket >= recent:
+            value = series.total / series.count
+            deviation = max(math.sqrt(series.var), MIN_SENTIMENT_DEVIATION)
+            z_score = (value - series.mean) / deviation
+            if z_score <= -self.threshold:
+                self._raise(SENTIMENT_DROP, sme_id, None, series, value, deviation, z_score)
+
+        if row.get('sentiment_label') != "negative":
+            return
+        topics = row.get('topics')
+        if isinstance(topics, str):
+            topics = json.loads(topics) if topics else []
+        for topic in set(topics or ()):
+            series = self._series(self._topics, (sme_id, topic), bucket)
+            if bucket < series.bucket:
+                continue
+            if bucket > series.bucket:
+                series.advance(bucket, self.alpha, zero_filled=True)
+            series.count += 1
+            if series.count >= self.min_mentions and series.closed >= self.min_buckets and series.alerted != bucket and bucket >= recent:
+                # Counts are at least Poisson-noisy, whatever the spread of the baseline
+                deviation = math.sqrt(max(series.var, series.mean, 1.0))
+                z_score = (series.count - series.mean) / deviation
+                if z_score >= self.threshold:
+                    self._raise(TOPIC_SPIKE, sme_id, topic, series, float(series.count), deviation, z_score)
+
+    def _retract(self, row: Dict[str, Any]):
+        """
+        Take back a replaced or deleted result. Only open buckets can change: closed ones
+        are folded into the baseline, and their replacement is not counted either.
+        """
+        sme_id = row.get('sme_id')
+        if sme_id is None or row.get('sentiment_score') is None:
+            return
+        bucket = _bucket_of(row.get('review_date'), self.bucket_seconds)
+
+        series = self._sentiment.get(sme_id)
+        if series is None or series.bucket != bucket or series.count == 0:
+            return
+        series.count -= 1
+        series.total -= float(row['sentiment_score'])
+
+        if row.get('sentiment_label') != "negative":
+            return
+        topics = row.get('topics')
+        if isinstance(topics, str):
+            topics = json.loads(topics) if topics else []
+        for topic in set(topics or ()):
+            series = self._topics.get((sme_id, topic))
+            if series is not None and series.bucket == bucket and series.count:
+                series.count -= 1
+
+    def observe(self, rows: Iterable[Dict[str, Any]]):
+        """
+        Account for newly written results (current-results rows with sme_id, review_date,
+        sentiment_score, sentiment_label and topics). Alerts are only raised for the current
+        and previous bucket, so backfilling old reviews builds baselines without alerting.
+        """
+        self.apply({}, dict(enumerate(rows)))
+
+    def apply(self, before: Dict[int, Dict[str, Any]], after: Dict[int, Dict[str, Any]]):
+        """
+        Move the series from ``before`` to ``after`` (current-results rows by review id,
+        as read around a write): a reanalyzed review replaces its previous result instead
+        of being counted twice, and a review missing from ``after`` lost its result.
+        """
+        if not before and not after:
+            return
+        self.load()
+        recent = _bucket_of(None, self.bucket_seconds) - 1
+        with self._lock:
+            for row in before.values():
+                self._retract(row)
+            for row in after.values():
+                self._observe(row, recent)
+            self._dirty = True
+            checkpoint = (
+                self.path is not None and not self._checkpointing
+                and time.monotonic() - self._last_checkpoint >= settings.trend_checkpoint_seconds
+            )
+            if checkpoint:
+                self._checkpointing = True
+        if checkpoint:
+            threading.Thread(target=self.checkpoint, name="trend-checkpoint", daemon=True).start()
+
+    def get_alerts(
+        self,
+        sme_id: Optional[int] = None,
+        kind: Optional[str] = None,
+        since: Optional[datetime] = None,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """Recent alerts, newest first"""
+        self.load()
+        if since is not None and since.tzinfo is not None:
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        since_text = since.isoformat() if since is not None else None
+        with self._lock:
+            alerts = []
+            for alert in reversed(self._alerts):
+                if since_text is not None and alert["raised_at"] < since_text:
+                    break
+                if (sme_id is None or alert["sme_id"] == sme_id) and (kind is None or alert["kind"] == kind):
+                    alerts.append(alert)
+                    if len(alerts) >= limit:
+                        break
+            return alerts
+
+    def missed_writes_at(self) -> Optional[float]:
+        """
+        Time of the latest write made outside this process within the rolling window, if
+        any: those results are missing from the series until they age out of the window
+        """
+        if self.external_writes is None:
+            return None
+        return self.external_writes.missed_since(time.time() - self.bucket_seconds * self.window, "sentiment trends")
+
+    def load(self):
+        """Restore the checkpoint, if any (once)"""
+        if self.loaded:
+            return
+        with self._lock:
+            if self.loaded:
+                return
+            self.loaded = True
+            if not os.path.exists(self.path):
+                return
+            try:
+                with open(self.path, encoding="utf-8") as handle:
+                    state = json.load(handle)
+                if state.get("version") != CHECKPOINT_VERSION or state.get("params") != self._params():
+                    logger.warning(f"Trend checkpoint {self.path} was written with other settings, starting over")
+                    return
+                self._sentiment = {int(sme_id): Series.from_list(values) for sme_id, values in state["sentiment"].items()}
+                self._topics = {
+                    (sme_id, topic): Series.from_list(values) for sme_id, topic, values in state["topics"]
+                }
+                self._alerts.extend(state["alerts"])
+                self._next_alert_id = state["next_alert_id"]
+                logger.info(f"Trend checkpoint loaded: {len(self._sentiment)} SMEs, {len(self._topics)} topic series")
+            except (OSError, ValueError, KeyError, TypeError, IndexError) as e:
+                logger.error(f"Unreadable trend checkpoint {self.path} ({e}), starting over")
+                self._sentiment, self._topics = {}, {}
+
+    def checkpoint(self):
+        """Write the state to the checkpoint file (write-then-rename)"""
+        if self.path is None:
+            return
+        try:
+            with self._lock:
+                dirty = self._dirty
+                if dirty:
+                    state = {
+                        "version": CHECKPOINT_VERSION,
+                        "params": self._params(),
+                        "sentiment": {str(sme_id): series.to_list() for sme_id, series in self._sentiment.items()},
+                        "topics": [[sme_id, topic, series.to_list()] for (sme_id, topic), series in self._topics.items()],
+                        "alerts": list(self._alerts),
+                        "next_alert_id": self._next_alert_id,
+                    }
+                    self._dirty = False
+            if dirty:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                temporary = f"{self.path}.tmp"
+                with open(temporary, "w", encoding="utf-8") as handle:
+                    json.dump(state, handle, separators=(",", ":"))
+                os.replace(temporary, self.path)
+        except OSError as e:
+            logger.error(f"Failed to write the trend checkpoint: {e}")
+            self._dirty = True
+        finally:
+            self._last_checkpoint = time.monotonic()
+            self._checkpointing = False
+
+    def close(self):
+        if self.loaded:
+            self.checkpoint()
+
+    def get_stats(self) -> Dict[str, Any]:
+        missed_at = self.missed_writes_at()
+        with self._lock:
+            return {
+                "smes": len(self._sentiment),
+                "topic_series": len(self._topics),
+                "alerts": len(self._alerts),
+                "late_results": self._late,
+                "missed_external_writes_at": missed_at,
+            }
@@ -0,0 +1,29 @@
+<?php
+
+use Illuminate\Database\Migrations\Migration;
+use Illuminate\Database\Schema\Blueprint;
+use Illuminate\Support\Facades\Schema;
+
+return new class extends Migration
+{
+    /**
+     * Run the migrations.
+     */
+    public function up(): void
+    {
+        Schema::table('business_metrics', function (Blueprint $table) {
+            // One row per metric and period, so the AI service can upsert rollups
+            $table->unique(['sme_id', 'metric_name', 'period_type', 'period_start'], 'business_metrics_period_unique');
+        });
+    }
+
+    /**
+     * Reverse the migrations.
+     */
+    public function down(): void
+    {
+        Schema::table('business_metrics', function (Blueprint $table) {
+            $table->dropUnique('business_metrics_period_unique');
+        });
+    }
+};
@@ -0,0 +1,85 @@
+<?php
+
+use Illuminate\Database\Migrations\Migration;
+use Illuminate\Database\Schema\Blueprint;
+use Illuminate\Support\Facades\DB;
+use Illuminate\Support\Facades\Schema;
+
+return new class extends Migration
+{
+    /**
+     * Run the migrations.
+     */
+    public function up(): void
+    {
+        // Superseded analyses, kept when the AI service has ANALYSIS_HISTORY_ENABLED
+        Schema::create('ai_analysis_results_history', function (Blueprint $table) {
+            $table->id();
+            $table->unsignedBigInteger('analysis_id');
+            $table->foreignId('review_id')->constrained('customer_reviews')->onDelete('cascade');
+            $table->decimal('sentiment_score', 5, 4)->nullable();
+            $table->enum('sentiment_label', ['positive', 'negative', 'neutral']);
+            $table->decimal('confidence_score', 5, 4)->nullable();
+            $table->json('keywords')->nullable();
+            $table->json('topics')->nullable();
+            $table->json('emotions')->nullable();
+            $table->string('language_code', 10)->nullable();
+            $table->string('analysis_model', 100)->nullable();
+            $table->char('content_hash', 64)->nullable();
+            $table->timestamp('processed_at')->nullable();
+            $table->timestamp('superseded_at')->useCurrent();
+
+            $table->index(['review_id', 'superseded_at']);
+        });
+
+        Schema::table('ai_analysis_results', function (Blueprint $table) {
+            // Hash of the analyzed text, language and taxonomy: a stored result is current
+            // when its content_hash and analysis_model match the next request's
+            $table->char('content_hash', 64)->nullable()->after('analysis_model');
+        });
+
+        // Keep only the newest analysis of each review: latest processed_at (what GET /analysis/{id}
+        // returned), then highest id. The others move to the history table
+        $keep = "
+            SELECT a2.review_id, MAX(a2.id) AS keep_id
+            FROM ai_analysis_results a2
+            JOIN (SELECT review_id, MAX(processed_at) AS latest FROM ai_analysis_results GROUP BY review_id) l
+                ON l.review_id = a2.review_id AND a2.processed_at <=> l.latest
+            GROUP BY a2.review_id
+        ";
+        DB::statement("
+            INSERT INTO ai_analysis_results_history (
+                analysis_id, review_id, sentiment_score, sentiment_label, confidence_score,
+                keywords, topics, emotions, language_code, analysis_model, processed_at
+            )
+            SELECT a.id, a.review_id, a.sentiment_score, a.sentiment_label, a.confidence_score,
+                a.keywords, a.topics, a.emotions, a.language_code, a.analysis_model, a.processed_at
+            FROM ai_analysis_results a
+            JOIN ({$keep}) k
+                ON k.review_id = a.review_id AND a.id <> k.keep_id
+        ");
+        DB::statement("
+            DELETE a FROM ai_analysis_results a
+            JOIN ({$keep}) k
+                ON k.review_id = a.review_id AND a.id <> k.keep_id
+        ");
+
+        Schema::table('ai_analysis_results', function (Blueprint $table) {
+            // One row per review, so the AI service can upsert analyses in place
+            $table->unique('review_id', 'ai_analysis_results_review_unique');
+        });
+    }
+
+    /**
+     * Reverse the migrations.
+     */
+    public function down(): void
+    {
+        Schema::table('ai_analysis_results', function (Blueprint $table) {
+            $table->dropUnique('ai_analysis_results_review_unique');
+            $table->dropColumn('content_hash');
+        });
+
+        Schema::dropIfExists('ai_analysis_results_history');
+    }
+};